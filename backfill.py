@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from data_api import BitgetAPI
+from database_manager import DatabaseManager, Candle
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60 * 1000
+
+class CandleBackfiller:
+    """kline_1m 누락 구간 탐지 및 REST 백필
+
+    backfill_checkpoint 테이블의 verified_until 이후만 검사하므로 중단되어도
+    다음 실행에서 실패한 구간부터 이어서 진행한다.
+    """
+
+    def __init__(self, api: BitgetAPI, db_manager: DatabaseManager, symbol: str = 'BTCUSDT',
+                 max_lookback_minutes: int = 24 * 60, page_size: int = 199,
+                 max_concurrency: int = 4,
+                 on_candles: Optional[Callable[[List[Candle]], Awaitable[None]]] = None):
+        self.api = api
+        self.db_manager = db_manager
+        self.symbol = symbol
+        self.granularity = '1m'
+        self.max_lookback_minutes = max_lookback_minutes
+        # history-candles 는 요청당 최대 200개. endTime 경계 봉 1개를 위해 199분 단위로 나눔
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.on_candles = on_candles
+        self._run_lock = asyncio.Lock()
+        self.last_result: Dict[str, float] = {}
+
+    @staticmethod
+    def find_missing_ranges(timestamps: List[int], start: int, end: int) -> List[Tuple[int, int]]:
+        """[start, end] 구간에서 빠진 1분봉 범위 목록 (양 끝 포함)"""
+        gaps = []
+        expected = start
+        for ts in timestamps:
+            if ts < expected:
+                continue
+            if ts > end:
+                break
+            if ts > expected:
+                gaps.append((expected, ts - MINUTE_MS))
+            expected = ts + MINUTE_MS
+        if expected <= end:
+            gaps.append((expected, end))
+        return gaps
+
+    def split_pages(self, gaps: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """누락 범위를 API 한도 크기의 페이지로 분할"""
+        pages = []
+        span = self.page_size * MINUTE_MS
+        for gap_start, gap_end in gaps:
+            page_start = gap_start
+            while page_start <= gap_end:
+                page_end = min(page_start + span - MINUTE_MS, gap_end)
+                pages.append((page_start, page_end))
+                page_start = page_end + MINUTE_MS
+        return pages
+
+    async def _fetch_page(self, page: Tuple[int, int], semaphore: asyncio.Semaphore) -> Optional[List[tuple]]:
+        """페이지 하나 조회 - 실패 시 None"""
+        page_start, page_end = page
+        # 초당 요청 수는 BitgetAPI 의 scheduler 가 백그라운드 우선순위로 제한
+        async with semaphore:
+            response = await self.api.get_candles_range(
+                self.symbol, page_start, page_end + MINUTE_MS,
+                granularity=self.granularity, limit=self.page_size + 1
+            )
+
+        if not response or response.get('code') != '00000':
+            logger.warning(f"Backfill page {page_start}-{page_end} failed: {response}")
+            return None
+
+        rows = self.db_manager.candle_rows_from_api(response.get('data') or [])
+        return [row for row in rows if page_start <= row[0] <= page_end]
+
+    async def run(self) -> Dict[str, float]:
+        """누락 구간 탐지 → 동시 조회 → 일괄 저장 → 체크포인트 갱신"""
+        if self._run_lock.locked():
+            logger.info("Backfill already running, skipping")
+            return self.last_result
+
+        async with self._run_lock:
+            started = time.perf_counter()
+            try:
+                # 진행 중인 봉은 웹소켓이 채우므로 마지막 확정 봉까지만 검사
+                end = (int(time.time() * 1000) // MINUTE_MS - 1) * MINUTE_MS
+                horizon = end - (self.max_lookback_minutes - 1) * MINUTE_MS
+                checkpoint = await self.db_manager.get_backfill_checkpoint(self.symbol, self.granularity)
+                start = max(horizon, checkpoint + MINUTE_MS) if checkpoint else horizon
+
+                if start > end:
+                    self.last_result = {'gaps': 0, 'pages': 0, 'rows': 0, 'failed_pages': 0}
+                    return self.last_result
+
+                timestamps = await self.db_manager.get_candle_timestamps(start, end, self.symbol)
+                gaps = self.find_missing_ranges(timestamps, start, end)
+                pages = self.split_pages(gaps)
+
+                rows: List[tuple] = []
+                failed: List[Tuple[int, int]] = []
+                if pages:
+                    logger.info(f"Backfilling {len(gaps)} gaps ({len(pages)} pages) for {self.symbol}")
+                    semaphore = asyncio.Semaphore(self.max_concurrency)
+                    results = await asyncio.gather(
+                        *(self._fetch_page(page, semaphore) for page in pages),
+                        return_exceptions=True
+                    )
+                    for page, result in zip(pages, results):
+                        if isinstance(result, Exception) or result is None:
+                            failed.append(page)
+                        else:
+                            rows.extend(result)
+
+                if rows:
+                    await self.db_manager.bulk_upsert_candles(rows, symbol=self.symbol)
+                    if self.on_candles:
+                        await self.on_candles([
+                            Candle(timestamp=r[0], open=r[1], high=r[2], low=r[3],
+                                   close=r[4], volume=r[5], quote_volume=r[6])
+                            for r in rows
+                        ])
+
+                # 실패한 페이지 직전까지만 검증 완료로 기록해 다음 실행에서 재시도
+                verified_until = min(page[0] for page in failed) - MINUTE_MS if failed else end
+                if verified_until >= start:
+                    await self.db_manager.save_backfill_checkpoint(
+                        self.symbol, verified_until, self.granularity
+                    )
+
+                self.last_result = {
+                    'gaps': len(gaps),
+                    'pages': len(pages),
+                    'rows': len(rows),
+                    'failed_pages': len(failed),
+                    'elapsed_sec': time.perf_counter() - started
+                }
+                if pages:
+                    logger.info(f"Backfill finished for {self.symbol}: {self.last_result}")
+                return self.last_result
+
+            except Exception as e:
+                logger.error(f"Error during {self.symbol} candle backfill: {e}")
+                return {}
@@ -0,0 +1,445 @@
+"""저장된 kline_1m + market_sentiment_data 로 TradingStrategy 신호를 재현하는 백테스트
+
+사용법: python backtest.py [일수] [심볼] [fast|replay|both]
+
+- fast: 지표/진입 신호를 NumPy 로 한 번에 계산하고 포지션 상태만 순차 처리 (파라미터 탐색용)
+- replay: 1분봉과 시장 지표 행을 시간순으로 IndicatorEngine 과 TradingStrategy 의
+  should_open_long / should_open_short / should_close_position 에 그대로 흘려보냄 (정합성 확인용)
+
+실거래는 진행 중인 봉 갱신마다 평가하지만 저장된 데이터는 확정 봉뿐이므로 두 경로 모두
+봉 마감 시점에 한 번 평가한다. 시장 지표는 봉 마감 시각 이전에 저장된 마지막 행만 사용한다.
+"""
+import asyncio
+import logging
+import math
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+import numpy as np
+from database_manager import DatabaseManager, Candle, DEFAULT_SYMBOL, TIMEFRAME_MS
+from indicator_engine import IndicatorEngine
+from models import Position, TradingMetrics
+from trading_strategy_implementation import TradingConfig, TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = TIMEFRAME_MS['1m']
+
+@dataclass
+class BacktestConfig:
+    initial_balance: float = 1000.0     # 시작 잔고 (USDT)
+    maker_fee_pct: float = 0.02         # 지정가 진입 수수료 (%)
+    taker_fee_pct: float = 0.06         # 시장가/스탑 청산 수수료 (%)
+    min_trade_interval: int = 120       # 진입 간 최소 간격 (초) - TradingStrategy 와 동일
+    window: int = 200                   # 캔들 캐시 / 지표 창 크기 - MarketDataManager 와 동일
+    sentiment_max_age: int = 5 * 60     # 이보다 오래된 시장 지표는 없는 것으로 취급 (초)
+
+@dataclass
+class BacktestData:
+    """봉 단위로 정렬된 가격 + 시장 지표 배열"""
+    symbol: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    sentiment: List[Dict[str, float]]
+    # 봉 마감 시점 기준 시장 지표 (없으면 전략 기본값)
+    oi_valid: np.ndarray = None
+    oi_rsi: np.ndarray = None
+    ls_ratio_slope: np.ndarray = None
+    ls_ratio_acceleration: np.ndarray = None
+
+    @classmethod
+    def from_rows(cls, candles: List[Candle], sentiment: List[Dict[str, float]],
+                  symbol: str = DEFAULT_SYMBOL, sentiment_max_age: int = 5 * 60) -> 'BacktestData':
+        """시간 오름차순 캔들 / 시장 지표 행으로 생성"""
+        data = cls(
+            symbol=symbol,
+            timestamp=np.array([c.timestamp for c in candles], dtype=np.int64),
+            open=np.array([c.open for c in candles], dtype=np.float64),
+            high=np.array([c.high for c in candles], dtype=np.float64),
+            low=np.array([c.low for c in candles], dtype=np.float64),
+            close=np.array([c.close for c in candles], dtype=np.float64),
+            volume=np.array([c.volume for c in candles], dtype=np.float64),
+            sentiment=sentiment
+        )
+        data._align_sentiment(sentiment_max_age * 1000)
+        return data
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def _align_sentiment(self, max_age_ms: int) -> None:
+        """각 봉 마감 시각 이전의 마지막 시장 지표 행을 봉에 맞춤 (미래 값 사용 방지)"""
+        n = len(self.timestamp)
+        sentiment_ts = np.array([row['timestamp'] for row in self.sentiment], dtype=np.int64)
+        bar_close = self.timestamp + MINUTE_MS
+        index = np.searchsorted(sentiment_ts, bar_close, side='right') - 1
+        fresh = index >= 0
+        fresh[fresh] = bar_close[fresh] - sentiment_ts[index[fresh]] <= max_age_ms
+
+        def column(name: str, default: float) -> np.ndarray:
+            values = np.array([row[name] for row in self.sentiment], dtype=np.float64)
+            out = np.full(n, default)
+            out[fresh] = values[index[fresh]]
+            return out
+
+        # open_interest 가 0 인 행은 OI 캐시가 비어 있던 시점 (oi_rsi 도 0 으로 저장됨)
+        self.oi_valid = column('open_interest', 0.0) > 0
+        self.oi_rsi = np.where(self.oi_valid, column('oi_rsi', 50.0), 50.0)
+        self.ls_ratio_slope = column('ls_ratio_slope', 0.0)
+        self.ls_ratio_acceleration = column('ls_ratio_acceleration', 0.0)
+
+async def load_backtest_data(start_time: int, end_time: int, symbol: str = DEFAULT_SYMBOL,
+                             sentiment_max_age: int = 5 * 60) -> BacktestData:
+    """DB 에서 구간의 1분봉과 시장 지표 로드"""
+    db_manager = DatabaseManager()
+    candles = await db_manager.get_candles_between(start_time, end_time, symbol)
+    sentiment = await db_manager.get_market_sentiment_between(
+        start_time - sentiment_max_age * 1000, end_time + MINUTE_MS, symbol)
+    logger.info(f"Loaded {len(candles)} {symbol} candles and {len(sentiment)} sentiment rows")
+    return BacktestData.from_rows(candles, sentiment, symbol, sentiment_max_age)
+
+@dataclass
+class BacktestTrade:
+    side: str
+    entry_time: int
+    exit_time: int
+    entry_price: float
+    exit_price: float
+    size: float
+    leverage: int
+    pnl: float
+    exit_reason: str
+
+@dataclass
+class BacktestResult:
+    mode: str
+    metrics: TradingMetrics
+    trades: List[BacktestTrade] = field(default_factory=list)
+    initial_balance: float = 0.0
+    final_balance: float = 0.0
+    bars: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        m = self.metrics
+        return {
+            'mode': self.mode,
+            'bars': self.bars,
+            'trades': m.total_trades,
+            'win_rate': m.win_rate,
+            'profit_factor': m.profit_factor,
+            'net_pnl': m.total_profit - m.total_loss,
+            'return_pct': (self.final_balance / self.initial_balance - 1) * 100 if self.initial_balance else 0.0,
+            'max_drawdown_pct': m.max_drawdown,
+            'elapsed_sec': self.elapsed
+        }
+
+class _Ledger:
+    """두 경로가 공유하는 체결/잔고/지표 계산"""
+
+    def __init__(self, config: BacktestConfig, trading_config: TradingConfig):
+        self.config = config
+        self.trading_config = trading_config
+        self.balance = config.initial_balance
+        self.peak = self.balance
+        self.metrics = TradingMetrics()
+        self.trades: List[BacktestTrade] = []
+        self.side: Optional[str] = None
+        self.entry_time = 0
+        self.entry_price = 0.0
+        self.stop_price = 0.0
+        self.size = 0.0
+        self.leverage = 0
+        self.last_trade_time = -math.inf  # 초
+
+    def can_enter(self, timestamp: int) -> bool:
+        return self.side is None and timestamp // 1000 - self.last_trade_time >= self.config.min_trade_interval
+
+    def open(self, side: str, timestamp: int, close: float, leverage: int) -> bool:
+        """execute_entry 와 같은 가격/크기 규칙으로 진입 (지정가 주문은 체결된 것으로 가정)"""
+        trade_amount = self.balance * (self.trading_config.position_size_pct / 100)
+        size = math.floor(trade_amount * leverage / close * 1000) / 1000
+        if size <= 0:
+            return False
+        entry_price = close + 0.1 if side == 'long' else close - 0.1
+        stop_pct = self.trading_config.stop_loss_pct / 100
+        stop_price = entry_price * (1 - stop_pct) if side == 'long' else entry_price * (1 + stop_pct)
+
+        self.side = side
+        self.entry_time = timestamp
+        self.entry_price = round(entry_price * 10) / 10
+        self.stop_price = round(stop_price * 10) / 10
+        self.size = size
+        self.leverage = leverage
+        self.last_trade_time = timestamp // 1000
+        return True
+
+    def unrealized_pnl(self, price: float) -> float:
+        direction = 1 if self.side == 'long' else -1
+        return (price - self.entry_price) * self.size * direction
+
+    def stop_hit(self, high: float, low: float) -> bool:
+        """거래소 스탑로스 주문 체결 여부 (봉 안의 가격 경로를 모르므로 신호 청산보다 먼저 확인)"""
+        return low <= self.stop_price if self.side == 'long' else high >= self.stop_price
+
+    def close(self, timestamp: int, price: float, reason: str) -> None:
+        fees = (self.entry_price * self.config.maker_fee_pct +
+                price * self.config.taker_fee_pct) * self.size / 100
+        pnl = self.unrealized_pnl(price) - fees
+        self.balance += pnl
+        self.metrics.update(pnl)
+        self.peak = max(self.peak, self.balance)
+        drawdown = (self.peak - self.balance) / self.peak * 100 if self.peak > 0 else 0.0
+        self.metrics.max_drawdown = max(self.metrics.max_drawdown, drawdown)
+        self.trades.append(BacktestTrade(
+            side=self.side, entry_time=self.entry_time, exit_time=timestamp,
+            entry_price=self.entry_price, exit_price=price, size=self.size,
+            leverage=self.leverage, pnl=pnl, exit_reason=reason
+        ))
+        self.side = None
+
+    def result(self, mode: str, bars: int, started: float) -> BacktestResult:
+        return BacktestResult(
+            mode=mode, metrics=self.metrics, trades=self.trades,
+            initial_balance=self.config.initial_balance, final_balance=self.balance,
+            bars=bars, elapsed=time.perf_counter() - started
+        )
+
+def windowed_ema(close: np.ndarray, span: int, window: int) -> np.ndarray:
+    """IndicatorEngine._WindowedEMA 와 같은 값 - 최근 window 개 봉의 ewm(span, adjust=False)
+
+    창이 가득 찬 뒤에는 가중치가 고정된 FIR 필터이므로 convolve 로 한 번에 계산한다.
+    """
+    alpha = 2.0 / (span + 1.0)
+    beta = 1.0 - alpha
+    n = len(close)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    # 지연 k 봉 전 종가의 가중치: a*b^k (k < m), 창의 첫 봉(시드)은 b^m
+    full_weights = alpha * beta ** np.arange(window, dtype=np.float64)
+    full_weights[window - 1] = beta ** (window - 1)
+    if n >= window:
+        out[window - 1:] = np.convolve(close, full_weights, mode='valid')
+    for t in range(min(n, window - 1)):
+        weights = alpha * beta ** np.arange(t + 1, dtype=np.float64)
+        weights[t] = beta ** t
+        out[t] = np.dot(weights, close[t::-1])
+    return out
+
+def rolling_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """IndicatorEngine.atr 와 같은 규칙의 ATR (봉 수가 period 미만이면 0)"""
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    cumulative = np.concatenate(([0.0], np.cumsum(true_range)))
+    atr = np.zeros(len(close))
+    if len(close) >= period:
+        atr[period - 1:] = (cumulative[period:] - cumulative[:-period]) / period
+    return atr
+
+def adjusted_leverage(atr: np.ndarray, max_leverage: int) -> np.ndarray:
+    """TradingStrategy._adjust_leverage 의 벡터화"""
+    with np.errstate(divide='ignore'):
+        ratio = np.where(atr > 0, 100 / atr, 1.0)
+    return np.clip((max_leverage * ratio).astype(np.int64), 5, max_leverage)
+
+def entry_signals(data: BacktestData, trading_config: TradingConfig, window: int):
+    """should_open_long / should_open_short 조건의 벡터화 (포지션 여부 제외)"""
+    close = data.close
+    ema200 = windowed_ema(close, 200, window)
+    price_change = np.concatenate(([np.nan], np.diff(close)))
+    cfg = trading_config
+
+    ratio_up = ((data.ls_ratio_slope > cfg.min_slope) |
+                (data.ls_ratio_acceleration > cfg.acceleration_threshold))
+    ratio_down = ((data.ls_ratio_slope < -cfg.min_slope) |
+                  (data.ls_ratio_acceleration < -cfg.acceleration_threshold))
+    long_signal = ratio_up & (close > ema200) & (price_change > 0) & (data.oi_rsi > 70)
+    short_signal = ratio_down & (close < ema200) & (price_change < 0) & (data.oi_rsi < 30)
+    # 지표는 봉이 2개 이상일 때부터 계산됨
+    long_signal[:1] = False
+    short_signal[:1] = False
+    return long_signal, short_signal
+
+def _find_exit(data: BacktestData, ledger: _Ledger, start: int, oi_exit: np.ndarray,
+               stop_loss_pct: float, chunk: int = 1440):
+    """진입 이후 첫 청산 봉 (index, 가격, 사유) - 없으면 None
+
+    거래소 스탑 > 손실 제한(unrealized_pl) > OI RSI 순서로 확인하며, 긴 보유에서도
+    전체 배열을 매번 훑지 않도록 구간 단위로 탐색한다.
+    """
+    direction = 1 if ledger.side == 'long' else -1
+    n = len(data)
+    while start < n:
+        end = min(n, start + chunk)
+        close = data.close[start:end]
+        if direction == 1:
+            stop = data.low[start:end] <= ledger.stop_price
+        else:
+            stop = data.high[start:end] >= ledger.stop_price
+        loss = (close - ledger.entry_price) * ledger.size * direction <= -stop_loss_pct
+        hits = np.flatnonzero(stop | loss | oi_exit[start:end])
+        if len(hits):
+            k = int(hits[0])
+            if stop[k]:
+                return start + k, ledger.stop_price, 'exchange_stop_loss'
+            return start + k, float(close[k]), 'stop_loss' if loss[k] else 'oi_rsi_condition'
+        start = end
+        chunk *= 2
+    return None
+
+def run_fast(data: BacktestData, trading_config: Optional[TradingConfig] = None,
+             config: Optional[BacktestConfig] = None) -> BacktestResult:
+    """벡터화 경로 - 신호는 배열로 계산하고 진입/청산 지점만 순차 탐색"""
+    started = time.perf_counter()
+    trading_config = trading_config or TradingConfig()
+    config = config or BacktestConfig()
+    ledger = _Ledger(config, trading_config)
+    n = len(data)
+    if n == 0:
+        return ledger.result('fast', 0, started)
+
+    long_signal, short_signal = entry_signals(data, trading_config, config.window)
+    leverage = adjusted_leverage(
+        rolling_atr(data.high, data.low, data.close, 14), trading_config.max_leverage)
+    candidates = np.flatnonzero(long_signal | short_signal)
+    long_exit = data.oi_valid & (data.oi_rsi <= 30)
+    short_exit = data.oi_valid & (data.oi_rsi >= 80)
+
+    i = 0
+    while True:
+        # 다음 진입 후보 (쿨다운이 지난 첫 신호)
+        k = np.searchsorted(candidates, i)
+        while k < len(candidates) and not ledger.can_enter(int(data.timestamp[candidates[k]])):
+            k += 1
+        if k >= len(candidates):
+            break
+        i = int(candidates[k])
+        side = 'long' if long_signal[i] else 'short'
+        if not ledger.open(side, int(data.timestamp[i]), float(data.close[i]), int(leverage[i])):
+            i += 1
+            continue
+
+        exit = _find_exit(data, ledger, i + 1, long_exit if side == 'long' else short_exit,
+                          trading_config.stop_loss_pct)
+        if exit is None:
+            ledger.close(int(data.timestamp[-1]), float(data.close[-1]), 'end_of_data')
+            break
+        j, price, reason = exit
+        ledger.close(int(data.timestamp[j]), price, reason)
+        # 청산한 봉에서는 진입하지 않음 (실거래 루프의 if/elif 와 동일)
+        i = j + 1
+
+    return ledger.result('fast', n, started)
+
+class _ReplayMarket:
+    """TradingStrategy 생성에 필요한 최소 시장 데이터 객체"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def get_stale_feeds(self) -> List[str]:
+        """재생에서는 오래된 시장 지표를 0 으로 바꿔 넣으므로 진입을 막지 않음"""
+        return []
+
+def _replay_position(ledger: _Ledger, symbol: str, price: float) -> Position:
+    return Position(
+        symbol=symbol, side=ledger.side, size=ledger.size, entry_price=ledger.entry_price,
+        stop_loss_price=ledger.stop_price, take_profit_price=0.0, timestamp=ledger.entry_time,
+        leverage=ledger.leverage, break_even_price=ledger.entry_price,
+        unrealized_pl=ledger.unrealized_pnl(price), margin_size=0.0, available=ledger.size,
+        locked=0.0, liquidation_price=0.0, margin_ratio=0.0, mark_price=price,
+        achieved_profits=0.0, total_fee=0.0, margin_mode='crossed'
+    )
+
+async def run_replay(data: BacktestData, trading_config: Optional[TradingConfig] = None,
+                     config: Optional[BacktestConfig] = None) -> BacktestResult:
+    """이벤트 재생 경로 - 실거래와 같은 지표 엔진과 전략 메서드 사용"""
+    started = time.perf_counter()
+    trading_config = trading_config or TradingConfig()
+    config = config or BacktestConfig()
+    ledger = _Ledger(config, trading_config)
+    strategy = TradingStrategy(_ReplayMarket(data.symbol), order_executor=None)
+    strategy.config = replace(trading_config)
+    engine = IndicatorEngine(window=config.window)
+    max_age_ms = config.sentiment_max_age * 1000
+
+    sentiment = data.sentiment
+    cursor = 0
+    current: Optional[Dict[str, float]] = None
+    n = len(data)
+    for i in range(n):
+        timestamp = int(data.timestamp[i])
+        candle = Candle(timestamp, float(data.open[i]), float(data.high[i]), float(data.low[i]),
+                        float(data.close[i]), float(data.volume[i]))
+        engine.update(candle, is_new_bar=True)
+
+        # 봉 마감 전에 저장된 시장 지표 행 반영
+        bar_close = timestamp + MINUTE_MS
+        while cursor < len(sentiment) and sentiment[cursor]['timestamp'] <= bar_close:
+            current = sentiment[cursor]
+            cursor += 1
+        fresh = current is not None and bar_close - current['timestamp'] <= max_age_ms
+
+        indicators = engine.price_indicators()
+        if not indicators:
+            continue
+        market_indicators = {
+            'ls_ratio_slope': current['ls_ratio_slope'] if fresh else 0.0,
+            'ls_ratio_acceleration': current['ls_ratio_acceleration'] if fresh else 0.0
+        }
+        indicators.update(market_indicators)
+        if fresh and current['open_interest'] > 0:
+            indicators['oi_oi_rsi'] = current['oi_rsi']
+
+        strategy.in_position = ledger.side is not None
+        if ledger.side is not None:
+            if ledger.stop_hit(candle.high, candle.low):
+                ledger.close(timestamp, ledger.stop_price, 'exchange_stop_loss')
+                continue
+            position = _replay_position(ledger, data.symbol, candle.close)
+            should_close, reason = await strategy.should_close_position(
+                position, indicators, market_indicators)
+            if should_close:
+                ledger.close(timestamp, candle.close, reason)
+        elif ledger.can_enter(timestamp):
+            leverage = strategy._adjust_leverage(engine.atr())
+            if strategy.should_open_long(indicators, market_indicators):
+                ledger.open('long', timestamp, candle.close, leverage)
+            elif strategy.should_open_short(indicators, market_indicators):
+                ledger.open('short', timestamp, candle.close, leverage)
+
+    if ledger.side is not None:
+        ledger.close(int(data.timestamp[-1]), float(data.close[-1]), 'end_of_data')
+    return ledger.result('replay', n, started)
+
+async def main() -> None:
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    symbol = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SYMBOL
+    mode = sys.argv[3] if len(sys.argv) > 3 else 'fast'
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # 재생 경로에서 전략의 조건 로그가 봉마다 찍히지 않도록
+    logging.getLogger('trading_strategy_implementation').setLevel(logging.WARNING)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    db_manager = DatabaseManager()
+    await db_manager.initialize()
+    try:
+        end_time = int(time.time() * 1000)
+        data = await load_backtest_data(end_time - days * 24 * 60 * MINUTE_MS, end_time, symbol)
+        if mode in ('fast', 'both'):
+            logger.info(f"Fast path: {run_fast(data).summary()}")
+        if mode in ('replay', 'both'):
+            logger.info(f"Replay path: {(await run_replay(data)).summary()}")
+    finally:
+        await db_manager.close()
+
+if __name__ == '__main__':
+    asyncio.run(main())
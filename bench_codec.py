@@ -0,0 +1,61 @@
+"""웹소켓 캔들 메시지 디코딩 마이크로벤치마크
+
+사용법: python bench_codec.py [반복 횟수]
+
+기존 경로(json.loads + f-string 디버그 로그 + float 변환)와 코덱별 새 경로
+(타입 디코딩 + 지연 로그)의 메시지당 CPU 시간을 비교한다.
+"""
+import json
+import logging
+import sys
+import time
+from codec import JsonCodec, _CODECS, _candle_rows
+
+logger = logging.getLogger('bench_codec')
+logger.setLevel(logging.INFO)  # 운영과 같이 DEBUG 비활성
+
+SAMPLE = json.dumps({
+    "action": "update",
+    "arg": {"instType": "USDT-FUTURES", "channel": "candle1m", "instId": "BTCUSDT"},
+    "data": [["1700000040000", "37321.5", "37330.1", "37310.2", "37325.8",
+              "152.337", "5684231.1842", "5684231.1842"]],
+    "ts": 1700000041234
+})
+
+def legacy(message: str) -> list:
+    data = json.loads(message)
+    logger.debug(f"Received data: {data}")
+    return _candle_rows(data['data'])
+
+def bench(func, message: str, iterations: int) -> float:
+    """메시지당 평균 CPU 시간 (마이크로초)"""
+    for _ in range(1000):
+        func(message)
+    start = time.process_time()
+    for _ in range(iterations):
+        func(message)
+    return (time.process_time() - start) / iterations * 1e6
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    baseline = bench(legacy, SAMPLE, iterations)
+    print(f"{'legacy json + f-string':28s} {baseline:7.2f} us/msg")
+
+    for name, (codec_class, module) in _CODECS.items():
+        if module is None:
+            print(f"{name:28s} not installed")
+            continue
+        codec = codec_class()
+
+        def decode(message: str, codec: JsonCodec = codec) -> list:
+            update = codec.decode_candle_message(message)
+            logger.debug("Received data: %s", message)
+            return update.rows
+
+        assert decode(SAMPLE) == legacy(SAMPLE)
+        elapsed = bench(decode, SAMPLE, iterations)
+        print(f"{name + ' typed + lazy log':28s} {elapsed:7.2f} us/msg "
+              f"(saved {baseline - elapsed:5.2f} us, {baseline / elapsed:4.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""파일 로그 핸들러 처리량 벤치마크
+
+사용법: python bench_logging.py [레코드 수]
+
+기존 방식(레코드마다 exists/getsize 확인 + aiofiles 로 열기/쓰기/flush + fsync)과
+BufferedAsyncRotatingFileHandler 의 fsync 정책별 처리량(레코드/초), 그리고 이벤트 루프와
+작업 스레드에서 호출한 emit 한 번의 비용(마이크로초)을 비교한다.
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from custom_logging.handlers import (BufferedAsyncRotatingFileHandler, LogWriterThread,
+                                     FSYNC_BATCH, FSYNC_INTERVAL, FSYNC_NEVER)
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def make_record(i: int) -> logging.LogRecord:
+    return logging.LogRecord('bench', logging.INFO, __file__, 0,
+                             'BTCUSDT candle update %d close=%.1f', (i, 37000 + i * 0.1), None)
+
+async def legacy(path: str, count: int) -> float:
+    """기존 _async_emit 의 레코드당 I/O 재현 (aiofiles 는 호출마다 스레드 풀 왕복)"""
+    formatter = logging.Formatter(FORMAT)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    for i in range(count):
+        msg = formatter.format(make_record(i))
+        if os.path.exists(path):
+            os.path.getsize(path)
+        f = await loop.run_in_executor(None, open, path, 'a', -1, 'utf-8')
+        await loop.run_in_executor(None, f.write, f"{msg}\n")
+        await loop.run_in_executor(None, f.flush)
+        os.fsync(f.fileno())
+        await loop.run_in_executor(None, f.close)
+    return time.perf_counter() - start
+
+async def batched(path: str, count: int, policy: str, threads: int = 0):
+    """(전체 기록 시간, emit 평균 비용 us) - threads > 0 이면 작업 스레드들에서 나눠 호출"""
+    writer = LogWriterThread(capacity=count * 2)  # 처리량 측정에서는 버리지 않음
+    handler = BufferedAsyncRotatingFileHandler(path, fsync_policy=policy, writer=writer)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    await handler.start()
+    records = [make_record(i) for i in range(count)]
+
+    def emit_all(chunk) -> None:
+        for record in chunk:
+            handler.emit(record)
+
+    start = time.perf_counter()
+    if threads:
+        workers = [threading.Thread(target=emit_all, args=(records[i::threads],)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        emit_all(records)
+    emit_elapsed = time.perf_counter() - start
+    await handler.stop()
+    elapsed = time.perf_counter() - start
+    assert handler.stats['records'] == count, handler.stats
+    return elapsed, emit_elapsed / count * 1e6
+
+async def overload(path: str, count: int) -> None:
+    """쓰기 스레드보다 빠르게 넣을 때 INFO 는 버리고 WARNING 은 모두 남는지 확인"""
+    writer = LogWriterThread(capacity=1000)
+    handler = BufferedAsyncRotatingFileHandler(path, fsync_policy=FSYNC_BATCH, writer=writer)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    await handler.start()
+    warnings = 0
+    for i in range(count):
+        record = make_record(i)
+        if i % 10 == 0:
+            record.levelno, record.levelname = logging.WARNING, 'WARNING'
+            warnings += 1
+        handler.emit(record)
+    await handler.stop()
+    with open(path) as f:
+        written_warnings = sum(1 for line in f if ' - WARNING - BTCUSDT' in line)
+    print(f"{'overload capacity=1000':26s} dropped {handler.dropped} INFO, "
+          f"kept {written_warnings}/{warnings} WARNING")
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed = await legacy(os.path.join(directory, 'legacy.log'), count)
+        baseline = count / elapsed
+        print(f"{'legacy per-record fsync':26s} {baseline:10.0f} records/sec")
+
+        for policy in (FSYNC_BATCH, FSYNC_INTERVAL, FSYNC_NEVER):
+            elapsed, emit_us = await batched(os.path.join(directory, f'{policy}.log'), count, policy)
+            rate = count / elapsed
+            print(f"{'writer thread fsync=' + policy:26s} {rate:10.0f} records/sec ({rate / baseline:5.1f}x), "
+                  f"emit {emit_us:.2f} us")
+
+        elapsed, emit_us = await batched(os.path.join(directory, 'threads.log'), count, FSYNC_INTERVAL, threads=4)
+        print(f"{'4 worker threads':26s} {count / elapsed:10.0f} records/sec, emit {emit_us:.2f} us")
+        await overload(os.path.join(directory, 'overload.log'), count)
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from database_manager import Candle, TIMEFRAME_MS
+from candle_buffer import CandleRingBuffer
+
+logger = logging.getLogger(__name__)
+
+def bucket_start(timestamp: int, timeframe_ms: int) -> int:
+    """봉 시작 시각 (UTC epoch 기준 정렬)"""
+    return timestamp - timestamp % timeframe_ms
+
+def aggregate_candles(timestamp: int, candles: List[Candle]) -> Candle:
+    """시간순 1분봉 목록을 하나의 봉으로 합침"""
+    quote_volumes = [c.quote_volume for c in candles if c.quote_volume is not None]
+    return Candle(
+        timestamp=timestamp,
+        open=candles[0].open,
+        high=max(c.high for c in candles),
+        low=min(c.low for c in candles),
+        close=candles[-1].close,
+        volume=sum(c.volume for c in candles),
+        quote_volume=sum(quote_volumes) if quote_volumes else None
+    )
+
+class _BucketState:
+    """진행 중인 상위 봉 하나의 증분 집계 상태
+
+    확정된 1분봉은 누적 값(committed)에 합치고, 진행 중인 1분봉(live)만 따로
+    두어 같은 분의 갱신은 O(1) 로 처리한다.
+    """
+
+    def __init__(self, start: int):
+        self.start = start
+        self.minutes: Dict[int, Candle] = {}
+        self.committed: Optional[Candle] = None
+        self.live: Optional[Candle] = None
+
+    def _commit(self, candle: Candle) -> None:
+        c = self.committed
+        if c is None:
+            self.committed = Candle(self.start, candle.open, candle.high, candle.low,
+                                    candle.close, candle.volume, candle.quote_volume)
+            return
+        c.high = max(c.high, candle.high)
+        c.low = min(c.low, candle.low)
+        c.close = candle.close
+        c.volume += candle.volume
+        if candle.quote_volume is not None:
+            c.quote_volume = (c.quote_volume or 0.0) + candle.quote_volume
+
+    def _recompute(self) -> None:
+        """지연 도착한 1분봉이 있으면 보관된 1분봉으로 다시 집계"""
+        ordered = [self.minutes[ts] for ts in sorted(self.minutes)]
+        self.committed = None
+        for candle in ordered[:-1]:
+            self._commit(candle)
+        self.live = ordered[-1] if ordered else None
+
+    def update(self, candle: Candle) -> None:
+        self.minutes[candle.timestamp] = candle
+        if self.live is None or candle.timestamp == self.live.timestamp:
+            self.live = candle
+        elif candle.timestamp > self.live.timestamp:
+            self._commit(self.live)
+            self.live = candle
+        else:
+            self._recompute()
+
+    def bar(self) -> Candle:
+        """committed + live 로 현재 봉 값 계산"""
+        live, c = self.live, self.committed
+        if c is None:
+            return Candle(self.start, live.open, live.high, live.low, live.close,
+                          live.volume, live.quote_volume)
+        quote_volume = c.quote_volume
+        if live.quote_volume is not None:
+            quote_volume = (quote_volume or 0.0) + live.quote_volume
+        return Candle(
+            timestamp=self.start,
+            open=c.open,
+            high=max(c.high, live.high),
+            low=min(c.low, live.low),
+            close=live.close,
+            volume=c.volume + live.volume,
+            quote_volume=quote_volume
+        )
+
+class TimeframeAggregator:
+    """1분봉 스트림으로 상위 타임프레임(5m/15m/1h/4h 등) 봉을 증분 유지"""
+
+    def __init__(self, timeframes: Iterable[str] = ('5m', '15m', '1h', '4h'), capacity: int = 200):
+        self.timeframes = tuple(timeframes)
+        for timeframe in self.timeframes:
+            if timeframe not in TIMEFRAME_MS or timeframe == '1m':
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
+        self.capacity = capacity
+        self.buffers: Dict[str, CandleRingBuffer] = {
+            timeframe: CandleRingBuffer(capacity) for timeframe in self.timeframes
+        }
+        self._states: Dict[str, Optional[_BucketState]] = {tf: None for tf in self.timeframes}
+
+    def update(self, candle: Candle) -> List[Tuple[str, Candle]]:
+        """1분봉 하나 반영 - 갱신된 (timeframe, 봉) 목록 반환"""
+        updated = []
+        for timeframe in self.timeframes:
+            start = bucket_start(candle.timestamp, TIMEFRAME_MS[timeframe])
+            state = self._states[timeframe]
+            if state is None or start > state.start:
+                state = self._states[timeframe] = _BucketState(start)
+            elif start < state.start:
+                # 이미 지난 봉의 1분봉 하나만으로는 봉을 다시 만들 수 없음 (apply_minutes 로 재집계)
+                continue
+
+            state.update(candle)
+            bar = state.bar()
+            self.buffers[timeframe].append(bar)
+            updated.append((timeframe, bar))
+        return updated
+
+    def apply_minutes(self, candles: List[Candle]) -> List[Tuple[str, Candle]]:
+        """1분봉 묶음으로 봉 재집계 (시작 시 / 백필 후)
+
+        봉 구간의 1분봉이 모두 포함되어 있어야 한다. 마지막 봉은 진행 중 상태로 이어받는다.
+        """
+        candles = sorted(candles, key=lambda c: c.timestamp)
+        updated = []
+        if not candles:
+            return updated
+
+        for timeframe in self.timeframes:
+            timeframe_ms = TIMEFRAME_MS[timeframe]
+            groups: Dict[int, List[Candle]] = {}
+            for candle in candles:
+                groups.setdefault(bucket_start(candle.timestamp, timeframe_ms), []).append(candle)
+
+            bars = {start: aggregate_candles(start, minutes) for start, minutes in groups.items()}
+
+            # 가장 최근 봉은 이후 스트림 갱신이 이어지도록 상태 재구성
+            last_start = max(groups)
+            state = self._states[timeframe]
+            if state is None or last_start >= state.start:
+                new_state = _BucketState(last_start)
+                new_state.minutes = {c.timestamp: c for c in groups[last_start]}
+                if state and state.start == last_start:
+                    # 스트림으로 받은 값이 DB 값보다 최신
+                    new_state.minutes.update(state.minutes)
+                new_state._recompute()
+                self._states[timeframe] = new_state
+                bars[last_start] = new_state.bar()
+
+            buffer = self.buffers[timeframe]
+            for start in sorted(bars):
+                buffer.append(bars[start])
+                updated.append((timeframe, bars[start]))
+        return updated
+
+    def load(self, timeframe: str, bars: Iterable[Candle]) -> None:
+        """저장된 상위 봉으로 버퍼 채우기 (시간 오름차순)"""
+        self.buffers[timeframe].extend(bars)
+
+    def window(self, timeframe: str, lookback: int):
+        return self.buffers[timeframe].window(lookback)
+
+    def to_candles(self, timeframe: str, lookback: int) -> List[Candle]:
+        return self.buffers[timeframe].to_candles(lookback)
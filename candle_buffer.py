@@ -0,0 +1,147 @@
+import numpy as np
+import logging
+from typing import Dict, List, Iterable, Optional
+from database_manager import Candle
+
+logger = logging.getLogger(__name__)
+
+# append() 결과 상태
+APPENDED = 'appended'   # 새 봉이 뒤에 추가됨
+REPLACED = 'replaced'   # 진행 중인 마지막 봉이 갱신됨
+INSERTED = 'inserted'   # 과거 봉이 수정/삽입됨 (지표 재계산 필요)
+IGNORED = 'ignored'     # 버퍼 범위를 벗어난 오래된 봉
+
+class CandleRingBuffer:
+    """고정 크기 타임스탬프 인덱스 컬럼형 캔들 링 버퍼
+
+    각 값은 슬롯 i 와 i + capacity 에 두 번 기록된다. 덕분에 최근 N개 봉은
+    항상 하나의 연속 구간이 되어 복사 없이 시간순 뷰로 반환할 수 있다.
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'quote_volume')
+
+    def __init__(self, capacity: int = 200):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity * 2, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {
+            field: np.full(capacity * 2, np.nan, dtype=np.float64)
+            for field in self.FIELDS
+        }
+        self._head = -1  # 가장 최근 봉의 슬롯 (0 ~ capacity-1)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def latest_timestamp(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self._timestamps[self._head])
+
+    def _write(self, slot: int, candle: Candle) -> None:
+        """슬롯과 미러 슬롯에 캔들 값 기록"""
+        mirror = slot + self.capacity
+        self._timestamps[slot] = self._timestamps[mirror] = candle.timestamp
+        values = (candle.open, candle.high, candle.low, candle.close, candle.volume,
+                  candle.quote_volume if candle.quote_volume is not None else np.nan)
+        for field, value in zip(self.FIELDS, values):
+            column = self._columns[field]
+            column[slot] = column[mirror] = value
+
+    def append(self, candle: Candle) -> str:
+        """캔들 추가 또는 갱신 - 최신 봉 기준 O(1)"""
+        if self._count == 0 or candle.timestamp > self._timestamps[self._head]:
+            self._head = (self._head + 1) % self.capacity
+            self._write(self._head, candle)
+            self._count = min(self._count + 1, self.capacity)
+            return APPENDED
+
+        if candle.timestamp == self._timestamps[self._head]:
+            self._write(self._head, candle)
+            return REPLACED
+
+        return self._insert_past(candle)
+
+    def _insert_past(self, candle: Candle) -> str:
+        """최신 봉보다 과거인 캔들 처리 (백필/지연 도착)"""
+        timestamps = self._window_slice(self._timestamps, self._count)
+        if candle.timestamp < timestamps[0]:
+            if self._count < self.capacity:
+                # 아직 여유가 있으면 앞쪽에 끼워 넣기 위해 재구성
+                self._rebuild(self.to_candles(self._count)[::-1] + [candle])
+                return INSERTED
+            return IGNORED
+
+        index = int(np.searchsorted(timestamps, candle.timestamp))
+        if timestamps[index] == candle.timestamp:
+            slot = (self._head - (self._count - 1 - index)) % self.capacity
+            self._write(slot, candle)
+            return INSERTED
+
+        # 중간이 비어 있던 봉은 정렬 순서를 유지하도록 재구성
+        self._rebuild(self.to_candles(self._count)[::-1] + [candle])
+        return INSERTED
+
+    def _rebuild(self, candles: List[Candle]) -> None:
+        """캔들 목록으로 버퍼 재구성 (오래된 봉은 용량에 맞게 버림)"""
+        candles = sorted(candles, key=lambda c: c.timestamp)[-self.capacity:]
+        self.clear()
+        for candle in candles:
+            self.append(candle)
+
+    def extend(self, candles: Iterable[Candle]) -> None:
+        """여러 캔들 추가 (시간 오름차순 권장)"""
+        for candle in candles:
+            self.append(candle)
+
+    def clear(self) -> None:
+        self._head = -1
+        self._count = 0
+
+    def _window_slice(self, column: np.ndarray, lookback: int) -> np.ndarray:
+        end = self._head + self.capacity + 1
+        return column[end - lookback:end]
+
+    def window(self, lookback: int) -> Dict[str, np.ndarray]:
+        """최근 N개 봉의 시간순(오래된 것 → 최신) 읽기 전용 뷰"""
+        lookback = max(0, min(lookback, self._count))
+        if lookback == 0:
+            empty = {field: np.empty(0, dtype=np.float64) for field in self.FIELDS}
+            empty['timestamp'] = np.empty(0, dtype=np.int64)
+            return empty
+
+        views = {'timestamp': self._window_slice(self._timestamps, lookback)}
+        for field in self.FIELDS:
+            views[field] = self._window_slice(self._columns[field], lookback)
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    def column(self, field: str, lookback: int) -> np.ndarray:
+        """단일 컬럼의 최근 N개 뷰"""
+        return self.window(lookback)[field]
+
+    def latest(self) -> Optional[Candle]:
+        """가장 최근 봉"""
+        candles = self.to_candles(1)
+        return candles[0] if candles else None
+
+    def to_candles(self, lookback: int) -> List[Candle]:
+        """최근 N개 봉을 Candle 리스트로 변환 (최신 순)"""
+        data = self.window(lookback)
+        candles = []
+        for i in range(len(data['timestamp']) - 1, -1, -1):
+            quote_volume = float(data['quote_volume'][i])
+            candles.append(Candle(
+                timestamp=int(data['timestamp'][i]),
+                open=float(data['open'][i]),
+                high=float(data['high'][i]),
+                low=float(data['low'][i]),
+                close=float(data['close'][i]),
+                volume=float(data['volume'][i]),
+                quote_volume=None if np.isnan(quote_volume) else quote_volume
+            ))
+        return candles
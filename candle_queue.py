@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from codec import CandleRow
+
+logger = logging.getLogger(__name__)
+
+# 큐가 가득 찼을 때 정책
+POLICY_BLOCK = 'block'          # 수신 태스크가 자리가 날 때까지 대기
+POLICY_HOLD_LIVE = 'hold_live'  # 진행 중인 봉은 심볼별 1칸 보류 슬롯에 두고 수신은 계속
+
+# (symbol, row, 처음 수신 시각 monotonic)
+QueuedCandle = Tuple[str, CandleRow, float]
+
+class CandleUpdateQueue:
+    """(symbol, timestamp) 단위로 병합되는 제한 크기 캔들 갱신 큐
+
+    같은 봉의 갱신은 큐 안에서 최신 값으로 덮어쓰므로 중간 값만 사라지고 봉의
+    최종 값은 항상 남는다. maxsize 는 서로 다른 봉의 수 기준이다.
+    """
+
+    def __init__(self, maxsize: int = 1000, policy: str = POLICY_HOLD_LIVE):
+        if policy not in (POLICY_BLOCK, POLICY_HOLD_LIVE):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._pending: 'OrderedDict[Tuple[str, int], Tuple[CandleRow, float]]' = OrderedDict()
+        # hold_live: 큐가 가득 찼을 때 받은 진행 중 봉 (심볼당 최대 1개)
+        self._held: Dict[str, Tuple[CandleRow, float]] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.stats = {
+            'received': 0,
+            'coalesced': 0,
+            'held': 0,
+            'blocked_puts': 0,
+            'block_wait_ms': 0.0,
+            'max_depth': 0
+        }
+
+    def qsize(self) -> int:
+        return len(self._pending) + len(self._held)
+
+    def _insert(self, key: Tuple[str, int], row: CandleRow, received_at: float) -> None:
+        self._pending[key] = (row, received_at)
+        self.stats['max_depth'] = max(self.stats['max_depth'], self.qsize())
+        if len(self._pending) >= self.maxsize:
+            self._not_full.clear()
+        self._not_empty.set()
+
+    async def _insert_when_free(self, key: Tuple[str, int], row: CandleRow, received_at: float) -> None:
+        if len(self._pending) >= self.maxsize:
+            self.stats['blocked_puts'] += 1
+            start = time.monotonic()
+            while len(self._pending) >= self.maxsize:
+                self._not_full.clear()
+                await self._not_full.wait()
+            self.stats['block_wait_ms'] += (time.monotonic() - start) * 1000
+        # 대기 중 같은 봉이 먼저 들어왔으면 최신 값으로 병합
+        if key in self._pending:
+            self._pending[key] = (row, self._pending[key][1])
+        else:
+            self._insert(key, row, received_at)
+
+    async def put(self, symbol: str, row: CandleRow, received_at: Optional[float] = None) -> None:
+        """캔들 갱신 추가 - 같은 봉이 대기 중이면 병합"""
+        received_at = received_at or time.monotonic()
+        self.stats['received'] += 1
+        key = (symbol, row[0])
+
+        if key in self._pending:
+            # 대기 시간은 처리되지 않은 가장 오래된 수신 시각 기준
+            self._pending[key] = (row, self._pending[key][1])
+            self.stats['coalesced'] += 1
+            return
+
+        held = self._held.get(symbol)
+        if held is not None:
+            if held[0][0] == row[0]:
+                self._held[symbol] = (row, held[1])
+                self.stats['coalesced'] += 1
+                return
+            if row[0] > held[0][0]:
+                # 새 봉이 시작되어 보류 중이던 봉이 확정됨 - 최종 값이므로 반드시 큐에 넣음
+                del self._held[symbol]
+                await self._insert_when_free((symbol, held[0][0]), *held)
+
+        # 보류 봉보다 과거인 지연 갱신은 보류하지 않고 큐에 넣음
+        if (len(self._pending) >= self.maxsize and self.policy == POLICY_HOLD_LIVE
+                and symbol not in self._held):
+            self._held[symbol] = (row, received_at)
+            self.stats['held'] += 1
+            self._not_empty.set()
+            return
+
+        await self._insert_when_free(key, row, received_at)
+
+    def _promote_held(self) -> None:
+        """자리가 나면 보류 슬롯의 봉을 큐 끝으로 옮김 (보류 봉이 심볼의 최신 봉이라 순서 유지)"""
+        while self._held and len(self._pending) < self.maxsize:
+            symbol = next(iter(self._held))
+            row, received_at = self._held.pop(symbol)
+            self._pending[(symbol, row[0])] = (row, received_at)
+
+    async def get_batch(self, max_items: int = 100) -> List[QueuedCandle]:
+        """대기 중인 갱신을 들어온 순서대로 최대 max_items 개 꺼냄"""
+        while not self._pending and not self._held:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        batch: List[QueuedCandle] = []
+        self._promote_held()
+        while self._pending and len(batch) < max_items:
+            (symbol, _), (row, received_at) = self._pending.popitem(last=False)
+            batch.append((symbol, row, received_at))
+        self._promote_held()
+
+        if len(self._pending) < self.maxsize:
+            self._not_full.set()
+        if not self._pending and not self._held:
+            self._not_empty.clear()
+        return batch
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # 선택 의존성
+    msgspec = None
+
+# (timestamp, open, high, low, close, volume, quote_volume) - Candle 필드 순서와 동일
+CandleRow = Tuple[int, float, float, float, float, float, Optional[float]]
+
+class CandleUpdate(NamedTuple):
+    """웹소켓 캔들 메시지 디코딩 결과"""
+    action: str
+    symbol: Optional[str]
+    rows: List[CandleRow]
+    message: Optional[dict] = None  # 캔들 데이터가 아닌 메시지(이벤트/오류)는 원본 dict
+    ts: Optional[int] = None        # 거래소 발송 시각 (ms)
+
+def _candle_rows(data: List[list]) -> List[CandleRow]:
+    """문자열 배열 캔들 데이터를 숫자 튜플로 변환"""
+    return [
+        (int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]),
+         float(row[5]), float(row[6]) if len(row) > 6 else None)
+        for row in data
+        if len(row) >= 6
+    ]
+
+class JsonCodec:
+    """표준 라이브러리 json 코덱 (기본 폴백)"""
+
+    name = 'json'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def decode_candle_message(self, data: Union[bytes, str]) -> CandleUpdate:
+        message = self.loads(data)
+        rows = message.get('data')
+        if not isinstance(rows, list):
+            return CandleUpdate(message.get('action', ''), None, [], message)
+        return CandleUpdate(message.get('action', ''), message.get('arg', {}).get('instId'),
+                            _candle_rows(rows), ts=message.get('ts'))
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+if msgspec is not None:
+    class _CandleMessage(msgspec.Struct):
+        action: str = ''
+        arg: Dict[str, str] = {}
+        data: Optional[List[Tuple[float, ...]]] = None
+        ts: Optional[int] = None
+
+class MsgspecCodec(JsonCodec):
+    """msgspec 코덱 - 캔들 메시지는 스키마로 바로 숫자 디코딩"""
+
+    name = 'msgspec'
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        # strict=False: "64321.5" 같은 문자열 숫자를 float 으로 변환
+        self._candle_decoder = msgspec.json.Decoder(_CandleMessage, strict=False)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj).decode()
+
+    def decode_candle_message(self, data: Union[bytes, str]) -> CandleUpdate:
+        try:
+            message = self._candle_decoder.decode(data)
+        except msgspec.ValidationError:
+            # 캔들 형식이 아닌 메시지는 일반 경로로 처리
+            return super().decode_candle_message(data)
+        if message.data is None:
+            return CandleUpdate(message.action, None, [], self.loads(data))
+        rows = [
+            (int(row[0]), row[1], row[2], row[3], row[4], row[5],
+             row[6] if len(row) > 6 else None)
+            for row in message.data
+            if len(row) >= 6
+        ]
+        return CandleUpdate(message.action, message.arg.get('instId'), rows, ts=message.ts)
+
+_CODECS = {
+    'msgspec': (MsgspecCodec, msgspec),
+    'orjson': (OrjsonCodec, orjson),
+    'json': (JsonCodec, json),
+}
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """사용 가능한 가장 빠른 코덱 반환 (JSON_CODEC 환경변수로 지정 가능)"""
+    name = name or os.getenv('JSON_CODEC')
+    if name:
+        codec_class, module = _CODECS.get(name, (None, None))
+        if module is not None:
+            return codec_class()
+        logger.warning(f"JSON codec {name} not available, falling back")
+
+    for codec_class, module in _CODECS.values():
+        if module is not None:
+            return codec_class()
+    return JsonCodec()
+
+codec = get_codec()
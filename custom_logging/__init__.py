@@ -1,9 +1,17 @@
-from .handlers import BufferedAsyncRotatingFileHandler, AsyncAPILogHandler
+from .handlers import (BufferedAsyncRotatingFileHandler, AsyncAPILogHandler, LogWriterThread,
+                       default_writer, FSYNC_BATCH, FSYNC_INTERVAL, FSYNC_NEVER)
+from .formatters import JsonLineFormatter
 from .setup import setup_logging, cleanup_logging
 
 __all__ = [
     'BufferedAsyncRotatingFileHandler',
     'AsyncAPILogHandler',
+    'LogWriterThread',
+    'default_writer',
+    'JsonLineFormatter',
+    'FSYNC_BATCH',
+    'FSYNC_INTERVAL',
+    'FSYNC_NEVER',
     'setup_logging',
     'cleanup_logging'
 ]
\ No newline at end of file
@@ -0,0 +1,39 @@
+import json
+import logging
+from codec import codec
+
+# LogRecord 기본 속성 - 이 외의 속성은 extra 로 전달된 필드
+_STANDARD_ATTRS = frozenset(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {
+    'message', 'asctime', 'taskName'
+}
+
+class JsonLineFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (JSONL) - extra 필드(action, response, method, url 등)를 그대로 보존
+
+    기본 키: ts (epoch 초), time, level, logger, msg. 예외가 있으면 exc.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': record.created,
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+
+        try:
+            return codec.dumps(entry)
+        except (TypeError, ValueError):
+            # 직렬화할 수 없는 extra 값은 문자열로
+            return json.dumps(entry, default=str)
@@ -1,244 +1,435 @@
 import logging
 import logging.handlers
 import asyncio
-from typing import Optional, List
+import glob
+import gzip
+import queue
+import shutil
+import sys
+import threading
+from typing import Dict, Optional, List
 from datetime import datetime
 import os
-import aiofiles
-import async_timeout
+import time
+from codec import codec
+from .formatters import _STANDARD_ATTRS
+
+# fsync 정책
+FSYNC_BATCH = 'batch'        # 배치를 쓸 때마다 fsync
+FSYNC_INTERVAL = 'interval'  # fsync_interval 초마다 최대 한 번
+FSYNC_NEVER = 'never'        # OS 에 맡김 (종료 시에도 fsync 하지 않음)
+
+_STOP = object()  # 쓰기 스레드 종료 표시
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+PENDING_SUFFIX = '.pending-'  # 압축 대기 중인 회전 파일 (name.pending-<time_ns>)
+
+def _snapshot(value):
+    """extra 값의 현재 상태 복사본 (JSON 으로 표현 가능하면 구조 유지, 아니면 문자열)"""
+    try:
+        return codec.loads(codec.dumps(value))
+    except Exception:
+        return str(value)
+
+class LogWriterThread:
+    """모든 파일 핸들러의 레코드를 받아 기록하는 단일 쓰기 스레드
+
+    emit 은 어느 스레드/이벤트 루프에서 호출되든 SimpleQueue 에 넣기만 하고, 포맷과
+    파일 I/O 는 이 스레드가 모두 맡는다. 로그 파일은 이 스레드만 연다.
+
+    과부하 정책: 대기 레코드가 capacity 이상이면 drop_level 미만(기본 INFO 이하)의 새
+    레코드는 버리고 핸들러별로 개수를 센다. WARNING 이상은 버리지 않는다. 버린 개수는
+    다음 배치를 쓸 때 해당 로그 파일에 한 줄로 남긴다.
+
+    메시지 % 인자는 쓰기 스레드에서 합쳐진다 (이 저장소의 로그 호출은 대부분 f-string).
+    """
+
+    def __init__(self, capacity: int = 10000, batch_size: int = 500,
+                 drop_level: int = logging.WARNING, idle_interval: float = 1.0):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.drop_level = drop_level
+        self.idle_interval = idle_interval  # 한가할 때 interval fsync 확인 주기 (초)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handlers = set()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # 등록/해제 전용
+        self.stats = {
+            'batches': 0,
+            'written': 0,
+            'max_depth': 0,
+            'errors': 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def register(self, handler: 'BufferedAsyncRotatingFileHandler') -> None:
+        with self._lock:
+            self._handlers.add(handler)
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def unregister(self, handler: 'BufferedAsyncRotatingFileHandler') -> threading.Event:
+        """앞서 들어온 레코드를 모두 쓴 뒤 파일을 닫도록 요청 - 완료 이벤트 반환"""
+        closed = threading.Event()
+        with self._lock:
+            if handler not in self._handlers or not self.running:
+                self._handlers.discard(handler)
+                handler._close_stream_safely()
+                closed.set()
+                return closed
+            self._handlers.discard(handler)
+            self._queue.put((handler, closed))
+            if not self._handlers:
+                self._queue.put(_STOP)
+        return closed
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            'depth': self._queue.qsize(),
+            'dropped': {os.path.basename(h.baseFilename): h.dropped for h in list(self._handlers) if h.dropped}
+        }
+
+    def submit(self, handler: 'BufferedAsyncRotatingFileHandler', record: logging.LogRecord) -> bool:
+        """레코드 전달 (emit 경로) - 버려졌으면 False"""
+        if record.levelno < self.drop_level and self._queue.qsize() >= self.capacity:
+            handler.dropped += 1
+            return False
+        self._queue.put((handler, record))
+        return True
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_interval)
+            except queue.Empty:
+                for handler in list(self._handlers):
+                    handler._sync_if_due()
+                continue
+
+            items = [item]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(items) + self._queue.qsize())
+            if not self._process(items):
+                with self._lock:
+                    # 종료 요청 뒤 다시 등록된 핸들러가 있으면 계속 실행
+                    if not self._handlers:
+                        self._thread = None
+                        return
+
+    def _process(self, items: list) -> bool:
+        """배치를 핸들러별로 모아 파일당 한 번에 기록 - 종료 요청이면 False"""
+        pending: Dict['BufferedAsyncRotatingFileHandler', List[logging.LogRecord]] = {}
+        keep_running = True
+        for item in items:
+            if item is _STOP:
+                keep_running = False
+                continue
+            handler, payload = item
+            if isinstance(payload, threading.Event):
+                # 닫기 요청 전에 들어온 레코드를 먼저 기록
+                self._write(handler, pending.pop(handler, []))
+                handler._close_stream_safely()
+                payload.set()
+            else:
+                pending.setdefault(handler, []).append(payload)
+
+        for handler, records in pending.items():
+            self._write(handler, records)
+        self.stats['batches'] += 1
+        return keep_running
+
+    def _write(self, handler: 'BufferedAsyncRotatingFileHandler', records: List[logging.LogRecord]) -> None:
+        if not records and handler.dropped == handler.reported_drops:
+            return
+        try:
+            data = handler._format_batch(records)
+            if data:
+                handler._write_batch(data, len(records))
+                self.stats['written'] += len(records)
+        except Exception as e:
+            self.stats['errors'] += 1
+            handler.stats['errors'] += 1
+            # 루트 로거로 보내면 다시 이 스레드로 들어오므로 stderr 로만 보고
+            print(f"Error writing log batch to {handler.baseFilename}: {e}", file=sys.stderr)
+
+# 기본 공유 쓰기 스레드 (setup_logging 의 모든 파일 핸들러가 사용)
+default_writer = LogWriterThread()
 
 class BufferedAsyncRotatingFileHandler(logging.Handler):
     def __init__(self, filename: str, max_bytes: int = 50*1024*1024,
                  backup_count: int = 10, encoding: str = 'utf-8',
-                 buffer_size: int = 1000):
+                 fsync_policy: str = FSYNC_INTERVAL, fsync_interval: float = 1.0,
+                 writer: Optional[LogWriterThread] = None, compress: bool = False):
         super().__init__()
+        if fsync_policy not in (FSYNC_BATCH, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
         self.baseFilename = filename  # filename을 baseFilename으로 저장
         self.filename = filename      # 원본 filename도 유지
         self.maxBytes = max_bytes
         self.backupCount = backup_count
         self.encoding = encoding
-        self.queue = asyncio.Queue(maxsize=buffer_size)
-        self.lock = asyncio.Lock()
-        self._worker = None
+        self.compress = compress  # 회전된 파일을 .gz 로 압축 (별도 스레드)
+        self.compress_wait_timeout = 10.0  # 종료 시 진행 중인 압축을 기다리는 최대 시간 (초)
+        self._compress_lock = threading.Lock()
+        self._compressors: List[threading.Thread] = []
+        self.writer = writer or default_writer
+        self._started = False
         self._stopping = False
-        self._buffer = []
-        self._buffer_size = buffer_size
-        self._last_flush = datetime.now()
-        self._flush_interval = 5
+        self.dropped = 0          # 과부하로 버린 레코드 수 (emit 스레드에서 증가)
+        self.reported_drops = 0   # 로그 파일에 기록한 누적 버림 수
+        
+        # 열어 둔 채로 재사용하는 파일 (쓰기 스레드에서만 접근)
+        self.stream = None
+        self._size = 0               # 현재 파일 크기 (쓴 바이트 수로 추적)
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self.stats = {
+            'records': 0,
+            'batches': 0,
+            'bytes': 0,
+            'fsyncs': 0,
+            'rollovers': 0,
+            'compressions': 0,
+            'errors': 0
+        }
 
     def acquire(self):
-        """동기 메서드를 비동기로 오버라이드"""
-        pass  # 실제 락은 async emit에서 처리
+        """emit 은 큐에 넣기만 하므로 핸들러 락 불필요"""
+        pass
         
     def release(self):
-        """동기 메서드를 비동기로 오버라이드"""
-        pass  # 실제 락은 async emit에서 처리
+        pass
         
     def do_rollover(self):
-        """동기 롤오버 메서드"""
-        if self.backupCount > 0:
-            for i in range(self.backupCount - 1, 0, -1):
-                sfn = f"{self.filename}.{i}"
-                dfn = f"{self.filename}.{i + 1}"
-                if os.path.exists(sfn):
-                    if os.path.exists(dfn):
-                        os.remove(dfn)
-                    os.rename(sfn, dfn)
-            dfn = f"{self.filename}.1"
-            if os.path.exists(dfn):
-                os.remove(dfn)
-            if os.path.exists(self.filename):
-                os.rename(self.filename, dfn)
-                
-    def shouldRollover(self, record):
-        """롤오버가 필요한지 확인"""
-        if not os.path.exists(self.filename):
-            return False
-        if self.maxBytes > 0:
-            try:
-                size = os.path.getsize(self.filename)
-                return size >= self.maxBytes
-            except OSError:
-                return False
-        return False
-        
-    async def start(self) -> None:
-        """비동기 워커 시작"""
-        if self._worker is None:
-            self._worker = asyncio.create_task(self._async_worker())
-            await asyncio.sleep(0)  # 워커가 시작되도록 제어권 양보
+        """동기 롤오버 메서드 (쓰기 스레드에서 실행)
 
-    async def stop(self) -> None:
-        """핸들러 정상 종료"""
-        if not self._stopping:
-            self._stopping = True
-            try:
-                # 남은 버퍼 처리
-                if self._buffer:
-                    for record in self._buffer:
-                        await self.queue.put(record)
-                    self._buffer.clear()
+        compress 이면 현재 파일을 대기 이름(name.pending-<ns>)으로 바꾸기만 하고, gzip 압축과
+        name.N.gz 순번 이동/backup_count 정리는 압축 스레드가 맡는다 (쓰기 스레드를 막지 않음).
+        """
+        if self.backupCount <= 0 or not os.path.exists(self.filename):
+            return
+        if self.compress:
+            os.rename(self.filename, f"{self.filename}{PENDING_SUFFIX}{time.time_ns()}")
+            self._start_compressor()
+            return
+        self._shift_backups('')
+        os.rename(self.filename, f"{self.filename}.1")
+
+    def _shift_backups(self, suffix: str) -> None:
+        """name.N{suffix} 를 한 칸씩 밀고 backup_count 를 넘는 파일 정리"""
+        for i in range(self.backupCount - 1, 0, -1):
+            sfn = f"{self.filename}.{i}{suffix}"
+            dfn = f"{self.filename}.{i + 1}{suffix}"
+            if os.path.exists(sfn):
+                if os.path.exists(dfn):
+                    os.remove(dfn)
+                os.rename(sfn, dfn)
+        dfn = f"{self.filename}.1{suffix}"
+        if os.path.exists(dfn):
+            os.remove(dfn)
+
+    def _start_compressor(self) -> None:
+        thread = threading.Thread(target=self._compress_pending, daemon=True,
+                                  name=f"log-compress-{os.path.basename(self.filename)}")
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+        thread.start()
+
+    def _compress_pending(self) -> None:
+        """대기 중인 회전 파일을 오래된 것부터 압축 (중단된 이전 실행의 파일 포함)"""
+        pattern = glob.escape(self.filename) + PENDING_SUFFIX + '*'
+        with self._compress_lock:
+            while True:
+                pendings = sorted(p for p in glob.glob(pattern) if not p.endswith('.tmp'))
+                if not pendings:
+                    return
+                # 압축이 회전을 따라가지 못하면 어차피 backup_count 밖으로 밀려날 파일은 바로 삭제
+                for stale in pendings[:-self.backupCount]:
+                    os.remove(stale)
+                pending = pendings[-self.backupCount:][0]
+                try:
+                    temp = f"{pending}.gz.tmp"
+                    self._compress(pending, temp)
+                    # 압축이 끝난 뒤에 순번 이동/정리 - 완성된 .gz 만 backup_count 에 포함
+                    self._shift_backups('.gz')
+                    os.replace(temp, f"{self.filename}.1.gz")
+                    os.remove(pending)
+                    self.stats['compressions'] += 1
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Error compressing log file {pending}: {e}", file=sys.stderr)
+                    return  # 같은 파일을 계속 재시도하지 않음 (다음 회전/시작 때 재시도)
+
+    def _wait_compressors(self, timeout: float) -> None:
+        """진행 중인 압축 대기 (남은 파일은 다음 시작 때 이어서 압축)"""
+        deadline = time.monotonic() + timeout
+        for thread in self._compressors:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    @staticmethod
+    def _compress(source: str, target: str) -> None:
+        """gzip 압축 (level 1)"""
+        with open(source, 'rb') as src, gzip.open(target, 'wb', compresslevel=1) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
                 
-                # 큐가 비워질 때까지 대기
-                if self._worker:
-                    try:
-                        async with async_timeout.timeout(5):  # 최대 5초 대기
-                            while not self.queue.empty():
-                                await asyncio.sleep(0.1)
-                    except asyncio.TimeoutError:
-                        logging.error("Timeout waiting for queue to empty")
-                    
-                    self._worker.cancel()
-                    try:
-                        await self._worker
-                    except asyncio.CancelledError:
-                        pass
-                    self._worker = None
-            except Exception as e:
-                logging.error(f"Error during handler shutdown: {e}")
+    def shouldRollover(self, record):
+        """롤오버가 필요한지 확인 (추적 중인 파일 크기 기준)"""
+        return self.maxBytes > 0 and self._size >= self.maxBytes
 
-    def emit(self, record: logging.LogRecord) -> None:
-        """로그 레코드를 버퍼에 추가"""
-        try:
-            # 중요 로그는 즉시 처리
-            if record.levelno >= logging.ERROR:
-                asyncio.create_task(self._async_emit(record))
-                return
+    def _open_stream(self) -> None:
+        self.stream = open(self.baseFilename, 'ab')
+        self._size = self.stream.tell()  # 추가 모드는 파일 끝에서 시작
 
-            if len(self._buffer) >= self._buffer_size:
-                asyncio.create_task(self._flush_buffer())
-            self._buffer.append(record)
-            
-            # 시간 기반 강제 플러시
-            now = datetime.now()
-            if (now - self._last_flush).seconds >= self._flush_interval:
-                asyncio.create_task(self._flush_buffer())
-        except Exception:
-            self.handleError(record)
+    def _fsync(self) -> None:
+        os.fsync(self.stream.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self.stats['fsyncs'] += 1
 
-    async def _flush_buffer(self) -> None:
-        """버퍼 비우기"""
-        if not self._buffer:
+    def _close_stream(self) -> None:
+        if self.stream is None:
             return
+        try:
+            self.stream.flush()
+            if self._unsynced and self.fsync_policy != FSYNC_NEVER:
+                self._fsync()
+        finally:
+            self.stream.close()
+            self.stream = None
 
+    def _close_stream_safely(self) -> None:
         try:
-            while self._buffer:
-                try:
-                    record = self._buffer.pop(0)
-                    await self.queue.put(record)
-                except asyncio.QueueFull:
-                    # 큐가 가득 찼다면 버퍼에 다시 추가
-                    self._buffer.insert(0, record)
-                    await asyncio.sleep(0.1)
-                    break
-            self._last_flush = datetime.now()
+            self._close_stream()
         except Exception as e:
-            logging.error(f"Error during buffer flush: {e}")
+            print(f"Error closing log file {self.baseFilename}: {e}", file=sys.stderr)
+
+    def _write_batch(self, data: bytes, count: int) -> None:
+        """포맷된 배치를 한 번의 write 로 기록 (쓰기 스레드에서 실행)"""
+        if self.stream is None:
+            self._open_stream()
+        # 이번 배치로 최대 크기를 넘으면 먼저 회전 (빈 파일에는 큰 배치도 그대로 기록)
+        if self.maxBytes > 0 and self._size > 0 and self._size + len(data) > self.maxBytes:
+            self._close_stream()
+            self.do_rollover()
+            self._open_stream()
+            self.stats['rollovers'] += 1
+
+        self.stream.write(data)
+        self.stream.flush()
+        self._size += len(data)
+        self._unsynced = True
+        self.stats['records'] += count
+        self.stats['batches'] += 1
+        self.stats['bytes'] += len(data)
 
-    async def _async_worker(self) -> None:
-        """비동기 로그 처리 워커"""
-        while not self._stopping:
+        if self.fsync_policy == FSYNC_BATCH:
+            self._fsync()
+        elif self.fsync_policy == FSYNC_INTERVAL:
+            self._sync_if_due()
+
+    def _sync_if_due(self) -> None:
+        if (self._unsynced and self.stream is not None and self.fsync_policy == FSYNC_INTERVAL
+                and time.monotonic() - self._last_fsync >= self.fsync_interval):
             try:
-                # 배치 처리를 위한 레코드 수집
-                records = []
-                try:
-                    # 첫 번째 레코드는 최대 1초까지 대기
-                    record = await asyncio.wait_for(self.queue.get(), timeout=1.0)
-                    records.append(record)
-                    
-                    # 추가 레코드가 있다면 최대 100개까지 즉시 수집
-                    for _ in range(99):
-                        try:
-                            record = self.queue.get_nowait()
-                            records.append(record)
-                        except asyncio.QueueEmpty:
-                            break
-                            
-                except asyncio.TimeoutError:
-                    continue
-                    
-                if records:
-                    async with self.lock:
-                        for record in records:
-                            try:
-                                await self._async_emit(record)
-                            finally:
-                                self.queue.task_done()
-                                
-            except Exception as e:
-                logging.error(f"Error in async worker: {e}")
-                await asyncio.sleep(1)
+                self._fsync()
+            except OSError as e:
+                print(f"Error syncing log file {self.baseFilename}: {e}", file=sys.stderr)
 
-    async def _async_emit(self, record: logging.LogRecord) -> None:
-        """실제 로그 기록 처리"""
-        try:
-            msg = self.format(record)
-            async with self.lock:
-                # 파일 크기 확인 및 회전
-                if self.shouldRollover(record):
-                    await self._async_do_rollover()
-                
-                # 파일이 존재하지 않으면 생성
-                if not os.path.exists(self.baseFilename):
-                    async with aiofiles.open(self.baseFilename, 'a', encoding=self.encoding):
-                        pass
-                        
-                async with aiofiles.open(self.baseFilename, 'a', encoding=self.encoding) as f:
-                    await f.write(f"{msg}\n")
-                    await f.flush()
-                    os.fsync(f.fileno())  # 데이터 영구 저장 보장
-                    
-        except Exception as e:
-            logging.error(f"Error in async emit: {e}")
-            self.handleError(record)
+    def _format_batch(self, records: List[logging.LogRecord]) -> bytes:
+        """레코드 포맷 (쓰기 스레드) - 버린 레코드가 있으면 안내 줄 추가"""
+        lines = []
+        dropped = self.dropped
+        if dropped != self.reported_drops:
+            lines.append(f"{datetime.now():%Y-%m-%d %H:%M:%S} - custom_logging - WARNING - "
+                         f"{dropped - self.reported_drops} log records dropped (writer queue full)")
+            self.reported_drops = dropped
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return b''
+        return ('\n'.join(lines) + '\n').encode(self.encoding)
+        
+    async def start(self) -> None:
+        """공유 쓰기 스레드에 등록"""
+        if not self._started:
+            self._started = True
+            self.writer.register(self)
+            if self.compress and glob.glob(glob.escape(self.filename) + PENDING_SUFFIX + '*'):
+                self._start_compressor()  # 이전 실행에서 압축하지 못한 회전 파일
 
-    async def _async_do_rollover(self) -> None:
-        """비동기 로그 파일 회전 처리"""
-        if not os.path.exists(self.baseFilename):
+    async def stop(self) -> None:
+        """남은 레코드를 모두 기록하고 파일 닫기"""
+        if self._stopping:
             return
+        self._stopping = True
+        closed = self.writer.unregister(self)
+        # 이벤트 루프를 막지 않고 쓰기 스레드의 닫기 완료 대기
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, closed.wait, 5.0):
+            logging.error(f"Timeout flushing log file {self.baseFilename}")
+        if self._compressors:
+            await loop.run_in_executor(None, self._wait_compressors, self.compress_wait_timeout)
 
-        async with self.lock:
-            try:
-                if self.stream:
-                    self.stream.close()
-                    self.stream = None
-
-                # 임시 디렉토리에 백업
-                temp_dir = os.path.join(os.path.dirname(self.baseFilename), '.temp')
-                os.makedirs(temp_dir, exist_ok=True)
-
-                # 기존 백업 파일 처리
-                for i in range(self.backupCount - 1, 0, -1):
-                    sfn = f"{self.baseFilename}.{i}"
-                    dfn = f"{self.baseFilename}.{i + 1}"
-                    try:
-                        if os.path.exists(sfn):
-                            if os.path.exists(dfn):
-                                os.remove(dfn)
-                            os.rename(sfn, dfn)
-                    except Exception as e:
-                        logging.error(f"Error during rollover: {e}")
-
-                dfn = f"{self.baseFilename}.1"
-                try:
-                    if os.path.exists(dfn):
-                        os.remove(dfn)
-                    os.rename(self.baseFilename, dfn)
-                except Exception as e:
-                    logging.error(f"Error during rollover: {e}")
+    def close(self) -> None:
+        """logging.shutdown 등 동기 종료 경로 - stop 이 호출되지 않았으면 여기서 비움"""
+        if self._started and not self._stopping:
+            self._stopping = True
+            self.writer.unregister(self).wait(5.0)
+            self._wait_compressors(self.compress_wait_timeout)
+        super().close()
 
-                # 새 로그 파일 생성
-                async with aiofiles.open(self.baseFilename, 'a', encoding=self.encoding):
-                    pass
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """쓰기 스레드에서 포맷할 레코드 사본 (QueueHandler.prepare 와 같은 방식)
 
-            except Exception as e:
-                logging.error(f"Error during rollover: {e}")
+        메시지/예외는 문자열로 확정하고, extra 로 받은 가변 값(response dict 등)은 스냅샷으로
+        바꿔 호출자가 로그 이후에 값을 바꿔도 기록 내용이 달라지지 않게 한다. 같은 레코드를
+        다른 핸들러도 쓰므로 원본은 건드리지 않는다.
+        """
+        state = record.__dict__.copy()  # copy.copy 보다 훨씬 빠른 얕은 복사
+        if record.exc_info and not record.exc_text:
+            state['exc_text'] = logging.Formatter().formatException(record.exc_info)
+        state['message'] = state['msg'] = record.getMessage()
+        state['args'] = None
+        state['exc_info'] = None
+        if not state.keys() <= _STANDARD_ATTRS:  # extra 가 없는 대부분의 레코드는 집합을 만들지 않음
+            for key in state.keys() - _STANDARD_ATTRS:
+                value = state[key]
+                if not isinstance(value, _IMMUTABLE_TYPES):
+                    state[key] = _snapshot(value)
+        prepared = object.__new__(type(record))
+        prepared.__dict__ = state
+        return prepared
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """쓰기 스레드 큐에 넣기만 함 - 이벤트 루프 유무와 관계없이 호출 가능"""
+        try:
+            if self._stopping:
+                return
+            self.writer.submit(self, self.prepare(record))
+        except Exception:
+            self.handleError(record)
 
 class AsyncAPILogHandler(BufferedAsyncRotatingFileHandler):
     """API 로그 전용 핸들러"""
     def __init__(self, filename: str, max_bytes: int = 50*1024*1024, 
-                 backup_count: int = 10, encoding: str = 'utf-8'):
-        super().__init__(filename, max_bytes, backup_count, encoding)
+                 backup_count: int = 10, encoding: str = 'utf-8',
+                 fsync_policy: str = FSYNC_INTERVAL, fsync_interval: float = 1.0,
+                 compress: bool = False):
+        super().__init__(filename, max_bytes, backup_count, encoding,
+                         fsync_policy=fsync_policy, fsync_interval=fsync_interval,
+                         compress=compress)
         self._last_logs = {}  # 중복 로그 제어를 위한 캐시
         self._cache_cleanup_task = None
 
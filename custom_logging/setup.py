@@ -6,7 +6,8 @@ import os
 from dotenv import load_dotenv
 import asyncio
 
-from .handlers import BufferedAsyncRotatingFileHandler, AsyncAPILogHandler
+from .handlers import BufferedAsyncRotatingFileHandler, AsyncAPILogHandler, FSYNC_INTERVAL
+from .formatters import JsonLineFormatter
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,15 @@ async def setup_logging(log_dir: str = "logs", env_path: Optional[str] = None) -
     # 로그 레벨 설정
     log_level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO'))
     
+    # 로그 파일 fsync 정책 (batch / interval / never)
+    fsync_policy = os.getenv('LOG_FSYNC_POLICY', FSYNC_INTERVAL)
+    fsync_interval = float(os.getenv('LOG_FSYNC_INTERVAL', '1.0'))
+    
+    # 파일 로그 형식 (jsonl / text) - error 로그는 사람이 바로 읽도록 항상 텍스트
+    log_format = os.getenv('LOG_FORMAT', 'jsonl')
+    structured = log_format == 'jsonl'
+    compress = os.getenv('LOG_COMPRESS', '1') == '1'  # 회전된 파일 gzip 압축
+    
     # 로그 디렉토리 생성
     Path(log_dir).mkdir(parents=True, exist_ok=True)
     
@@ -25,12 +35,13 @@ async def setup_logging(log_dir: str = "logs", env_path: Optional[str] = None) -
     current_date = datetime.now().strftime("%Y%m%d")
     
     # 각 로그 파일 설정
+    ext = 'jsonl' if structured else 'log'
     log_files = {
-        'main': f"{current_date}_trading_bot.log",
+        'main': f"{current_date}_trading_bot.{ext}",
         'error': f"{current_date}_error.log",
-        'trades': f"{current_date}_trades.log",
-        'api': f"{current_date}_api.log",
-        'websocket': f"{current_date}_websocket.log"
+        'trades': f"{current_date}_trades.{ext}",
+        'api': f"{current_date}_api.{ext}",
+        'websocket': f"{current_date}_websocket.{ext}"
     }
     
     # 로그 파일 경로 생성
@@ -54,7 +65,8 @@ async def setup_logging(log_dir: str = "logs", env_path: Optional[str] = None) -
         'api': logging.Formatter(
             '%(asctime)s - %(levelname)s - [%(status_code)s] %(url)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        ),
+        'jsonl': JsonLineFormatter(datefmt='%Y-%m-%d %H:%M:%S')
     }
     # 콘솔 핸들러 추가
     console_handler = logging.StreamHandler()
@@ -69,14 +81,20 @@ async def setup_logging(log_dir: str = "logs", env_path: Optional[str] = None) -
     for log_type, path in log_paths.items():
         try:
             if log_type == 'api':
-                handler = AsyncAPILogHandler(path)
+                handler = AsyncAPILogHandler(path, fsync_policy=fsync_policy,
+                                             fsync_interval=fsync_interval, compress=compress)
             else:
-                handler = BufferedAsyncRotatingFileHandler(path)
+                handler = BufferedAsyncRotatingFileHandler(path, fsync_policy=fsync_policy,
+                                                           fsync_interval=fsync_interval,
+                                                           compress=compress)
                 
             handler.setLevel(logging.ERROR if log_type == 'error' else log_level)
-            handler.setFormatter(
-                formatters['api'] if log_type == 'api' else formatters['detailed']
-            )
+            if structured and log_type != 'error':
+                handler.setFormatter(formatters['jsonl'])
+            else:
+                handler.setFormatter(
+                    formatters['api'] if log_type == 'api' else formatters['detailed']
+                )
             await handler.start()
             handlers[log_type] = handler
             root_logger.addHandler(handler)
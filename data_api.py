@@ -5,17 +5,76 @@ import hashlib
 import time
 import logging
 import asyncio
-import json
+from codec import codec
+from dataclasses import dataclass, field
 from models import Position
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 from urllib.parse import urlencode
 from utils import LogControlMixin  # 이 줄을 추가
+from tracing import tracer, STAGE_RATE_LIMIT_WAIT, STAGE_REST_SIGN, STAGE_REST_SEND
+from rate_limiter import (RequestScheduler, PRIORITY_ORDER, PRIORITY_PRIVATE,
+                          PRIORITY_MARKET, PRIORITY_BACKGROUND)
 
 
 logger = logging.getLogger(__name__)
 
+def safe_float(value, default: float = 0.0) -> float:
+    """안전한 float 변환"""
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def parse_position(symbol: str, position_data: dict) -> Optional[Position]:
+    """REST/웹소켓 포지션 데이터를 Position 으로 변환 (수량 0이면 None)"""
+    total = safe_float(position_data.get('total'))
+    if total <= 0:
+        return None
+    
+    return Position(
+        symbol=symbol,
+        side='long' if position_data.get('holdSide') == 'long' else 'short',
+        size=total,
+        entry_price=safe_float(position_data.get('openPriceAvg')),
+        stop_loss_price=0.0,
+        take_profit_price=0.0,
+        timestamp=int(time.time() * 1000),
+        leverage=int(safe_float(position_data.get('leverage'), 1)),
+        break_even_price=safe_float(position_data.get('breakEvenPrice')),
+        unrealized_pl=safe_float(position_data.get('unrealizedPL')),
+        margin_size=safe_float(position_data.get('marginSize')),
+        available=safe_float(position_data.get('available')),
+        locked=safe_float(position_data.get('locked', position_data.get('frozen'))),
+        liquidation_price=safe_float(position_data.get('liquidationPrice')),
+        margin_ratio=safe_float(position_data.get('marginRatio', position_data.get('marginRate'))),
+        mark_price=safe_float(position_data.get('markPrice')),
+        achieved_profits=safe_float(position_data.get('achievedProfits')),
+        total_fee=safe_float(position_data.get('totalFee')),
+        margin_mode=position_data.get('marginMode', 'crossed')
+    )
+
+@dataclass
+class ConnectionPoolConfig:
+    """aiohttp 연결 풀 설정"""
+    limit: int = 100                 # 전체 동시 연결 수
+    limit_per_host: int = 20         # 호스트당 동시 연결 수
+    ttl_dns_cache: int = 300         # DNS 캐시 유지 시간 (초)
+    keepalive_timeout: float = 60.0  # 유휴 keep-alive 연결 유지 시간 (초)
+    connect_timeout: float = 3.0     # 연결 수립 제한 시간 (초)
+    # 엔드포인트 종류(우선순위)별 전체 요청 제한 시간 (초)
+    request_timeouts: Dict[int, float] = field(default_factory=lambda: {
+        PRIORITY_ORDER: 5.0,
+        PRIORITY_PRIVATE: 5.0,
+        PRIORITY_MARKET: 10.0,
+        PRIORITY_BACKGROUND: 30.0
+    })
+    warmup_endpoint: str = '/api/v2/public/time'
+
 class BitgetAPI(LogControlMixin):
-    def __init__(self, api_key: str, secret_key: str, passphrase: str):
+    def __init__(self, api_key: str, secret_key: str, passphrase: str,
+                 pool_config: Optional[ConnectionPoolConfig] = None):
         super().__init__()  # LogControlMixin 초기화
         self.API_KEY = api_key
         self.SECRET_KEY = secret_key
@@ -23,10 +82,18 @@ class BitgetAPI(LogControlMixin):
         self.logger = logging.getLogger("bitget_api")
         self.BASE_URL = "https://api.bitget.com"
         self.session = None
+        self.scheduler = RequestScheduler()  # 엔드포인트 그룹별 속도 제한
+        self.pool_config = pool_config or ConnectionPoolConfig()
+        self._timeouts: Dict[int, aiohttp.ClientTimeout] = {
+            priority: aiohttp.ClientTimeout(total=total, connect=self.pool_config.connect_timeout)
+            for priority, total in self.pool_config.request_timeouts.items()
+        }
+        self.request_stats = {'requests': 0, 'timeouts': 0, 'errors': 0}
+        self.endpoint_stats: Dict[str, Dict[str, int]] = {}  # 엔드포인트별 요청 / 429 / 오류 수
         
     async def __aenter__(self):        # 쓴다.
         """Context manager entry - creates aiohttp session"""
-        self.session = aiohttp.ClientSession()
+        self.session = self._create_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):     # 쓴다.
@@ -34,6 +101,49 @@ class BitgetAPI(LogControlMixin):
         if self.session:
             await self.session.close()
             
+    def _create_session(self) -> aiohttp.ClientSession:
+        """keep-alive / DNS 캐시 / 연결 수 제한이 적용된 세션 생성"""
+        config = self.pool_config
+        connector = aiohttp.TCPConnector(
+            limit=config.limit,
+            limit_per_host=config.limit_per_host,
+            ttl_dns_cache=config.ttl_dns_cache,
+            keepalive_timeout=config.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=max(config.request_timeouts.values()),
+            connect=config.connect_timeout
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def warmup(self) -> bool:
+        """시작 시 DNS 조회와 TLS 연결을 미리 수립"""
+        start = time.perf_counter()
+        response = await self._request('GET', self.pool_config.warmup_endpoint, 
+                                       priority=PRIORITY_ORDER)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if response is not None:
+            logger.info(f"HTTP connection pool warmed up in {elapsed_ms:.1f}ms")
+            return True
+        logger.warning(f"HTTP connection pool warmup failed after {elapsed_ms:.1f}ms")
+        return False
+
+    def get_pool_stats(self) -> Dict[str, float]:
+        """연결 풀 상태 조회"""
+        stats = {
+            'limit': self.pool_config.limit,
+            'limit_per_host': self.pool_config.limit_per_host,
+            'active': 0,
+            'idle': 0,
+            **self.request_stats
+        }
+        connector = self.session.connector if self.session else None
+        if connector is not None:
+            stats['active'] = len(getattr(connector, '_acquired', ()))
+            stats['idle'] = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        return stats
+
     def _generate_signature(self, timestamp: str, method: str,           # _create_headers 함수에서 호출당한다.
                           request_path: str, body: str = '') -> str:
         message = timestamp + method + request_path + body
@@ -64,31 +174,53 @@ class BitgetAPI(LogControlMixin):
             "ACCESS-VERSION": "2"
         }
 
-    async def _request(self, method: str, endpoint: str, params: dict = None, data: dict = None) -> Optional[dict]:
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+    async def _request(self, method: str, endpoint: str, params: dict = None, data: dict = None,
+                       priority: Optional[int] = None) -> Optional[dict]:
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
 
+        url = self.BASE_URL + endpoint
+        if priority is None:
+            priority = self.scheduler.priority_for(endpoint)
         try:
-            url = self.BASE_URL + endpoint
+            # 한도 내에서 우선순위 순으로 요청 슬롯 확보 (주문 > 조회 > 시세 > 백필)
+            with tracer.span(STAGE_RATE_LIMIT_WAIT):
+                await self.scheduler.acquire(endpoint, priority)
+            self.request_stats['requests'] += 1
+            endpoint_stats = self.endpoint_stats.get(endpoint)
+            if endpoint_stats is None:
+                endpoint_stats = self.endpoint_stats[endpoint] = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+            endpoint_stats['requests'] += 1
+
             query = ''
             
             if params:
                 query = '?' + urlencode(sorted(params.items()))
                 url = url + query
 
-            headers = self._create_headers(
-                method, 
-                endpoint + query, 
-                json.dumps(data) if data else ''
-            )
+            # 서명한 본문을 그대로 전송 (코덱마다 직렬화 공백이 다를 수 있음)
+            with tracer.span(STAGE_REST_SIGN):
+                body = codec.dumps(data) if data else ''
+                headers = self._create_headers(method, endpoint + query, body)
 
+            sent = time.perf_counter()
             async with self.session.request(
                 method=method,
                 url=url,
                 headers=headers,
-                json=data
+                data=body or None,
+                timeout=self._timeouts.get(priority, self._timeouts[PRIORITY_PRIVATE])
             ) as response:
-                response_data = await response.json()
+                payload = await response.read()
+                tracer.record(STAGE_REST_SEND, (time.perf_counter() - sent) * 1000)
+
+                # 디코딩 전에 상태 코드로 먼저 판단 (게이트웨이의 429/5xx 는 본문이 JSON 이 아닐 수 있음)
+                rate_limited = response.status == 429
+                if rate_limited:
+                    self._report_rate_limited(endpoint, response)
+                response_data = self._decode_response(endpoint, response.status, payload)
+                if not rate_limited and isinstance(response_data, dict) and response_data.get('code') == '429':
+                    self._report_rate_limited(endpoint, response)
                 
                 # API 요청 로그는 엔드포인트별로 1분에 한 번만 기록
                 if self.should_log(f'api_request_{endpoint}'):
@@ -97,11 +229,48 @@ class BitgetAPI(LogControlMixin):
 
                 return response_data
 
+        except asyncio.TimeoutError:
+            self.request_stats['timeouts'] += 1
+            self._count_endpoint_error(endpoint)
+            self.logger.error("API request timed out", 
+                  extra={'method': method, 'url': url})
+            return None
         except Exception as e:
+            self.request_stats['errors'] += 1
+            self._count_endpoint_error(endpoint)
             self.logger.error(f"API request error: {e}", 
                   extra={'method': method, 'url': url})
             return None
             
+    def _report_rate_limited(self, endpoint: str, response: aiohttp.ClientResponse) -> None:
+        """429 응답 집계 후 스케줄러에 알려 해당 그룹을 Retry-After 만큼 멈춤"""
+        self.endpoint_stats[endpoint]['rate_limited'] += 1
+        try:
+            retry_after = float(response.headers.get('Retry-After', 1) or 1)
+        except ValueError:  # HTTP 날짜 형식 등
+            retry_after = 1.0
+        self.scheduler.report_rate_limited(endpoint, retry_after)
+
+    def _decode_response(self, endpoint: str, status: int, payload: bytes) -> Any:
+        """응답 본문 디코딩 - 오류 상태의 JSON 이 아닌 본문(HTML/텍스트)은 오류 dict 로 변환"""
+        try:
+            return codec.loads(payload)
+        except Exception:
+            if status < 400:
+                raise
+            if status != 429:
+                self.request_stats['errors'] += 1
+                self._count_endpoint_error(endpoint)
+            return {'code': str(status), 'msg': payload[:200].decode('utf-8', 'replace'), 'data': None}
+
+    def _count_endpoint_error(self, endpoint: str) -> None:
+        if endpoint in self.endpoint_stats:  # 슬롯 확보 전 실패는 요청으로 세지 않음
+            self.endpoint_stats[endpoint]['errors'] += 1
+
+    def get_endpoint_stats(self) -> Dict[str, Dict[str, int]]:
+        """엔드포인트별 요청 / 429 / 오류 수"""
+        return {endpoint: dict(stats) for endpoint, stats in self.endpoint_stats.items()}
+            
     async def get_historical_candles(self, symbol: str) -> Optional[dict]:             # 시작할 때 캐시를 api를 활용해서 받아오는 역할. 200개의 1분봉. data_web에서 호출당한다.
         """프로그램 시작 시점 기준 과거 200개의 1분봉 데이터 조회"""
         try:
@@ -125,7 +294,20 @@ class BitgetAPI(LogControlMixin):
             logger.error(f"Error fetching historical candles: {e}")
             return None
 
-    async def set_leverage(self, symbol: str, leverage: int,         # 이거 open_position에서 호출하고싶은데 그러면 결괏값이 좀 병신이 됨. 그래서 order_execution 내부에 얘를 호출해서 bool값으로 결과를 반환하는 애를 만들어야함. 구현완료.
+    async def get_candles_range(self, symbol: str, start_time: int, end_time: int,
+                                granularity: str = '1m', limit: int = 200) -> Optional[dict]:
+        """지정 구간의 과거 캔들 조회 (백필용, 최대 limit개)"""
+        params = {
+            'symbol': symbol,
+            'granularity': granularity,
+            'productType': 'USDT-FUTURES',
+            'startTime': str(start_time),
+            'endTime': str(end_time),
+            'limit': str(limit)
+        }
+        return await self._request('GET', '/api/v2/mix/market/history-candles', params=params)
+
+    async def set_leverage(self, symbol: str, leverage: int,        # 이거 open_position에서 호출하고싶은데 그러면 결괏값이 좀 병신이 됨. 그래서 order_execution 내부에 얘를 호출해서 bool값으로 결과를 반환하는 애를 만들어야함. 구현완료.
                       product_type: str = 'USDT-FUTURES',
                       margin_coin: str = 'USDT',
                       ) -> Optional[dict]:
@@ -158,47 +340,16 @@ class BitgetAPI(LogControlMixin):
             
             if response and response.get('code') == '00000' and response.get('data'):
                 position_data = response['data'][0] if isinstance(response['data'], list) else response['data']
+                position = parse_position(symbol, position_data)
                 
-                # 안전한 float 변환을 위한 함수
-                def safe_float(value, default=0.0):
-                    if value is None or value == '':
-                        return default
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return default
-
-                # 포지션 크기 확인
-                total = safe_float(position_data.get('total'))
-                
-                if total > 0:
+                if position:
                     # 포지션 데이터가 이전과 다를 때만 로깅
-                    position_key = f"{position_data.get('holdSide')}_{total}_{position_data.get('openPriceAvg')}"
+                    position_key = f"{position_data.get('holdSide')}_{position.size}_{position_data.get('openPriceAvg')}"
                     if not hasattr(self, '_last_logged_position') or self._last_logged_position != position_key:
                         logger.info(f"Position API Response: {response}")
                         self._last_logged_position = position_key
                     
-                    return Position(
-                        symbol=symbol,
-                        side='long' if position_data.get('holdSide') == 'long' else 'short',
-                        size=total,
-                        entry_price=safe_float(position_data.get('openPriceAvg')),
-                        stop_loss_price=0.0,
-                        take_profit_price=0.0,
-                        timestamp=int(time.time() * 1000),
-                        leverage=int(safe_float(position_data.get('leverage'), 1)),
-                        break_even_price=safe_float(position_data.get('breakEvenPrice')),
-                        unrealized_pl=safe_float(position_data.get('unrealizedPL')),
-                        margin_size=safe_float(position_data.get('marginSize')),
-                        available=safe_float(position_data.get('available')),
-                        locked=safe_float(position_data.get('locked')),
-                        liquidation_price=safe_float(position_data.get('liquidationPrice')),
-                        margin_ratio=safe_float(position_data.get('marginRatio')),
-                        mark_price=safe_float(position_data.get('markPrice')),
-                        achieved_profits=safe_float(position_data.get('achievedProfits')),
-                        total_fee=safe_float(position_data.get('totalFee')),
-                        margin_mode=position_data.get('marginMode', 'crossed')
-                    )
+                    return position
                 
                 # 포지션이 없을 때는 이전 상태와 비교하여 로깅
                 if hasattr(self, '_last_logged_position'):
@@ -309,6 +460,15 @@ class BitgetAPI(LogControlMixin):
         return await self._request('GET', '/api/v2/mix/order/orders-pending', params=params)
     
 
+    async def get_pending_plan_orders(self, symbol: str, plan_type: str = 'profit_loss') -> dict:
+        """비동기 미체결 계획 주문(TP/SL 등) 조회"""
+        params = {
+            'symbol': symbol.upper(),
+            'productType': 'USDT-FUTURES',
+            'planType': plan_type
+        }
+        return await self._request('GET', '/api/v2/mix/order/orders-plan-pending', params=params)
+
     async def cancel_all_pending_orders(self, symbol: str) -> List[dict]:
         """비동기 30초 이상 지난 미체결 주문 취소"""
         results = []
@@ -343,33 +503,21 @@ class BitgetAPI(LogControlMixin):
     async def get_position_ratio(self, symbol: str, period: str = '5m') -> Optional[Dict[str, float]]:
         """포지션 롱숏 비율 데이터 조회"""
         try:
-            # 마지막 요청 시간 체크
-            current_time = time.time()
-            if hasattr(self, '_last_ratio_request') and \
-            current_time - self._last_ratio_request < 1.1:  # 1.1초 간격 보장
-                await asyncio.sleep(1.1)  # 요청 간 최소 대기 시간
-            
+            # 요청 간격은 scheduler 의 market_ratio 버킷(초당 1회)이 보장
             params = {
                 'symbol': symbol,
                 'period': period
             }
             
             response = await self._request('GET', '/api/v2/mix/market/account-long-short', params=params)
-            self._last_ratio_request = time.time()  # 요청 시간 업데이트
             
             if response and response.get('code') == '00000':
                 data = response.get('data', [])
                 if data:
-                    latest = data[-1]
-                    return {
-                        'long_ratio': float(latest['longAccountRatio']),
-                        'short_ratio': float(latest['shortAccountRatio']),
-                        'long_short_ratio': float(latest['longShortAccountRatio'])
-                    }
+                    return self._parse_position_ratio(data[-1])
             
             if response and response.get('code') == '429':
-                logger.warning("Rate limit reached, waiting for 2 seconds...")
-                await asyncio.sleep(2)  # 속도 제한 시 2초 대기
+                logger.warning("Rate limit reached for position ratio, will retry later")
                 return None
                 
             logger.error(f"Failed to get position ratio: {response}")
@@ -379,6 +527,41 @@ class BitgetAPI(LogControlMixin):
             logger.error(f"Error fetching position ratio: {e}")
             return None
         
+    async def get_position_ratio_history(self, symbol: str,
+                                         period: str = '5m') -> Optional[List[Dict[str, float]]]:
+        """롱숏 비율 과거 시계열 조회 (시간 오름차순, 재시작 시 캐시 복원용)"""
+        try:
+            params = {
+                'symbol': symbol,
+                'period': period
+            }
+            
+            response = await self._request('GET', '/api/v2/mix/market/account-long-short', params=params)
+            
+            if response and response.get('code') == '00000':
+                history = []
+                for item in response.get('data', []):
+                    ratios = self._parse_position_ratio(item)
+                    ratios['timestamp'] = int(item['ts'])
+                    history.append(ratios)
+                history.sort(key=lambda ratios: ratios['timestamp'])
+                return history
+                
+            logger.error(f"Failed to get position ratio history: {response}")
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error fetching position ratio history: {e}")
+            return None
+
+    @staticmethod
+    def _parse_position_ratio(item: dict) -> Dict[str, float]:
+        return {
+            'long_ratio': float(item['longAccountRatio']),
+            'short_ratio': float(item['shortAccountRatio']),
+            'long_short_ratio': float(item['longShortAccountRatio'])
+        }
+        
     async def close_partial_position(self, symbol: str, size: str, margin_coin: str = 'USDT') -> dict:
         """비동기 부분 청산"""
         body = {
@@ -0,0 +1,252 @@
+import asyncio
+import websockets
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+from websockets.protocol import State
+from data_api import BitgetAPI, parse_position
+from models import Position
+from codec import codec
+
+logger = logging.getLogger(__name__)
+
+FINAL_ORDER_STATES = ('filled', 'canceled', 'cancelled')
+
+class OrderStateBook:
+    """웹소켓 이벤트로 갱신되는 주문/포지션/계좌 상태"""
+
+    def __init__(self):
+        self.orders: Dict[str, dict] = {}
+        self.positions: Dict[str, Position] = {}
+        self.account: Dict[str, dict] = {}
+        self.synced = False  # 로그인 + 포지션 스냅샷 수신 완료 여부
+        self.last_update = 0.0
+        self._order_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._position_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._max_orders = 500
+
+    def mark_unsynced(self) -> None:
+        """연결이 끊기면 REST 로 폴백하도록 표시"""
+        self.synced = False
+
+    def apply_orders(self, data: List[dict]) -> None:
+        for order in data:
+            order_id = order.get('orderId')
+            if not order_id:
+                continue
+            self.orders[order_id] = order
+            state = order.get('status') or order.get('state')
+            if state in FINAL_ORDER_STATES:
+                self._resolve(self._order_waiters, order_id, state)
+
+        # 오래된 주문 기록 정리
+        while len(self.orders) > self._max_orders:
+            self.orders.pop(next(iter(self.orders)))
+        self.last_update = time.time()
+
+    def apply_positions(self, data: List[dict], snapshot: bool) -> None:
+        if snapshot:
+            # 스냅샷에 없는 심볼은 포지션이 없는 것
+            present = {item.get('instId') for item in data}
+            for symbol in list(self.positions):
+                if symbol not in present:
+                    del self.positions[symbol]
+
+        for item in data:
+            symbol = item.get('instId')
+            if not symbol:
+                continue
+            position = parse_position(symbol, item)
+            if position:
+                self.positions[symbol] = position
+                self._resolve(self._position_waiters, symbol, position)
+            else:
+                self.positions.pop(symbol, None)
+
+        self.synced = True
+        self.last_update = time.time()
+
+    def apply_account(self, data: List[dict]) -> None:
+        for item in data:
+            coin = item.get('marginCoin')
+            if coin:
+                self.account[coin] = item
+        self.last_update = time.time()
+
+    def get_order_state(self, order_id: str) -> Optional[str]:
+        order = self.orders.get(order_id)
+        if not order:
+            return None
+        return order.get('status') or order.get('state')
+
+    def get_position(self, symbol: str) -> Optional[Position]:
+        return self.positions.get(symbol)
+
+    def _resolve(self, waiters: Dict[str, List[asyncio.Future]], key: str, value) -> None:
+        for future in waiters.pop(key, []):
+            if not future.done():
+                future.set_result(value)
+
+    async def _wait(self, waiters: Dict[str, List[asyncio.Future]], key: str, timeout: float):
+        future = asyncio.get_running_loop().create_future()
+        waiters.setdefault(key, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            pending = waiters.get(key)
+            if pending and future in pending:
+                pending.remove(future)
+                if not pending:
+                    del waiters[key]
+
+    async def wait_for_order(self, order_id: str, timeout: float) -> Optional[str]:
+        """주문이 체결/취소될 때까지 대기 - 최종 상태 또는 타임아웃 시 None"""
+        state = self.get_order_state(order_id)
+        if state in FINAL_ORDER_STATES:
+            return state
+        return await self._wait(self._order_waiters, order_id, timeout)
+
+    async def wait_for_position(self, symbol: str, timeout: float) -> Optional[Position]:
+        """포지션이 생길 때까지 대기"""
+        position = self.positions.get(symbol)
+        if position:
+            return position
+        return await self._wait(self._position_waiters, symbol, timeout)
+
+class BitgetPrivateWebsocket:
+    """orders / positions / account 채널을 구독하는 인증 웹소켓"""
+
+    CHANNELS = ('orders', 'positions', 'account')
+
+    def __init__(self, api: BitgetAPI, inst_type: str = 'USDT-FUTURES'):
+        self.WS_URL = "wss://ws.bitget.com/v2/ws/private"
+        self.api = api
+        self.inst_type = inst_type
+        self.ws = None
+        self.book = OrderStateBook()
+        self._running = False
+        self._reconnect_delay = 5
+        self.logger = logging.getLogger("bitget_api")
+
+    async def is_connected(self) -> bool:
+        return (self.ws is not None and
+                hasattr(self.ws, 'state') and
+                self.ws.state == State.OPEN)
+
+    def _login_payload(self) -> dict:
+        timestamp = str(int(time.time()))
+        sign = self.api._generate_signature(timestamp, 'GET', '/user/verify')
+        return {
+            "op": "login",
+            "args": [{
+                "apiKey": self.api.API_KEY,
+                "passphrase": self.api.PASSPHRASE,
+                "timestamp": timestamp,
+                "sign": sign
+            }]
+        }
+
+    def _subscribe_payload(self) -> dict:
+        args = []
+        for channel in self.CHANNELS:
+            arg = {"instType": self.inst_type, "channel": channel}
+            if channel == 'account':
+                arg["coin"] = "default"
+            else:
+                arg["instId"] = "default"
+            args.append(arg)
+        return {"op": "subscribe", "args": args}
+
+    async def _login(self) -> bool:
+        await self.ws.send(json.dumps(self._login_payload()))
+        response = json.loads(await asyncio.wait_for(self.ws.recv(), timeout=10))
+        if response.get('event') == 'login' and str(response.get('code')) == '0':
+            return True
+        self.logger.error(f"Private WebSocket login failed: {response}",
+              extra={'action': 'private_ws_login'})
+        return False
+
+    async def run(self) -> None:
+        """연결 → 로그인 → 구독 → 수신 루프 (끊기면 재연결)"""
+        self._running = True
+        while self._running:
+            keep_alive = None
+            try:
+                self.logger.info("Private WebSocket connecting...")
+                self.ws = await websockets.connect(self.WS_URL)
+                if not await self._login():
+                    await self.ws.close()
+                    await asyncio.sleep(self._reconnect_delay)
+                    continue
+
+                await self.ws.send(json.dumps(self._subscribe_payload()))
+                self.logger.info("Private WebSocket subscribed to orders/positions/account")
+                keep_alive = asyncio.create_task(self._keep_alive())
+                await self._receive_loop()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Private WebSocket error: {e}",
+                      extra={'action': 'private_ws_run'})
+            finally:
+                self.book.mark_unsynced()
+                if keep_alive:
+                    keep_alive.cancel()
+
+            if self._running:
+                await asyncio.sleep(self._reconnect_delay)
+
+    async def _keep_alive(self) -> None:
+        while await self.is_connected():
+            await asyncio.sleep(20)
+            try:
+                await self.ws.send('ping')
+            except Exception:
+                return
+
+    async def _receive_loop(self) -> None:
+        while await self.is_connected():
+            try:
+                message = await self.ws.recv()
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning("Private WebSocket connection closed")
+                return
+            if message == 'pong':
+                continue
+
+            try:
+                self._handle_message(codec.loads(message))
+            except Exception as e:
+                logger.error(f"Error handling private message: {e}")
+
+    def _handle_message(self, data: dict) -> None:
+        channel = data.get('arg', {}).get('channel')
+        payload = data.get('data')
+        if payload is None:
+            if data.get('event') == 'error':
+                logger.error(f"Private WebSocket error event: {data}")
+            return
+
+        if channel == 'orders':
+            self.book.apply_orders(payload)
+        elif channel == 'positions':
+            self.book.apply_positions(payload, snapshot=data.get('action') == 'snapshot')
+        elif channel == 'account':
+            self.book.apply_account(payload)
+
+    async def disconnect(self) -> None:
+        """연결 종료"""
+        self._running = False
+        self.book.mark_unsynced()
+        if self.ws:
+            try:
+                await asyncio.wait_for(self.ws.close(), timeout=5.0)
+                logger.info("Private WebSocket disconnected")
+            except asyncio.TimeoutError:
+                logger.warning("Private WebSocket close timeout")
+            except Exception as e:
+                logger.error(f"Error disconnecting private WebSocket: {e}")
@@ -2,61 +2,241 @@ import asyncio
 import websockets
 import json
 import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Union
 from websockets.protocol import State
 from data_api import BitgetAPI
 from market_data_manager import MarketDataManager
 from database_manager import DatabaseManager, Candle
+from codec import codec, CandleRow
+from candle_queue import CandleUpdateQueue, POLICY_HOLD_LIVE
+from latency import LatencyHistogram
+from tracing import tracer, STAGE_WS_RECEIVE, STAGE_JSON_DECODE, STAGE_QUEUE_WAIT
 
 logger = logging.getLogger(__name__)
 
+# 연결 상태
+STATE_DISCONNECTED = 'disconnected'
+STATE_CONNECTING = 'connecting'
+STATE_CONNECTED = 'connected'
+STATE_BACKOFF = 'backoff'
+STATE_CLOSED = 'closed'
+
 class BitgetWebsocket:
-    def __init__(self, api: BitgetAPI, market_data: MarketDataManager):
+    def __init__(self, api: BitgetAPI,
+                 market_data: Union[MarketDataManager, Dict[str, MarketDataManager]]):
         self.WS_URL = "wss://ws.bitget.com/v2/ws/public"
         self.ws = None
         self.api = api
-        self.market_data = market_data
+        # 심볼별 MarketDataManager (단일 매니저도 허용)
+        if isinstance(market_data, MarketDataManager):
+            market_data = {market_data.symbol: market_data}
+        self.markets: Dict[str, MarketDataManager] = dict(market_data)
+        self.subscribe_batch_size = 20  # 구독 요청 1건에 담을 채널 수
         self.db_manager = DatabaseManager()  
         self.connected = False
-        self.reconnecting = False
         self.subscriptions = []
-        self._processing = False
+        
+        # 연결 감독 태스크 (연결/재연결은 이 태스크만 수행)
+        self.state = STATE_DISCONNECTED
+        self.connect_timeout = 10.0
+        self.initial_backoff = 1.0
+        self.max_backoff = 60.0
+        self.ping_interval = 20
+        
+        # 하트비트 / 데이터 정체 감시
+        self.watchdog_interval = 1.0
+        self.pong_timeout = 10.0    # ping 후 pong 이 없으면 재연결
+        self.stale_after = 30.0     # 채널에 메시지가 없으면 해당 심볼 데이터를 stale 로 표시
+        self._ping_sent_at: Optional[float] = None
+        self._connected_at = 0.0
+        self._last_message: Dict[str, float] = {}  # 채널 키 → 마지막 수신 시각 (monotonic)
+        self.heartbeat_rtt = LatencyHistogram()
+        self.exchange_latency = LatencyHistogram()  # 거래소 발송(ts) → 로컬 수신
+        self.health_stats = {'pong_timeouts': 0, 'stale_reconnects': 0}
+        self._supervisor: Optional[asyncio.Task] = None
+        self._connected_event = asyncio.Event()
+        self._closing = False
+        self._callback_tasks = set()
+        self.connection_stats = {
+            'connects': 0,
+            'reconnects': 0,
+            'disconnects': 0,
+            'failed_attempts': 0,
+            'last_disconnect_sec': 0.0,
+            'max_disconnect_sec': 0.0,
+            'total_disconnect_sec': 0.0,
+            'state_since': time.time()
+        }
+        
+        # 수신 태스크 → 심볼별로 분배된 병합 큐 → 처리 태스크
+        self.queue_maxsize = 1000
+        self.queue_policy = POLICY_HOLD_LIVE
+        self.consumer_count = 1
+        self.consumer_batch_size = 100
+        self._queues: List[CandleUpdateQueue] = []
+        self._queue_index: Dict[str, int] = {}
+        self._consumers: List[asyncio.Task] = []
+        self.processing_stats = {
+            'messages': 0,
+            'processed': 0,
+            'last_age_ms': 0.0,
+            'avg_age_ms': 0.0,
+            'max_age_ms': 0.0
+        }
+        self._reconnect_callbacks: List[Callable[[], Awaitable]] = []
         self.logger = logging.getLogger("bitget_api")
+
+    def add_reconnect_callback(self, callback: Callable[[], Awaitable]) -> None:
+        """재연결 성공 시 실행할 콜백 등록 (예: 누락 구간 백필)"""
+        self._reconnect_callbacks.append(callback)
+
+    def _run_reconnect_callbacks(self) -> None:
+        """재연결 콜백을 백그라운드 태스크로 실행"""
+        for callback in self._reconnect_callbacks:
+            task = asyncio.create_task(callback())
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_tasks.discard)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.info(f"WebSocket state: {self.state} -> {state}")
+            self.state = state
+            self.connection_stats['state_since'] = time.time()
+        self.connected = state == STATE_CONNECTED
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """지터를 더한 지수 백오프 (상한의 절반 + 무작위 절반)"""
+        delay = min(self.max_backoff, self.initial_backoff * 2 ** max(0, attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
    
-    async def connect(self):
-        """WebSocket 연결 설정"""
-        while not self.connected and not self.reconnecting:
+    async def connect(self) -> bool:
+        """연결 감독 태스크를 시작하고 첫 연결을 기다림
+
+        감독 태스크가 연결 전에 끝나면 그 예외를 다시 발생시키고, 예외 없이 끝났으면
+        (연결 전 disconnect 등) False 를 반환한다.
+        """
+        self._closing = False
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise())
+        supervisor = self._supervisor
+        connected = asyncio.create_task(self._connected_event.wait())
+        try:
+            await asyncio.wait({connected, supervisor}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            connected.cancel()
+        if self._connected_event.is_set():
+            return True
+        if not supervisor.cancelled() and supervisor.exception() is not None:
+            self.logger.error(f"WebSocket supervisor failed before connecting: {supervisor.exception()}")
+            raise supervisor.exception()
+        self.logger.warning("WebSocket supervisor stopped before connecting")
+        return False
+
+    async def _supervise(self) -> None:
+        """연결 → 구독 재전송 → 수신, 끊기면 백오프 후 반복"""
+        attempt = 0
+        disconnected_at: Optional[float] = None
+        self._start_consumers()
+
+        while not self._closing:
+            self._set_state(STATE_CONNECTING)
             try:
-                self.reconnecting = True
                 self.logger.info("WebSocket connecting...")
-                
-                self.ws = await websockets.connect(self.WS_URL)
-                self.connected = True
-                self.reconnecting = False
-                
-                self.logger.info("WebSocket connected successfully")
-                
-                asyncio.create_task(self._keep_alive())
-                return True
-                
+                self.ws = await asyncio.wait_for(websockets.connect(self.WS_URL),
+                                                 timeout=self.connect_timeout)
+                await self._send_subscriptions(self.subscriptions)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                self.logger.error(f"WebSocket connection error: {e}", 
+                attempt += 1
+                self.connection_stats['failed_attempts'] += 1
+                delay = self._backoff_delay(attempt)
+                self.logger.error(f"WebSocket connection error (attempt {attempt}): {e}, "
+                                  f"retrying in {delay:.1f}s",
                   extra={'action': 'websocket_connect'})
-                await asyncio.sleep(5)
+                await self._close_socket()
+                self._set_state(STATE_BACKOFF)
+                await asyncio.sleep(delay)
+                continue
+
+            attempt = 0
+            self._connected_at = time.monotonic()
+            self._ping_sent_at = None
+            stats = self.connection_stats
+            stats['connects'] += 1
+            self._set_state(STATE_CONNECTED)
+            self._connected_event.set()
+            self.logger.info("WebSocket connected successfully")
+
+            if disconnected_at is not None:
+                # 끊겨 있던 시간 기록 후 누락 구간 백필
+                downtime = time.monotonic() - disconnected_at
+                stats['reconnects'] += 1
+                stats['last_disconnect_sec'] = downtime
+                stats['max_disconnect_sec'] = max(stats['max_disconnect_sec'], downtime)
+                stats['total_disconnect_sec'] += downtime
+                self.logger.info(f"WebSocket reconnected after {downtime:.1f}s")
+                self._run_reconnect_callbacks()
+
+            keep_alive = asyncio.create_task(self._keep_alive())
+            try:
+                await self._process_messages()
             finally:
-                self.reconnecting = False
-        return False
+                keep_alive.cancel()
+                self._connected_event.clear()
+                self._mark_all_stale()
+                disconnected_at = time.monotonic()
+                await self._close_socket()
+
+            if self._closing:
+                break
+            stats['disconnects'] += 1
+            delay = self._backoff_delay(1)
+            logger.warning(f"WebSocket connection lost, reconnecting in {delay:.1f}s")
+            self._set_state(STATE_BACKOFF)
+            await asyncio.sleep(delay)
+
+        self._set_state(STATE_CLOSED)
+
+    async def _close_socket(self) -> None:
+        if self.ws is not None:
+            try:
+                await asyncio.wait_for(self.ws.close(), timeout=5.0)
+            except Exception:
+                pass
 
     async def disconnect(self):
         """WebSocket 연결 종료"""
+        self._closing = True
         if self.ws:
             try:
                 await asyncio.wait_for(self.ws.close(), timeout=5.0)
-                self.connected = False
                 logger.info("WebSocket disconnected")
             except asyncio.TimeoutError:
                 logger.warning("WebSocket close timeout")
             except Exception as e:
                 logger.error(f"Error disconnecting WebSocket: {e}")
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+        self._set_state(STATE_CLOSED)
+        await self._stop_consumers()
+
+    def get_connection_stats(self) -> Dict[str, float]:
+        """연결 상태 / 재연결 / 끊김 시간 통계"""
+        return {**self.connection_stats, 'state': self.state}
+
+    async def _stop_consumers(self, timeout: float = 2.0) -> None:
+        """남은 캔들 갱신을 처리한 뒤 처리 태스크 종료"""
+        deadline = time.monotonic() + timeout
+        while any(queue.qsize() for queue in self._queues) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
                 
     async def is_connected(self):
        """웹소켓 연결 상태 확인"""
@@ -64,10 +244,14 @@ class BitgetWebsocket:
                hasattr(self.ws, 'state') and 
                self.ws.state == State.OPEN)
 
-    async def store_initial_candles(self, symbol: str = 'BTCUSDT'):
-        """초기 캔들 데이터 저장"""
+    async def store_initial_candles(self, symbol: Optional[str] = None):
+        """초기 캔들 데이터 저장 (심볼 미지정 시 전체 심볼 동시 조회)"""
+        if symbol is None:
+            await asyncio.gather(*(self.store_initial_candles(s) for s in self.markets))
+            return
+
         try:
-            logger.info("Fetching and storing initial candle data")
+            logger.info(f"Fetching and storing initial {symbol} candle data")
             
             response = await self.api.get_historical_candles(symbol)
             
@@ -75,111 +259,205 @@ class BitgetWebsocket:
                 candles_data = response.get('data', [])
                 
                 # 직접 DatabaseManager의 메서드 호출
-                await self.db_manager.store_initial_candles(candles_data)
-                logger.info(f"Successfully stored {len(candles_data)} historical candles")
+                await self.db_manager.store_initial_candles(candles_data, symbol)
+                logger.info(f"Successfully stored {len(candles_data)} historical {symbol} candles")
             else:
-                logger.error(f"Failed to fetch historical candles: {response}")
+                logger.error(f"Failed to fetch historical {symbol} candles: {response}")
                 
         except Exception as e:
-            logger.error(f"Error storing initial candles: {e}")
+            logger.error(f"Error storing initial {symbol} candles: {e}")
 
     async def _keep_alive(self):
-        """연결 유지 및 재연결 관리"""
-        while True:
+        """Bitget 규격 텍스트 ping 전송 + pong 지연 / 채널 정체 감시
+
+        pong 이 오지 않거나 모든 채널이 멈추면 소켓을 닫아 감독 태스크가 재연결하게 한다.
+        """
+        last_ping = time.monotonic()
+        while await self.is_connected():
+            await asyncio.sleep(self.watchdog_interval)
+            now = time.monotonic()
             try:
-                if await self.is_connected():
+                if self._ping_sent_at is not None and now - self._ping_sent_at > self.pong_timeout:
+                    self.health_stats['pong_timeouts'] += 1
+                    logger.warning(f"No pong within {self.pong_timeout}s, forcing reconnect")
+                    await self._force_reconnect()
+                    return
+
+                if self._ping_sent_at is None and now - last_ping >= self.ping_interval:
+                    self._ping_sent_at = last_ping = now
                     await self.ws.send('ping')
-                    await asyncio.sleep(20)
-                else:
-                    logger.info("WebSocket disconnected, attempting reconnect...")
-                    self.connected = False
-                    await self.connect()
+
+                if self._check_stale(now):
+                    self.health_stats['stale_reconnects'] += 1
+                    logger.warning(f"All channels silent for {self.stale_after}s, forcing reconnect")
+                    await self._force_reconnect()
+                    return
             except Exception as e:
-                logger.error(f"Error in keep_alive: {e}")
-                self.connected = False
-                await asyncio.sleep(5)
-                await self.connect()
-
-    async def subscribe_kline(self, symbol: str = 'BTCUSDT'):
-       """K라인 데이터 구독"""
-       if symbol not in self.subscriptions:
-           self.subscriptions.append(symbol)
-
-       subscribe_data = {
-           "op": "subscribe",
-           "args": [{
-               "instType": "USDT-FUTURES",
-               "channel": "candle1m",
-               "instId": symbol
-           }]
-       }
+                logger.debug("Keep-alive failed: %s", e)
+                return
+
+    def _channel_age(self, symbol: str, now: float) -> float:
+        """채널 마지막 메시지 경과 시간 (연결 직후는 연결 시각 기준)"""
+        return now - max(self._last_message.get(f"candle1m:{symbol}", 0.0), self._connected_at)
+
+    def _check_stale(self, now: float) -> bool:
+        """심볼별 stale 상태를 MarketDataManager 에 반영 - 모든 채널이 멈췄으면 True"""
+        all_stale = bool(self.subscriptions)
+        for symbol in self.subscriptions:
+            stale = self._channel_age(symbol, now) > self.stale_after
+            all_stale = all_stale and stale
+            market_data = self.markets.get(symbol)
+            if market_data is not None:
+                market_data.set_stream_stale(stale)
+        return all_stale
+
+    def _mark_all_stale(self) -> None:
+        for market_data in self.markets.values():
+            market_data.set_stream_stale(True)
+
+    async def _force_reconnect(self) -> None:
+        self._mark_all_stale()
+        await self._close_socket()
+
+    def get_feed_health(self) -> Dict[str, object]:
+        """하트비트 RTT / 채널별 마지막 메시지 경과 / 거래소→수신 지연"""
+        now = time.monotonic()
+        return {
+            'heartbeat_rtt': self.heartbeat_rtt.summary(),
+            'exchange_latency': self.exchange_latency.summary(),
+            'channel_age_sec': {
+                symbol: round(self._channel_age(symbol, now), 1) for symbol in self.subscriptions
+            },
+            **self.health_stats
+        }
+
+    async def _send_subscriptions(self, symbols: List[str]) -> None:
+        """캔들 채널 구독 요청을 subscribe_batch_size 개씩 묶어 전송"""
+        args = [
+            {"instType": "USDT-FUTURES", "channel": "candle1m", "instId": symbol}
+            for symbol in symbols
+        ]
+        for i in range(0, len(args), self.subscribe_batch_size):
+            subscribe_data = {"op": "subscribe", "args": args[i:i + self.subscribe_batch_size]}
+            await self.ws.send(json.dumps(subscribe_data))
+            logger.info(f"Subscription request sent: {subscribe_data}")
+
+    async def subscribe_kline(self, symbols: Optional[Iterable[str]] = None):
+       """K라인 데이터 구독 - 재연결 시 self.subscriptions 가 자동으로 다시 전송됨"""
+       symbols = list(symbols) if symbols is not None else list(self.markets)
+       new_symbols = [symbol for symbol in symbols if symbol not in self.subscriptions]
+       self.subscriptions.extend(new_symbols)
        
        try:
-           if await self.is_connected():
-               await self.ws.send(json.dumps(subscribe_data))
-               logger.info(f"Subscription request sent: {subscribe_data}")
-               if not self._processing:
-                   asyncio.create_task(self._process_messages())
-           else:
-               logger.warning("WebSocket not connected, attempting reconnection...")
-               await self.connect()
+           if new_symbols and await self.is_connected():
+               await self._send_subscriptions(new_symbols)
        except Exception as e:
+           # 연결이 끊긴 경우 감독 태스크가 재연결 후 전체 구독을 다시 보냄
            logger.error(f"Error subscribing to kline: {e}")
-           await self.connect()
 
-    async def _process_messages(self):
-        """메시지 처리 무한 루프"""
-        if self._processing:
+    def _start_consumers(self) -> None:
+        """처리 태스크 시작 (심볼마다 항상 같은 큐/태스크가 맡아 순서 유지)"""
+        if self._consumers and not all(task.done() for task in self._consumers):
             return
-           
-        self._processing = True
-        try:
-            while await self.is_connected():
-                try:
-                    message = await self.ws.recv()
-                    if message == 'pong':
-                        continue
-                       
-                    data = json.loads(message)
-                    logger.debug(f"Received data: {data}")
-                    
-                    if not self.reconnecting:  # 재연결 중이 아닐 때만 처리
-                        if data.get('action') == 'update' and 'data' in data:
-                            await self._handle_kline_data(data['data'])
-
-                except websockets.exceptions.ConnectionClosed:
-                    logger.warning("WebSocket connection closed, attempting reconnect...")
-                    self.connected = False
-                    self.reconnecting = True  # 재연결 상태 설정
-                    await asyncio.sleep(5)
-                    await self.connect()
-                    self.reconnecting = False  # 재연결 완료
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    await asyncio.sleep(1)
-                    
-        finally:
-            self._processing = False
+        self._queues = [
+            CandleUpdateQueue(self.queue_maxsize, self.queue_policy)
+            for _ in range(self.consumer_count)
+        ]
+        self._queue_index = {
+            symbol: i % self.consumer_count for i, symbol in enumerate(self.markets)
+        }
+        self._consumers = [asyncio.create_task(self._consume(queue)) for queue in self._queues]
 
-    async def _handle_kline_data(self, candle_data_list):
-       """캔들 데이터 처리"""
-       for candle_data in candle_data_list:
-           try:
-               if isinstance(candle_data, list) and len(candle_data) >= 6:
-                   candle = Candle(
-                       timestamp=int(candle_data[0]),
-                       open=float(candle_data[1]),
-                       high=float(candle_data[2]),
-                       low=float(candle_data[3]),
-                       close=float(candle_data[4]),
-                       volume=float(candle_data[5]),
-                       quote_volume=float(candle_data[6]) if len(candle_data) > 6 else None
-                   )
+    def _queue_for(self, symbol: str) -> CandleUpdateQueue:
+        return self._queues[self._queue_index.get(symbol, 0)]
+
+    async def _consume(self, queue: CandleUpdateQueue) -> None:
+        """큐에서 병합된 캔들 갱신을 꺼내 MarketDataManager 에 반영"""
+        stats = self.processing_stats
+        while True:
+            try:
+                batch = await queue.get_batch(self.consumer_batch_size)
+                for symbol, row, received_at in batch:
+                    # 수신 후 처리 시작까지 걸린 시간
+                    age_ms = (time.monotonic() - received_at) * 1000
+                    stats['processed'] += 1
+                    stats['last_age_ms'] = age_ms
+                    stats['avg_age_ms'] += (age_ms - stats['avg_age_ms']) * 0.05
+                    stats['max_age_ms'] = max(stats['max_age_ms'], age_ms)
+                    # 캔들마다 트레이스 시작 (수신 시각 기준) - 이벤트 버스를 통해 전략까지 전달
+                    token = tracer.start_trace(received_at)
+                    try:
+                        tracer.record(STAGE_QUEUE_WAIT, age_ms)
+                        await self._handle_kline_data([row], symbol)
+                    finally:
+                        tracer.end_trace(token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in candle consumer: {e}")
+                await asyncio.sleep(0.1)
+
+    def get_queue_stats(self) -> Dict[str, float]:
+        """수신 큐 적체 / 메시지 대기 시간 통계"""
+        stats = {'queue_depth': sum(queue.qsize() for queue in self._queues),
+                 **self.processing_stats}
+        for key in ('received', 'coalesced', 'held', 'blocked_puts', 'block_wait_ms', 'max_depth'):
+            stats[key] = sum(queue.stats[key] for queue in self._queues)
+        return stats
+
+    async def _process_messages(self):
+        """수신 루프 - 디코딩 후 큐에 넣기만 하고 바로 다음 프레임 수신 (끊기면 반환)"""
+        while await self.is_connected():
+            try:
+                message = await self.ws.recv()
+                received_at = time.monotonic()
+                self.processing_stats['messages'] += 1
+                if message == 'pong':
+                    if self._ping_sent_at is not None:
+                        self.heartbeat_rtt.record((received_at - self._ping_sent_at) * 1000)
+                        self._ping_sent_at = None
+                    continue
                    
-                   # MarketDataManager의 캐시 업데이트 (DB 저장 포함)
-                   await self.market_data.update_latest_candle(candle)
-                   logger.debug(f"Processed new candle: {candle}")
+                # 캔들 배열은 코덱에서 바로 숫자 튜플로 디코딩
+                with tracer.span(STAGE_JSON_DECODE):
+                    update = codec.decode_candle_message(message)
+                # 핫패스 로그는 DEBUG 가 꺼져 있으면 포맷하지 않음
+                logger.debug("Received data: %s", message)
+                
+                if update.action == 'update' and update.rows:
+                    self._last_message[f"candle1m:{update.symbol}"] = received_at
+                    if update.ts:
+                        exchange_ms = max(0.0, time.time() * 1000 - update.ts)
+                        self.exchange_latency.record(exchange_ms)
+                        tracer.record(STAGE_WS_RECEIVE, exchange_ms)
+                    queue = self._queue_for(update.symbol)
+                    for row in update.rows:
+                        await queue.put(update.symbol, row, received_at)
+                elif update.message and update.message.get('event') == 'error':
+                    logger.error(f"WebSocket error event: {update.message}")
+
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning("WebSocket connection closed")
+                return
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                await asyncio.sleep(1)
+
+    async def _handle_kline_data(self, rows: List[CandleRow], symbol: Optional[str]):
+       """캔들 데이터를 해당 심볼의 MarketDataManager 로 전달"""
+       market_data = self.markets.get(symbol)
+       if market_data is None:
+           logger.debug("Ignoring candle for unsubscribed symbol: %s", symbol)
+           return
+
+       for row in rows:
+           try:
+               candle = Candle(*row)
+               
+               # MarketDataManager의 캐시 업데이트 (DB 저장 포함)
+               await market_data.update_latest_candle(candle)
+               logger.debug("Processed new candle: %s", candle)
 
            except Exception as e:
-               logger.error(f"Error processing candle data: {e}, data: {candle_data}")
+               logger.error(f"Error processing candle data: {e}, data: {row}")
                continue
\ No newline at end of file
@@ -1,12 +1,32 @@
 import aiomysql
+import asyncio
 import logging
 import os
-from typing import Optional, List, Dict
+import time
+from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from tracing import tracer, STAGE_DB_FLUSH
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SYMBOL = 'BTCUSDT'  # symbol 컬럼 도입 전 데이터의 심볼
+
+# 타임프레임별 봉 길이 (ms) - 각각 kline_{timeframe} 테이블에 저장
+TIMEFRAME_MS = {
+    '1m': 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+}
+
+def candle_table(timeframe: str) -> str:
+    """타임프레임의 캔들 테이블 이름 (허용된 값만)"""
+    if timeframe not in TIMEFRAME_MS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return f"kline_{timeframe}"
+
 @dataclass
 class Candle:
     timestamp: int
@@ -31,6 +51,32 @@ class DatabaseManager:
             self.pool = None
             DatabaseManager._initialized = True
             self.logger = logging.getLogger("bitget_api")
+
+            # 캔들 write-behind 큐 설정
+            self.candle_batch_size = 100          # 이 개수 이상 쌓이면 즉시 플러시
+            self.candle_flush_interval = 1.0      # 최대 플러시 간격 (초)
+            self.max_pending_candles = 5000       # 메모리 상한 (서로 다른 timestamp 수)
+            self.backpressure_timeout = 5.0       # 큐가 가득 찼을 때 최대 대기 시간 (초)
+            self.bulk_chunk_size = 1000           # multi-row INSERT 한 문장당 행 수
+            self._pending_candles: Dict[Tuple[str, str, int], Candle] = {}  # (timeframe, symbol, timestamp) 키
+            self._flush_event = asyncio.Event()
+            self._space_available = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._writer_task: Optional[asyncio.Task] = None
+            self._writer_stopping = False
+            self.write_behind_stats = {
+                'enqueued': 0,
+                'coalesced': 0,
+                'flushed_rows': 0,
+                'flush_count': 0,
+                'flush_errors': 0,
+                'backpressure_waits': 0,
+                'backpressure_wait_ms': 0.0,
+                'dropped': 0,
+                'max_pending_seen': 0,
+                'last_flush_rows': 0,
+                'last_flush_ms': 0.0
+            }
     
     async def initialize(self):
         """비동기 DB 풀 초기화"""
@@ -43,6 +89,7 @@ class DatabaseManager:
                 autocommit=True
             )
             await self._setup_database()
+            self._start_candle_writer()
         except Exception as e:
             logger.error(f"Failed to initialize database pool: {e}")
             raise
@@ -54,16 +101,38 @@ class DatabaseManager:
                 # 기존 캔들 테이블
                 await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS kline_1m (
-                    timestamp BIGINT PRIMARY KEY,
+                    symbol VARCHAR(20) NOT NULL,
+                    timestamp BIGINT NOT NULL,
                     open FLOAT,
                     high FLOAT,
                     low FLOAT,
                     close FLOAT,
                     volume FLOAT,
                     quote_volume FLOAT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, timestamp)
                 )
                 """)
+                await self._migrate_kline_symbol(cursor)
+                
+                # 상위 타임프레임 캔들 테이블
+                for timeframe in TIMEFRAME_MS:
+                    if timeframe == '1m':
+                        continue
+                    await cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {candle_table(timeframe)} (
+                        symbol VARCHAR(20) NOT NULL,
+                        timestamp BIGINT NOT NULL,
+                        open FLOAT,
+                        high FLOAT,
+                        low FLOAT,
+                        close FLOAT,
+                        volume FLOAT,
+                        quote_volume FLOAT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                        PRIMARY KEY (symbol, timestamp)
+                    )
+                    """)
                 await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS market_sentiment_data (
                     timestamp BIGINT,
@@ -80,6 +149,19 @@ class DatabaseManager:
                 )
                 """)
                 
+                # OI / 롱숏 비율 원본 샘플 (재시작 시 캐시 복원용)
+                await cursor.execute("""
+                CREATE TABLE IF NOT EXISTS market_sentiment_sample (
+                    symbol VARCHAR(20) NOT NULL,
+                    kind VARCHAR(10) NOT NULL,
+                    timestamp BIGINT NOT NULL,
+                    value DOUBLE NOT NULL,
+                    long_ratio FLOAT,
+                    short_ratio FLOAT,
+                    PRIMARY KEY (symbol, kind, timestamp)
+                )
+                """)
+                
                 # 거래 기록 테이블
                 await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS trade_history (
@@ -100,18 +182,49 @@ class DatabaseManager:
                 )
                 """)
 
-    async def store_candle(self, candle: Candle):
+                # 백필 진행 체크포인트 테이블
+                await cursor.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_checkpoint (
+                    symbol VARCHAR(20),
+                    granularity VARCHAR(10),
+                    verified_until BIGINT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, granularity)
+                )
+                """)
+
+    async def _migrate_kline_symbol(self, cursor) -> None:
+        """symbol 컬럼이 없는 기존 kline_1m 을 (symbol, timestamp) 키로 변환"""
+        await cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'kline_1m' AND COLUMN_NAME = 'symbol'
+        """)
+        row = await cursor.fetchone()
+        if row and row[0]:
+            return
+
+        logger.info(f"Migrating kline_1m to symbol-partitioned key (existing rows -> {DEFAULT_SYMBOL})")
+        await cursor.execute(f"""
+            ALTER TABLE kline_1m
+            ADD COLUMN symbol VARCHAR(20) NOT NULL DEFAULT '{DEFAULT_SYMBOL}' FIRST,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (symbol, timestamp)
+        """)
+        await cursor.execute("ALTER TABLE kline_1m ALTER COLUMN symbol DROP DEFAULT")
+
+    async def store_candle(self, candle: Candle, symbol: str = DEFAULT_SYMBOL):
         """단일 캔들 데이터 비동기 저장"""
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cursor:
                     await cursor.execute("""
                         INSERT INTO kline_1m 
-                        (timestamp, open, high, low, close, volume, quote_volume)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                        (symbol, timestamp, open, high, low, close, volume, quote_volume)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                         ON DUPLICATE KEY UPDATE
                         open=%s, high=%s, low=%s, close=%s, volume=%s, quote_volume=%s
                     """, (
+                        symbol,
                         candle.timestamp,
                         candle.open,
                         candle.high,
@@ -132,72 +245,322 @@ class DatabaseManager:
                   extra={'action': 'store_candle'})
             raise
         
-    async def get_recent_candles(self, limit: int = 200) -> List[Candle]:
-        """최근 캔들 데이터 비동기 조회"""
+    def _start_candle_writer(self) -> None:
+        """write-behind 워커 시작"""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_stopping = False
+            self._writer_task = asyncio.create_task(self._candle_writer())
+
+    async def queue_candle(self, candle: Candle, symbol: str = DEFAULT_SYMBOL,
+                           timeframe: str = '1m') -> None:
+        """캔들을 write-behind 큐에 추가 (같은 타임프레임/심볼/timestamp 는 최신 값으로 병합)"""
+        stats = self.write_behind_stats
+        stats['enqueued'] += 1
+        key = (timeframe, symbol, candle.timestamp)
+
+        if key in self._pending_candles:
+            self._pending_candles[key] = candle
+            stats['coalesced'] += 1
+            return
+
+        if len(self._pending_candles) >= self.max_pending_candles:
+            await self._wait_for_space()
+
+        self._pending_candles[key] = candle
+        stats['max_pending_seen'] = max(stats['max_pending_seen'], len(self._pending_candles))
+
+        if len(self._pending_candles) >= self.candle_batch_size:
+            self._flush_event.set()
+
+    async def _wait_for_space(self) -> None:
+        """큐가 가득 찼을 때 플러시를 기다리고, 시간 초과 시 가장 오래된 캔들 폐기"""
+        stats = self.write_behind_stats
+        stats['backpressure_waits'] += 1
+        start = time.perf_counter()
+        deadline = start + self.backpressure_timeout
+
+        while len(self._pending_candles) >= self.max_pending_candles:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or self._writer_task is None or self._writer_task.done():
+                break
+            self._space_available.clear()
+            self._flush_event.set()
+            try:
+                await asyncio.wait_for(self._space_available.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+
+        stats['backpressure_wait_ms'] += (time.perf_counter() - start) * 1000
+
+        while len(self._pending_candles) >= self.max_pending_candles:
+            oldest = min(self._pending_candles, key=lambda key: key[2])
+            del self._pending_candles[oldest]
+            stats['dropped'] += 1
+            self.logger.warning(f"Candle write-behind queue full, dropped candle {oldest}",
+                  extra={'action': 'queue_candle'})
+
+    async def _candle_writer(self) -> None:
+        """크기 또는 시간 조건에 따라 대기 중인 캔들 플러시"""
+        while not self._writer_stopping:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(),
+                                           timeout=self.candle_flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+                await self.flush_candles()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in candle writer: {e}")
+                await asyncio.sleep(1)
+
+    async def flush_candles(self) -> int:
+        """대기 중인 캔들을 multi-row INSERT 로 일괄 저장"""
+        async with self._flush_lock:
+            if not self._pending_candles or self.pool is None:
+                return 0
+
+            batch = self._pending_candles
+            self._pending_candles = {}
+            rows_by_symbol: Dict[Tuple[str, str], List[tuple]] = {}
+            for (timeframe, symbol, _), c in batch.items():
+                rows_by_symbol.setdefault((timeframe, symbol), []).append(
+                    (c.timestamp, c.open, c.high, c.low, c.close, c.volume, c.quote_volume)
+                )
+            rows = len(batch)
+
+            start = time.perf_counter()
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.cursor() as cursor:
+                        for (timeframe, symbol), symbol_rows in rows_by_symbol.items():
+                            for i in range(0, len(symbol_rows), self.bulk_chunk_size):
+                                await self._execute_candle_upsert(
+                                    cursor, symbol_rows[i:i + self.bulk_chunk_size], symbol, timeframe
+                                )
+            except Exception as e:
+                # 실패한 배치는 되돌리되, 그 사이 들어온 최신 값은 덮어쓰지 않음
+                for key, candle in batch.items():
+                    self._pending_candles.setdefault(key, candle)
+                self.write_behind_stats['flush_errors'] += 1
+                self.logger.error(f"Error flushing {rows} candles: {e}", 
+                      extra={'action': 'flush_candles'})
+                return 0
+            finally:
+                self._space_available.set()
+
+            stats = self.write_behind_stats
+            stats['flush_count'] += 1
+            stats['flushed_rows'] += rows
+            stats['last_flush_rows'] = rows
+            stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+            tracer.record(STAGE_DB_FLUSH, stats['last_flush_ms'], attach=False)
+            return rows
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """DB 연결 풀 크기 / 사용 중 / 최대"""
+        if self.pool is None:
+            return {'size': 0, 'free': 0, 'used': 0, 'max': 0}
+        return {
+            'size': self.pool.size,
+            'free': self.pool.freesize,
+            'used': self.pool.size - self.pool.freesize,
+            'max': self.pool.maxsize
+        }
+
+    def get_write_behind_stats(self) -> Dict[str, float]:
+        """write-behind 큐 상태 조회"""
+        return {**self.write_behind_stats, 'pending': len(self._pending_candles)}
+
+    async def _stop_candle_writer(self) -> None:
+        """워커 종료 후 남은 캔들 최종 플러시"""
+        self._writer_stopping = True
+        self._flush_event.set()
+        if self._writer_task is not None:
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Error stopping candle writer: {e}")
+            self._writer_task = None
+
+        await self.flush_candles()
+        if self._pending_candles:
+            logger.error(f"{len(self._pending_candles)} candles could not be flushed on shutdown")
+
+    @staticmethod
+    def _candles_from_rows(rows) -> List[Candle]:
+        return [
+            Candle(
+                timestamp=row[0],
+                open=float(row[1]),
+                high=float(row[2]),
+                low=float(row[3]),
+                close=float(row[4]),
+                volume=float(row[5]),
+                quote_volume=float(row[6]) if row[6] else None
+            )
+            for row in rows
+        ]
+
+    async def get_recent_candles(self, limit: int = 200, symbol: str = DEFAULT_SYMBOL,
+                                 timeframe: str = '1m') -> List[Candle]:
+        """최근 캔들 데이터 비동기 조회 (최신 순)"""
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cursor:
-                    await cursor.execute("""
+                    await cursor.execute(f"""
                         SELECT timestamp, open, high, low, close, volume, quote_volume
-                        FROM kline_1m
+                        FROM {candle_table(timeframe)}
+                        WHERE symbol = %s
                         ORDER BY timestamp DESC
                         LIMIT %s
-                    """, (limit,))
+                    """, (symbol, limit))
                     
                     rows = await cursor.fetchall()
-                    
-                    return [
-                        Candle(
-                            timestamp=row[0],
-                            open=float(row[1]),
-                            high=float(row[2]),
-                            low=float(row[3]),
-                            close=float(row[4]),
-                            volume=float(row[5]),
-                            quote_volume=float(row[6]) if row[6] else None
-                        )
-                        for row in rows
-                    ]
+                    return self._candles_from_rows(rows)
                     
         except Exception as e:
-            logger.error(f"Error fetching recent candles: {e}")
+            logger.error(f"Error fetching recent {timeframe} candles: {e}")
             return []
 
-    async def store_initial_candles(self, candles: List[Dict]):
-        """초기 캔들 데이터 일괄 비동기 저장"""
+    async def get_candles_between(self, start_time: int, end_time: int,
+                                  symbol: str = DEFAULT_SYMBOL) -> List[Candle]:
+        """구간 내 1분봉 조회 (시간 오름차순) - 상위 타임프레임 재집계용"""
         try:
             async with self.pool.acquire() as conn:
                 async with conn.cursor() as cursor:
-                    for candle_data in candles:
-                        await cursor.execute("""
-                            INSERT INTO kline_1m 
-                            (timestamp, open, high, low, close, volume, quote_volume)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON DUPLICATE KEY UPDATE
-                            open=%s, high=%s, low=%s, close=%s, volume=%s, quote_volume=%s
-                        """, (
-                            int(candle_data[0]),
-                            float(candle_data[1]),
-                            float(candle_data[2]),
-                            float(candle_data[3]),
-                            float(candle_data[4]),
-                            float(candle_data[5]),
-                            float(candle_data[6]),
-                            float(candle_data[1]),
-                            float(candle_data[2]),
-                            float(candle_data[3]),
-                            float(candle_data[4]),
-                            float(candle_data[5]),
-                            float(candle_data[6])
-                        ))
-                        
-            logger.info(f"Successfully stored {len(candles)} initial candles")
+                    await cursor.execute("""
+                        SELECT timestamp, open, high, low, close, volume, quote_volume
+                        FROM kline_1m
+                        WHERE symbol = %s AND timestamp BETWEEN %s AND %s
+                        ORDER BY timestamp
+                    """, (symbol, start_time, end_time))
+                    
+                    rows = await cursor.fetchall()
+                    return self._candles_from_rows(rows)
+                    
+        except Exception as e:
+            logger.error(f"Error fetching candles between {start_time} and {end_time}: {e}")
+            return []
+
+    async def store_initial_candles(self, candles: List[Dict], symbol: str = DEFAULT_SYMBOL):
+        """초기 캔들 데이터 일괄 비동기 저장"""
+        try:
+            rows = self.candle_rows_from_api(candles)
+            await self.bulk_upsert_candles(rows, symbol=symbol)
+            logger.info(f"Successfully stored {len(candles)} initial {symbol} candles")
             
         except Exception as e:
             logger.error(f"Error storing initial candles: {e}")
             raise
 
-    async def store_market_indicators(self, timestamp: int, indicators: dict):
+    @staticmethod
+    def candle_rows_from_api(candles: List[list]) -> List[tuple]:
+        """REST 캔들 응답을 kline_1m 행 튜플로 변환"""
+        return [
+            (
+                int(candle_data[0]),
+                float(candle_data[1]),
+                float(candle_data[2]),
+                float(candle_data[3]),
+                float(candle_data[4]),
+                float(candle_data[5]),
+                float(candle_data[6])
+            )
+            for candle_data in candles
+        ]
+
+    async def bulk_upsert_candles(self, rows: List[tuple], chunk_size: Optional[int] = None,
+                                  symbol: str = DEFAULT_SYMBOL, timeframe: str = '1m') -> Dict[str, float]:
+        """캔들 행 대량 저장 - 청크 단위 multi-row INSERT
+
+        Args:
+            rows: (timestamp, open, high, low, close, volume, quote_volume) 튜플 목록
+            chunk_size: 한 문장에 넣을 행 수 (기본값 bulk_chunk_size)
+            symbol: 행이 속한 심볼
+            timeframe: 저장할 타임프레임 테이블
+
+        Returns:
+            dict: rows, chunks, elapsed_sec, rows_per_sec
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        start = time.perf_counter()
+        chunks = 0
+
+        if rows:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    for i in range(0, len(rows), chunk_size):
+                        await self._execute_candle_upsert(cursor, rows[i:i + chunk_size], symbol, timeframe)
+                        chunks += 1
+
+        elapsed = time.perf_counter() - start
+        result = {
+            'rows': len(rows),
+            'chunks': chunks,
+            'elapsed_sec': elapsed,
+            'rows_per_sec': len(rows) / elapsed if elapsed > 0 else 0.0
+        }
+        logger.info(f"Bulk stored {len(rows)} {symbol} {timeframe} candles in {chunks} chunks "
+                    f"({elapsed:.3f}s, {result['rows_per_sec']:.0f} rows/sec)")
+        return result
+
+    async def _execute_candle_upsert(self, cursor, rows: List[tuple], symbol: str,
+                                     timeframe: str = '1m') -> None:
+        """한 번의 왕복으로 같은 심볼의 여러 캔들 행 upsert"""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+        params = [value for row in rows for value in (symbol, *row)]
+        await cursor.execute(f"""
+            INSERT INTO {candle_table(timeframe)} 
+            (symbol, timestamp, open, high, low, close, volume, quote_volume)
+            VALUES {placeholders}
+            ON DUPLICATE KEY UPDATE
+            open=VALUES(open), high=VALUES(high), low=VALUES(low),
+            close=VALUES(close), volume=VALUES(volume),
+            quote_volume=VALUES(quote_volume)
+        """, params)
+
+    async def get_candle_timestamps(self, start_time: int, end_time: int,
+                                    symbol: str = DEFAULT_SYMBOL) -> List[int]:
+        """구간 내 저장된 캔들 timestamp 목록 (오름차순)"""
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT timestamp FROM kline_1m
+                    WHERE symbol = %s AND timestamp BETWEEN %s AND %s
+                    ORDER BY timestamp
+                """, (symbol, start_time, end_time))
+                rows = await cursor.fetchall()
+                return [int(row[0]) for row in rows]
+
+    async def get_backfill_checkpoint(self, symbol: str, granularity: str = '1m') -> Optional[int]:
+        """백필 검증 완료 시점 조회"""
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT verified_until FROM backfill_checkpoint
+                    WHERE symbol = %s AND granularity = %s
+                """, (symbol, granularity))
+                row = await cursor.fetchone()
+                return int(row[0]) if row and row[0] is not None else None
+
+    async def save_backfill_checkpoint(self, symbol: str, verified_until: int, 
+                                       granularity: str = '1m') -> None:
+        """백필 검증 완료 시점 저장"""
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO backfill_checkpoint (symbol, granularity, verified_until)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE verified_until=VALUES(verified_until)
+                """, (symbol, granularity, verified_until))
+
+    async def store_market_indicators(self, timestamp: int, indicators: dict,
+                                      symbol: str = DEFAULT_SYMBOL):
         """시장 지표 비동기 저장"""
         try:
             async with self.pool.acquire() as conn:
@@ -212,7 +575,7 @@ class DatabaseManager:
                         long_ratio=%s, short_ratio=%s, ls_ratio_slope=%s, ls_ratio_acceleration=%s
                     """, (
                         timestamp,
-                        'BTCUSDT',  # 현재는 BTCUSDT만 사용
+                        symbol,
                         indicators.get('open_interest', 0.0),
                         indicators.get('oi_rsi', 0.0),
                         indicators.get('oi_slope', 0.0),
@@ -238,6 +601,106 @@ class DatabaseManager:
             logger.error(f"Error storing market indicators: {e}")
             raise
 
+    async def store_sentiment_samples(self, kind: str, samples: List[tuple],
+                                      symbol: str = DEFAULT_SYMBOL) -> None:
+        """OI / 롱숏 비율 원본 샘플 저장
+
+        samples: (timestamp, value, long_ratio, short_ratio) 튜플 목록. OI 는 비율 값이 None.
+        """
+        if not samples:
+            return
+        try:
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(samples))
+            params = [value for sample in samples for value in (symbol, kind, *sample)]
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(f"""
+                        INSERT INTO market_sentiment_sample
+                        (symbol, kind, timestamp, value, long_ratio, short_ratio)
+                        VALUES {placeholders}
+                        ON DUPLICATE KEY UPDATE
+                        value=VALUES(value), long_ratio=VALUES(long_ratio),
+                        short_ratio=VALUES(short_ratio)
+                    """, params)
+        except Exception as e:
+            logger.error(f"Error storing {kind} samples: {e}")
+
+    async def get_sentiment_samples(self, kind: str, since: int, limit: int,
+                                    symbol: str = DEFAULT_SYMBOL) -> List[tuple]:
+        """since 이후 최근 원본 샘플 최대 limit 개 (시간 오름차순)"""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("""
+                        SELECT timestamp, value, long_ratio, short_ratio
+                        FROM market_sentiment_sample
+                        WHERE symbol = %s AND kind = %s AND timestamp >= %s
+                        ORDER BY timestamp DESC
+                        LIMIT %s
+                    """, (symbol, kind, since, limit))
+                    rows = await cursor.fetchall()
+                    return [
+                        (int(row[0]), float(row[1]),
+                         float(row[2]) if row[2] is not None else None,
+                         float(row[3]) if row[3] is not None else None)
+                        for row in reversed(rows)
+                    ]
+        except Exception as e:
+            logger.error(f"Error fetching {kind} samples: {e}")
+            return []
+
+    async def get_recent_market_sentiment(self, since: int, limit: int,
+                                          symbol: str = DEFAULT_SYMBOL) -> List[Dict[str, float]]:
+        """since 이후 저장된 시장 지표 최대 limit 개 (시간 오름차순)"""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("""
+                        SELECT timestamp, open_interest, long_ratio, short_ratio
+                        FROM market_sentiment_data
+                        WHERE symbol = %s AND timestamp >= %s
+                        ORDER BY timestamp DESC
+                        LIMIT %s
+                    """, (symbol, since, limit))
+                    rows = await cursor.fetchall()
+                    return [
+                        {
+                            'timestamp': int(row[0]),
+                            'open_interest': float(row[1] or 0.0),
+                            'long_ratio': float(row[2] or 0.0),
+                            'short_ratio': float(row[3] or 0.0)
+                        }
+                        for row in reversed(rows)
+                    ]
+        except Exception as e:
+            logger.error(f"Error fetching market sentiment history: {e}")
+            return []
+
+    async def get_market_sentiment_between(self, start_time: int, end_time: int,
+                                           symbol: str = DEFAULT_SYMBOL) -> List[Dict[str, float]]:
+        """구간 내 저장된 시장 지표 전체 (시간 오름차순) - 백테스트용"""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("""
+                        SELECT timestamp, open_interest, oi_rsi, oi_slope, oi_change_percent,
+                        long_ratio, short_ratio, ls_ratio_slope, ls_ratio_acceleration
+                        FROM market_sentiment_data
+                        WHERE symbol = %s AND timestamp BETWEEN %s AND %s
+                        ORDER BY timestamp
+                    """, (symbol, start_time, end_time))
+                    rows = await cursor.fetchall()
+                    columns = ('open_interest', 'oi_rsi', 'oi_slope', 'oi_change_percent',
+                               'long_ratio', 'short_ratio', 'ls_ratio_slope', 'ls_ratio_acceleration')
+                    return [
+                        {'timestamp': int(row[0]),
+                         **{column: float(value or 0.0) for column, value in zip(columns, row[1:])}}
+                        for row in rows
+                    ]
+        except Exception as e:
+            logger.error(f"Error fetching market sentiment between {start_time} and {end_time}: {e}")
+            return []
+
     async def store_trade(self, trade_data: dict):
         """거래 기록 비동기 저장"""
         try:
@@ -270,5 +733,6 @@ class DatabaseManager:
     async def close(self):
         """연결 풀 종료"""
         if self.pool is not None:
+            await self._stop_candle_writer()
             self.pool.close()
             await self.pool.wait_closed()
\ No newline at end of file
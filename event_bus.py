@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from tracing import tracer, Trace
+
+logger = logging.getLogger(__name__)
+
+# 시장 데이터 이벤트 토픽
+EVENT_CANDLE = 'candle'
+EVENT_OPEN_INTEREST = 'open_interest'
+EVENT_POSITION_RATIO = 'position_ratio'
+
+class EventSubscription:
+    """토픽별 최신 이벤트만 보관하는 구독 (느린 구독자도 메모리가 늘지 않음)"""
+
+    def __init__(self, bus: 'EventBus', topics: Iterable[str]):
+        self.bus = bus
+        self.topics = tuple(topics)
+        self._pending: Dict[str, Any] = {}
+        self._event = asyncio.Event()
+        self.received = 0
+        self.coalesced = 0
+        self.trace: Optional[Trace] = None  # 마지막으로 받은 이벤트의 트레이스 (계측 활성화 시)
+
+    def _deliver(self, topic: str, payload: Any, trace: Optional[Trace] = None) -> None:
+        if topic in self._pending:
+            self.coalesced += 1
+        self._pending[topic] = payload
+        if trace is not None:
+            self.trace = trace
+        self.received += 1
+        self._event.set()
+
+    async def wait(self, timeout: Optional[float] = None, debounce: float = 0.0) -> Dict[str, Any]:
+        """이벤트 대기 후 debounce 동안 추가 이벤트를 모아 토픽별 최신 값 반환
+
+        timeout 안에 이벤트가 없으면 빈 dict 를 반환한다.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return {}
+        if debounce > 0:
+            await asyncio.sleep(debounce)
+
+        events = self._pending
+        self._pending = {}
+        self._event.clear()
+        return events
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    """프로세스 내 pub/sub 이벤트 버스"""
+
+    def __init__(self):
+        self._subscriptions: Dict[str, List[EventSubscription]] = {}
+        self.sequence = 0  # 발행된 이벤트 수 (입력 변경 감지용)
+        self.last_published: Dict[str, float] = {}
+
+    def subscribe(self, topics: Iterable[str]) -> EventSubscription:
+        subscription = EventSubscription(self, topics)
+        for topic in subscription.topics:
+            self._subscriptions.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        for topic in subscription.topics:
+            subscribers = self._subscriptions.get(topic, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+
+    def publish(self, topic: str, payload: Any = None) -> None:
+        self.sequence += 1
+        self.last_published[topic] = time.time()
+        trace = tracer.current()  # 구독자 태스크로 트레이스 전달
+        for subscription in self._subscriptions.get(topic, ()):
+            try:
+                subscription._deliver(topic, payload, trace)
+            except Exception as e:
+                logger.error(f"Error delivering {topic} event: {e}")
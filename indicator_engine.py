@@ -0,0 +1,300 @@
+import math
+import logging
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+from database_manager import Candle
+from candle_buffer import CandleRingBuffer
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+class _RollingMean:
+    """확정 봉 (window-1)개 + 진행 중 봉 1개에 대한 이동평균
+
+    pandas rolling(window).mean() 과 같이 창 안에 NaN 이 있거나 데이터가
+    모자라면 NaN 을 반환한다.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._capacity = window - 1
+        self._values = deque()
+        self._sum = 0.0
+        self._nan_count = 0
+        self._nonzero_count = 0
+        self._commits = 0
+
+    def reset(self) -> None:
+        self._values.clear()
+        self._sum = 0.0
+        self._nan_count = 0
+        self._nonzero_count = 0
+        self._commits = 0
+
+    def commit(self, value: float) -> None:
+        if self._capacity <= 0:
+            return
+        if len(self._values) == self._capacity:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._sum += value
+            if value != 0.0:
+                self._nonzero_count += 1
+
+        # 덧셈/뺄셈 누적 오차 방지를 위해 주기적으로 다시 합산
+        self._commits += 1
+        if self._commits >= self.window:
+            self._commits = 0
+            self._sum = math.fsum(v for v in self._values if not math.isnan(v))
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self._nan_count -= 1
+        else:
+            self._sum -= value
+            if value != 0.0:
+                self._nonzero_count -= 1
+
+    def value(self, live: float) -> float:
+        if len(self._values) < self._capacity or self._nan_count or math.isnan(live):
+            return NAN
+        # 창 안이 모두 0이면 누적 오차 없이 정확히 0
+        total = self._sum if self._nonzero_count else 0.0
+        return (total + live) / self.window
+
+class _RollingExtrema:
+    """단조 덱 기반 이동 최소/최대 (확정 봉 window-1개 + 진행 중 봉)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._capacity = window - 1
+        self._values = deque()
+        self._min = deque()  # (index, value) 오름차순
+        self._max = deque()  # (index, value) 내림차순
+        self._nan_count = 0
+        self._index = 0
+
+    def reset(self) -> None:
+        self._values.clear()
+        self._min.clear()
+        self._max.clear()
+        self._nan_count = 0
+        self._index = 0
+
+    def commit(self, value: float) -> None:
+        if self._capacity <= 0:
+            return
+        if len(self._values) == self._capacity:
+            if math.isnan(self._values.popleft()):
+                self._nan_count -= 1
+        self._values.append(value)
+
+        index = self._index
+        self._index += 1
+        expired = index - self._capacity
+        while self._min and self._min[0][0] <= expired:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= expired:
+            self._max.popleft()
+
+        if math.isnan(value):
+            self._nan_count += 1
+            return
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+
+    def bounds(self, live: float) -> Tuple[float, float]:
+        if len(self._values) < self._capacity or self._nan_count or math.isnan(live):
+            return NAN, NAN
+        low = min(self._min[0][1], live) if self._min else live
+        high = max(self._max[0][1], live) if self._max else live
+        return low, high
+
+class _WindowedEMA:
+    """최근 window개 봉에 대한 ewm(span, adjust=False) 값
+
+    pandas 는 창의 첫 봉을 시드로 재귀 계산하므로 창이 밀릴 때마다 시드가
+    바뀐다. 닫힌 형태
+
+        y = b^m * x_0 + a * (b * U + x_live),  U = sum_{j=1}^{m-1} b^(m-1-j) * x_j
+
+    를 유지하면 봉 추가/시드 제거 모두 O(1)로 같은 값을 얻는다.
+    (a = 2 / (span + 1), b = 1 - a, m = 확정 봉 개수)
+    """
+
+    def __init__(self, span: int, window: int):
+        self.span = span
+        self.window = window
+        self.alpha = 2.0 / (span + 1.0)
+        self.beta = 1.0 - self.alpha
+        self._powers = [self.beta ** i for i in range(window + 1)]
+        self._closes = deque()
+        self._u = 0.0
+
+    def reset(self) -> None:
+        self._closes.clear()
+        self._u = 0.0
+
+    def commit(self, close: float) -> None:
+        if self._closes:
+            self._u = self.beta * self._u + close
+        self._closes.append(close)
+
+        # 다음 진행 중 봉을 포함해 window개가 되도록 가장 오래된 시드 제거
+        while len(self._closes) > self.window - 1 and len(self._closes) > 1:
+            m = len(self._closes)
+            self._u -= self._powers[m - 2] * self._closes[1]
+            self._closes.popleft()
+        if self.window <= 1:
+            self._closes.clear()
+            self._u = 0.0
+
+    def value(self, live: float) -> float:
+        m = len(self._closes)
+        if m == 0:
+            return live
+        return self._powers[m] * self._closes[0] + self.alpha * (self.beta * self._u + live)
+
+class IndicatorEngine:
+    """스트리밍 기술 지표 엔진
+
+    확정된 봉은 commit 으로 상태에 반영하고, 진행 중인 1분봉은 매 업데이트마다
+    교체만 한다. 값은 MarketDataManager 의 pandas 계산
+    (get_price_data_as_df 기반 EMA / Stoch RSI / ATR)과 같은 창 규칙을 따른다.
+    """
+
+    def __init__(self, window: int = 200, ema_spans: Iterable[int] = (7, 25, 200),
+                 rsi_period: int = 42, smoothk: int = 3, smoothd: int = 3,
+                 atr_period: int = 14):
+        self.window = window
+        self.ema_spans = tuple(ema_spans)
+        self.rsi_period = rsi_period
+        self.smoothk = smoothk
+        self.smoothd = smoothd
+        self.atr_period = atr_period
+
+        self._emas = {span: _WindowedEMA(span, window) for span in self.ema_spans}
+        self._gain = _RollingMean(rsi_period)
+        self._loss = _RollingMean(rsi_period)
+        self._rsi_range = _RollingExtrema(rsi_period)
+        self._stoch = _RollingMean(smoothk)
+        self._k = _RollingMean(smoothd)
+        self._tr = _RollingMean(atr_period)
+
+        self._live: Optional[Candle] = None
+        self._prev_close: Optional[float] = None  # 마지막 확정 봉 종가
+        self._bar_count = 0
+
+    @property
+    def bar_count(self) -> int:
+        """진행 중 봉을 포함한 봉 개수"""
+        return self._bar_count
+
+    def reset(self) -> None:
+        for ema in self._emas.values():
+            ema.reset()
+        for state in (self._gain, self._loss, self._rsi_range,
+                      self._stoch, self._k, self._tr):
+            state.reset()
+        self._live = None
+        self._prev_close = None
+        self._bar_count = 0
+
+    def rebuild(self, buffer: CandleRingBuffer) -> None:
+        """버퍼 전체로 상태 재구성 (과거 봉 수정 시)"""
+        self.reset()
+        for candle in reversed(buffer.to_candles(len(buffer))):
+            self.update(candle, is_new_bar=True)
+
+    def update(self, candle: Candle, is_new_bar: bool) -> None:
+        """새 봉 추가(is_new_bar=True) 또는 진행 중 봉 갱신"""
+        if is_new_bar or self._live is None:
+            if self._live is not None:
+                self._commit(self._live)
+            self._bar_count += 1
+        self._live = candle
+
+    def _rsi_chain(self, close: float) -> Tuple[float, float, float, float, float, float]:
+        """봉 하나에 대한 gain/loss/rsi/stoch/k/d"""
+        delta = close - self._prev_close if self._prev_close is not None else NAN
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        avg_gain = self._gain.value(gain)
+        avg_loss = self._loss.value(loss)
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = NAN
+        elif avg_loss == 0.0:
+            rsi = NAN if avg_gain == 0.0 else 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        rsi_min, rsi_max = self._rsi_range.bounds(rsi)
+        if math.isnan(rsi_min) or rsi_max == rsi_min:
+            stoch = NAN
+        else:
+            stoch = 100 * (rsi - rsi_min) / (rsi_max - rsi_min)
+
+        k = self._stoch.value(stoch)
+        d = self._k.value(k)
+        return gain, loss, rsi, stoch, k, d
+
+    def _true_range(self, candle: Candle) -> float:
+        high_low = candle.high - candle.low
+        if self._prev_close is None:
+            return high_low
+        return max(high_low,
+                   abs(candle.high - self._prev_close),
+                   abs(candle.low - self._prev_close))
+
+    def _commit(self, candle: Candle) -> None:
+        """진행 중이던 봉을 확정"""
+        gain, loss, rsi, stoch, k, _ = self._rsi_chain(candle.close)
+        self._gain.commit(gain)
+        self._loss.commit(loss)
+        self._rsi_range.commit(rsi)
+        self._stoch.commit(stoch)
+        self._k.commit(k)
+        self._tr.commit(self._true_range(candle))
+        for ema in self._emas.values():
+            ema.commit(candle.close)
+        self._prev_close = candle.close
+
+    def price_indicators(self) -> Dict[str, float]:
+        """가격/EMA 지표 (calculate_technical_indicators 의 기본 가격 지표)"""
+        if self._live is None or self._bar_count < 2:
+            return {}
+        live = self._live
+        result = {
+            'last_close': float(live.close),
+            'last_volume': float(live.volume),
+            'price_change': float(live.close - self._prev_close),
+        }
+        for span, ema in self._emas.items():
+            result[f'ema{span}'] = float(ema.value(live.close))
+        return result
+
+    def stoch_rsi(self) -> Tuple[float, float]:
+        """Stochastic RSI (K, D) - 데이터 부족 시 (50, 50)"""
+        lookback = min(self._bar_count, self.rsi_period * 3)
+        if self._live is None or lookback < self.rsi_period * 2:
+            return 50.0, 50.0
+        _, _, _, _, k, d = self._rsi_chain(self._live.close)
+        if math.isnan(k) or math.isnan(d):
+            return 50.0, 50.0
+        return k, d
+
+    def atr(self) -> float:
+        """ATR - 데이터 부족 시 0"""
+        lookback = min(self._bar_count, self.atr_period * 2)
+        if self._live is None or lookback < self.atr_period:
+            return 0.0
+        return float(self._tr.value(self._true_range(self._live)))
@@ -0,0 +1,128 @@
+import bisect
+import math
+from typing import Dict, Iterable, List, Optional
+
+# 기본 버킷 경계 (ms)
+DEFAULT_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+class LatencyHistogram:
+    """고정 버킷 지연 시간 히스토그램 (ms)"""
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_BOUNDS_MS):
+        self.bounds: List[float] = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # 마지막은 최대 경계 초과
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last: Optional[float] = None
+
+    def record(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+        self.last = value_ms
+
+    def percentile(self, pct: float) -> float:
+        """백분위 근사값 - 해당 버킷의 상한 (관측 최대값 이하)"""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+            'last_ms': self.last or 0.0
+        }
+
+class HdrHistogram:
+    """로그-선형 버킷 히스토그램 (HdrHistogram 방식, 마이크로초 정수로 기록)
+
+    2^significant_bits 미만은 1us 단위로, 그 위는 2배 구간마다 같은 개수의 버킷으로 나눠
+    값 범위 전체에서 상대 오차가 약 1/2^(significant_bits-1) 로 일정하다.
+    기록은 비트 연산 몇 번이라 핫패스에서 호출해도 된다.
+    """
+
+    def __init__(self, significant_bits: int = 7, max_value_ms: float = 60_000):
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self.max_value_us = int(max_value_ms * 1000)
+        self.counts = [0] * (self._index(self.max_value_us) + 1)
+        self.reset()
+
+    def reset(self) -> None:
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = 0.0
+        self.last: Optional[float] = None
+
+    def _index(self, value_us: int) -> int:
+        shift = value_us.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value_us
+        return shift * self._half + (value_us >> shift)
+
+    def _upper_us(self, index: int) -> int:
+        """버킷에 속하는 가장 큰 값 (us)"""
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        return (((index - shift * self._half) + 1) << shift) - 1
+
+    def record(self, value_ms: float) -> None:
+        value_us = min(max(int(value_ms * 1000), 0), self.max_value_us)
+        self.counts[self._index(value_us)] += 1
+        if not self.count or value_ms < self.min:
+            self.min = value_ms
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+        self.last = value_ms
+
+    def merge(self, other: 'HdrHistogram') -> None:
+        """같은 설정의 히스토그램 합치기"""
+        for i, bucket_count in enumerate(other.counts):
+            self.counts[i] += bucket_count
+        if other.count and (not self.count or other.min < self.min):
+            self.min = other.min
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.last = other.last if other.last is not None else self.last
+
+    def percentile(self, pct: float) -> float:
+        """백분위 값 (ms) - 해당 버킷의 상한 (관측 최대값 이하)"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._upper_us(i) / 1000, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count if self.count else 0.0,
+            'min_ms': self.min,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'p999_ms': self.percentile(99.9),
+            'max_ms': self.max
+        }
@@ -0,0 +1,131 @@
+"""회전된 JSONL 로그 세그먼트를 Parquet 으로 변환
+
+사용법: python log_export.py <출력 디렉토리> [로그 디렉토리 또는 파일 ...]
+
+디렉토리를 주면 회전이 끝난 세그먼트(*.jsonl.N, *.jsonl.N.gz)만 변환한다 (기록 중인
+현재 파일은 제외). 회전할 때마다 .N 순번이 밀리므로 출력 이름은 순번 대신 세그먼트의 첫
+레코드 시각으로 정한다 (<name>.jsonl.<UTC 시각>.parquet). 같은 이름의 출력이 입력보다
+새로우면 건너뛴다 (회전은 이름만 바꾸므로 mtime 이 유지됨).
+extra 필드는 컬럼이 되고, dict/list 값(response 등)은 JSON 문자열로 저장된다.
+"""
+import glob
+import gzip
+import hashlib
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+from codec import codec
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성 - 변환할 때만 필요
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# 회전된 세그먼트: name.jsonl.3 / name.jsonl.3.gz
+ROTATED_SEGMENT = re.compile(r'\.jsonl\.\d+(\.gz)?$')
+
+def read_segment(path: str) -> Iterator[dict]:
+    """세그먼트의 JSON 줄 읽기 (.gz 자동 해제, 깨진 줄은 건너뜀)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                continue  # 형식 전환 전 텍스트 줄 등
+            if isinstance(entry, dict):
+                yield entry
+
+def segment_id(path: str) -> str:
+    """회전 순번과 무관한 세그먼트 식별값 - 첫 레코드 ts (없으면 내용 해시)"""
+    for entry in read_segment(path):
+        ts = entry.get('ts')
+        if isinstance(ts, (int, float)):
+            return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        break
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def _column(values: list) -> 'pa.Array':
+    values = [codec.dumps(v) if isinstance(v, (dict, list)) else v for v in values]
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # 같은 필드에 타입이 섞인 경우 (예: status_code 가 int / str)
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+def segment_to_table(path: str) -> Optional['pa.Table']:
+    entries = list(read_segment(path))
+    if not entries:
+        return None
+    columns: Dict[str, list] = {}
+    for entry in entries:
+        for key in entry:
+            columns.setdefault(key, None)
+    data = {key: _column([entry.get(key) for entry in entries]) for key in columns}
+    if 'ts' in data:
+        # 질의용 timestamp 컬럼 (UTC, 마이크로초)
+        micros = [int(ts * 1_000_000) if ts is not None else None for ts in data['ts'].to_pylist()]
+        data['timestamp'] = pa.array(micros, type=pa.timestamp('us', tz='UTC'))
+    return pa.table(data)
+
+def export_segments(paths: List[str], out_dir: str) -> List[str]:
+    """세그먼트 목록을 out_dir/<name>.jsonl.<세그먼트 식별값>.parquet 로 변환 - 새로 쓴 파일 목록 반환"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for path in paths:
+        # name.jsonl.3.gz → name.jsonl (회전 순번은 다음 회전 때 바뀌므로 이름에 쓰지 않음)
+        name = ROTATED_SEGMENT.sub('.jsonl', os.path.basename(path))
+        try:
+            target = os.path.join(out_dir, f"{name}.{segment_id(path)}.parquet")
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                continue
+            table = segment_to_table(path)
+            if table is None:
+                continue
+            temp = f"{target}.tmp"
+            pq.write_table(table, temp, compression='zstd')
+            os.replace(temp, target)
+            written.append(target)
+            logger.info(f"Exported {table.num_rows} rows from {path} to {target}")
+        except Exception as e:
+            logger.error(f"Error exporting {path}: {e}")
+    return written
+
+def find_segments(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(p for p in glob.glob(os.path.join(item, '*.jsonl.*'))
+                                if ROTATED_SEGMENT.search(p)))
+        else:
+            paths.append(item)
+    return paths
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    out_dir = sys.argv[1]
+    segments = find_segments(sys.argv[2:] or ['logs'])
+    written = export_segments(segments, out_dir)
+    logger.info(f"Exported {len(written)} of {len(segments)} segments to {out_dir}")
+
+if __name__ == '__main__':
+    main()
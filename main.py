@@ -5,7 +5,7 @@ import logging
 import psutil
 import os
 from dotenv import load_dotenv
-from custom_logging import setup_logging, cleanup_logging
+from custom_logging import setup_logging, cleanup_logging, default_writer
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +19,16 @@ async def main():
     try:
         # 로깅 초기화 후에 나머지 모듈들을 임포트
         from data_web import BitgetWebsocket
+        from data_private_web import BitgetPrivateWebsocket
         from data_api import BitgetAPI
         from order_execution import OrderExecutor
         from trading_strategy_implementation import TradingStrategy
         from market_data_manager import MarketDataManager
         from database_manager import DatabaseManager
+        from backfill import CandleBackfiller
+        from strategy_scheduler import StrategyScheduler
+        from tracing import tracer, STAGES
+        from metrics import registry, MetricsServer, watch_event_loop_lag
 
         logger = logging.getLogger(__name__)
 
@@ -37,31 +42,158 @@ async def main():
                 self.secret_key = os.getenv('BITGET_SECRET_KEY')
                 self.passphrase = os.getenv('BITGET_PASSPHRASE')
                 
+                # 거래 심볼 목록 (쉼표 구분)
+                self.symbols = [
+                    symbol.strip().upper()
+                    for symbol in os.getenv('TRADING_SYMBOLS', 'BTCUSDT').split(',')
+                    if symbol.strip()
+                ]
+                
+                # 틱 → 주문 단계별 지연 계측 (LATENCY_TRACE=0 이면 비활성화)
+                tracer.enabled = os.getenv('LATENCY_TRACE', '1') == '1'
+                tracer.slow_trace_ms = float(os.getenv('LATENCY_SLOW_TRACE_MS', '500'))
+                
                 # DB 매니저 초기화
                 self.db_manager = DatabaseManager()
                 
                 # API 클라이언트 초기화
                 self.api = BitgetAPI(self.api_key, self.secret_key, self.passphrase)
                 
-                # MarketData 매니저 초기화
-                self.market_data = MarketDataManager(api=self.api)
+                # 심볼별 MarketData 매니저 초기화
+                self.markets = {
+                    symbol: MarketDataManager(api=self.api, symbol=symbol)
+                    for symbol in self.symbols
+                }
                 
                 # 웹소켓 초기화
-                self.ws = BitgetWebsocket(api=self.api, market_data=self.market_data)
+                self.ws = BitgetWebsocket(api=self.api, market_data=self.markets)
+                
+                # 심볼별 누락 캔들 백필 (시작 시 + 웹소켓 재연결마다)
+                self.backfillers = [
+                    CandleBackfiller(
+                        api=self.api,
+                        db_manager=self.db_manager,
+                        symbol=symbol,
+                        on_candles=market_data.merge_candles
+                    )
+                    for symbol, market_data in self.markets.items()
+                ]
+                for backfiller in self.backfillers:
+                    self.ws.add_reconnect_callback(backfiller.run)
+                
+                # 프라이빗 웹소켓 (주문/포지션/계좌 이벤트)
+                self.private_ws = BitgetPrivateWebsocket(api=self.api)
                 
                 # 주문 실행기 초기화
-                self.order_executor = OrderExecutor(self.api)
+                self.order_executor = OrderExecutor(self.api, state_book=self.private_ws.book)
+                
+                # 심볼별 트레이딩 전략 + 동시 평가 스케줄러
+                self.strategies = [
+                    TradingStrategy(market_data=market_data, order_executor=self.order_executor)
+                    for market_data in self.markets.values()
+                ]
+                self.scheduler = StrategyScheduler(self.strategies)
                 
-                # 트레이딩 전략 초기화
-                self.strategy = TradingStrategy(
-                    market_data=self.market_data,
-                    order_executor=self.order_executor
-                )
+                # /metrics 엔드포인트 (METRICS_PORT=0 이면 비활성화, 기본은 로컬에서만 접근)
+                self.metrics_server = None
+                metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+                if metrics_port:
+                    self.metrics_server = MetricsServer(
+                        registry, host=os.getenv('METRICS_HOST', '127.0.0.1'), port=metrics_port
+                    )
+                self._setup_metrics()
                 
                 self.is_running = False
                 self.tasks = []
                 self._cleanup_done = asyncio.Event()
             
+            def _setup_metrics(self):
+                """메트릭 정의 - 대부분은 각 모듈의 통계 dict 를 스크레이프 시점에 읽어 옮김"""
+                m = self.metrics = {
+                    'ws_messages': registry.counter('ws_messages_total', 'Websocket frames received'),
+                    'ws_candles': registry.counter('ws_candles_processed_total', 'Candle updates applied to market data'),
+                    'ws_reconnects': registry.counter('ws_reconnects_total', 'Websocket reconnects'),
+                    'ws_disconnects': registry.counter('ws_disconnects_total', 'Websocket disconnects'),
+                    'ws_connected': registry.gauge('ws_connected', '1 if the public websocket is connected'),
+                    'ws_queue_depth': registry.gauge('ws_queue_depth', 'Candle updates waiting for the consumer'),
+                    'ws_channel_age': registry.gauge('ws_channel_age_seconds', 'Seconds since the last candle message',
+                                                     ('symbol',)),
+                    'rest_requests': registry.counter('rest_requests_total', 'REST requests sent', ('endpoint',)),
+                    'rest_rate_limited': registry.counter('rest_rate_limited_total', 'REST 429 responses', ('endpoint',)),
+                    'rest_errors': registry.counter('rest_errors_total', 'REST timeouts and errors', ('endpoint',)),
+                    'rest_queue_depth': registry.gauge('rest_rate_limiter_queue_depth', 'Requests waiting for a rate limit slot',
+                                                       ('group',)),
+                    'http_pool': registry.gauge('http_pool_connections', 'HTTP connection pool connections', ('state',)),
+                    'db_pool': registry.gauge('db_pool_connections', 'DB pool connections', ('state',)),
+                    'db_pool_utilisation': registry.gauge('db_pool_utilisation', 'Used DB connections / pool max'),
+                    'db_pending': registry.gauge('db_write_pending', 'Candles waiting in the write-behind queue'),
+                    'db_flushed': registry.counter('db_flushed_rows_total', 'Candle rows written by the write-behind queue'),
+                    'db_dropped': registry.counter('db_dropped_candles_total', 'Candles dropped from a full write-behind queue'),
+                    'log_queue_depth': registry.gauge('log_queue_depth', 'Records waiting for the log writer thread'),
+                    'log_written': registry.counter('log_records_written_total', 'Log records written to files'),
+                    'log_dropped': registry.counter('log_records_dropped_total', 'Log records dropped under load',
+                                                    ('file',)),
+                    'strategy_evaluations': registry.counter('strategy_evaluations_total', 'Strategy evaluations',
+                                                             ('symbol',)),
+                    'strategy_timeouts': registry.counter('strategy_timeouts_total', 'Strategy evaluations over the timeout',
+                                                          ('symbol',)),
+                    'memory': registry.gauge('process_resident_memory_bytes', 'Resident memory'),
+                    'stage_latency': registry.histogram('stage_latency_seconds',
+                                                        'Tick-to-order pipeline stage latency (LATENCY_TRACE)',
+                                                        ('stage',)),
+                    'loop_lag': registry.histogram('event_loop_lag_seconds', 'Event loop scheduling delay'),
+                    'loop_lag_last': registry.gauge('event_loop_lag_last_seconds', 'Most recent event loop delay'),
+                }
+                # DB 쓰기 / 지표 계산 / 전략 루프 등 단계별 시간은 지연 계측기에서 그대로 받음
+                for stage in STAGES:
+                    tracer.observers[stage] = (
+                        lambda elapsed_ms, stage=stage: m['stage_latency'].observe(elapsed_ms / 1000, stage=stage)
+                    )
+                registry.add_collector(self._collect_metrics)
+            
+            def _collect_metrics(self):
+                m = self.metrics
+                queue_stats = self.ws.get_queue_stats()
+                connection_stats = self.ws.get_connection_stats()
+                m['ws_messages'].set_total(queue_stats['messages'])
+                m['ws_candles'].set_total(queue_stats['processed'])
+                m['ws_queue_depth'].set(queue_stats['queue_depth'])
+                m['ws_reconnects'].set_total(connection_stats['reconnects'])
+                m['ws_disconnects'].set_total(connection_stats['disconnects'])
+                m['ws_connected'].set(1 if connection_stats['state'] == 'connected' else 0)
+                for symbol, age in self.ws.get_feed_health()['channel_age_sec'].items():
+                    m['ws_channel_age'].set(age, symbol=symbol)
+                
+                for endpoint, stats in self.api.get_endpoint_stats().items():
+                    m['rest_requests'].set_total(stats['requests'], endpoint=endpoint)
+                    m['rest_rate_limited'].set_total(stats['rate_limited'], endpoint=endpoint)
+                    m['rest_errors'].set_total(stats['errors'], endpoint=endpoint)
+                for group, stats in self.api.scheduler.get_stats().items():
+                    m['rest_queue_depth'].set(stats['queue_depth'], group=group)
+                pool_stats = self.api.get_pool_stats()
+                m['http_pool'].set(pool_stats['active'], state='active')
+                m['http_pool'].set(pool_stats['idle'], state='idle')
+                
+                db_pool = self.db_manager.get_pool_stats()
+                m['db_pool'].set(db_pool['used'], state='used')
+                m['db_pool'].set(db_pool['free'], state='free')
+                m['db_pool_utilisation'].set(db_pool['used'] / db_pool['max'] if db_pool['max'] else 0.0)
+                write_stats = self.db_manager.get_write_behind_stats()
+                m['db_pending'].set(write_stats['pending'])
+                m['db_flushed'].set_total(write_stats['flushed_rows'])
+                m['db_dropped'].set_total(write_stats['dropped'])
+                
+                writer_stats = default_writer.get_stats()
+                m['log_queue_depth'].set(writer_stats['depth'])
+                m['log_written'].set_total(writer_stats['written'])
+                for name, dropped in writer_stats['dropped'].items():
+                    m['log_dropped'].set_total(dropped, file=name)
+                
+                for symbol, stats in self.scheduler.get_stats().items():
+                    m['strategy_evaluations'].set_total(stats['evaluations'], symbol=symbol)
+                    m['strategy_timeouts'].set_total(stats['timeouts'], symbol=symbol)
+                m['memory'].set(psutil.Process(os.getpid()).memory_info().rss)
+            
             async def setup(self):
                 """초기 설정 비동기 수행"""
                 await self.db_manager.initialize()
@@ -75,8 +207,16 @@ async def main():
                 self.is_running = False
                 
                 try:
+                    if self.metrics_server:
+                        await self.metrics_server.stop()
+                    
+                    # 시장 데이터 폴러 중지
+                    await asyncio.gather(*(
+                        market_data.stop_pollers() for market_data in self.markets.values()
+                    ))
+                    
                     # 웹소켓 연결 종료
-                    if self.ws and self.ws.ws:
+                    if self.ws:
                         try:
                             await asyncio.wait_for(self.ws.disconnect(), timeout=5.0)
                         except asyncio.TimeoutError:
@@ -84,6 +224,14 @@ async def main():
                         except Exception as e:
                             logger.error(f"웹소켓 연결 종료 중 오류: {e}")
                     
+                    # 프라이빗 웹소켓 종료
+                    try:
+                        await asyncio.wait_for(self.private_ws.disconnect(), timeout=5.0)
+                    except asyncio.TimeoutError:
+                        logger.warning("프라이빗 웹소켓 종료 시간 초과")
+                    except Exception as e:
+                        logger.error(f"프라이빗 웹소켓 종료 중 오류: {e}")
+                    
                     # API 세션 종료
                     if hasattr(self.api, 'session') and self.api.session:
                         try:
@@ -92,6 +240,15 @@ async def main():
                             logger.warning("API 세션 종료 시간 초과")
                         except Exception as e:
                             logger.error(f"API 세션 종료 중 오류: {e}")
+
+                    # 대기 중인 캔들 최종 저장 후 DB 풀 종료
+                    try:
+                        await asyncio.wait_for(self.db_manager.close(), timeout=10.0)
+                        logger.info(f"캔들 write-behind 통계: {self.db_manager.get_write_behind_stats()}")
+                    except asyncio.TimeoutError:
+                        logger.warning("DB 종료 시간 초과")
+                    except Exception as e:
+                        logger.error(f"DB 종료 중 오류: {e}")
                 
                 finally:
                     self._cleanup_done.set()
@@ -105,21 +262,34 @@ async def main():
                     # 초기 설정 수행
                     await self.setup()
                     
+                    # REST 연결 풀 예열 (DNS/TLS 선수립)
+                    await self.api.warmup()
+                    
                     # 웹소켓 연결
-                    await self.ws.connect()
+                    if not await self.ws.connect():
+                        logger.error("웹소켓 연결 전에 종료됨 - 시작 중단")
+                        return
                     
                     # 초기 데이터 로드 및 초기화
                     await self.ws.store_initial_candles()
-                    await self.market_data.initialize()
+                    await asyncio.gather(*(backfiller.run() for backfiller in self.backfillers))
+                    await asyncio.gather(*(
+                        market_data.initialize() for market_data in self.markets.values()
+                    ))
                     
-                    # 기존 미체결 주문 취소
-                    await self.order_executor.cancel_all_symbol_orders("BTCUSDT")
+                    if self.metrics_server:
+                        await self.metrics_server.start()
                     
-                    # 태스크 생성
+                    # 태스크 생성 (미체결 주문 취소는 각 전략 준비 단계에서 수행)
                     self.tasks = [
                         asyncio.create_task(self.ws.subscribe_kline()),
-                        asyncio.create_task(self.strategy.run()),
-                        asyncio.create_task(self._monitor_system())
+                        asyncio.create_task(self.private_ws.run()),
+                        *(task for market_data in self.markets.values()
+                          for task in market_data.start_pollers()),
+                        asyncio.create_task(self.scheduler.run()),
+                        asyncio.create_task(self._monitor_system()),
+                        asyncio.create_task(watch_event_loop_lag(self.metrics['loop_lag'],
+                                                                 self.metrics['loop_lag_last']))
                     ]
                     
                     # 태스크 완료 대기
@@ -137,13 +307,22 @@ async def main():
                 """시스템 상태 모니터링"""
                 while self.is_running:
                     try:
-                        if not await self.ws.is_connected():
-                            logger.warning("웹소켓 연결 끊김 감지, 재연결 시도...")
-                            await self.ws.connect()
+                        # 재연결은 웹소켓 감독 태스크가 담당, 여기서는 상태만 기록
+                        logger.info(f"웹소켓 연결: {self.ws.get_connection_stats()}")
+                        logger.info(f"웹소켓 피드 상태: {self.ws.get_feed_health()}")
                         
                         process = psutil.Process(os.getpid())
                         memory_usage = process.memory_info().rss / 1024 / 1024
                         logger.info(f"메모리 사용량: {memory_usage:.2f} MB")
+                        logger.info(f"HTTP 연결 풀: {self.api.get_pool_stats()}")
+                        logger.info(f"웹소켓 수신 큐: {self.ws.get_queue_stats()}")
+                        for symbol, market_data in self.markets.items():
+                            logger.info(f"{symbol} 시장 데이터 폴러: {market_data.get_feed_status()}")
+                        logger.info(f"전략 평가 통계: {self.scheduler.get_stats()}")
+                        logger.info(f"로그 쓰기 스레드: {default_writer.get_stats()}")
+                        if tracer.enabled:
+                            # 단계별 분포는 모니터링 주기마다 새로 집계
+                            logger.info(f"단계별 지연 시간 (ms): {tracer.summary(reset=True)}")
                         
                         await asyncio.sleep(60)
                         
@@ -1,9 +1,16 @@
 import pandas as pd
 import numpy as np
 import logging
+import asyncio
 from typing import List, Dict, Optional, Tuple
-from database_manager import DatabaseManager, Candle
+from database_manager import DatabaseManager, Candle, DEFAULT_SYMBOL, TIMEFRAME_MS
 from data_api import BitgetAPI
+from candle_buffer import CandleRingBuffer, INSERTED, IGNORED, APPENDED
+from indicator_engine import IndicatorEngine
+from candle_aggregator import TimeframeAggregator, bucket_start
+from event_bus import EventBus, EVENT_CANDLE, EVENT_OPEN_INTEREST, EVENT_POSITION_RATIO
+from tracing import tracer, STAGE_CACHE_UPDATE, STAGE_DB_WRITE
+from poller import BackgroundPoller, PollerConfig
 import time
 import math
 from utils import LogControlMixin
@@ -11,26 +18,48 @@ from utils import LogControlMixin
 logger = logging.getLogger(__name__)
 
 class MarketDataManager(LogControlMixin):
-    def __init__(self, api: BitgetAPI):
+    """심볼 하나의 캔들/지표/OI/비율 상태"""
+
+    def __init__(self, api: BitgetAPI, symbol: str = DEFAULT_SYMBOL,
+                 event_bus: Optional[EventBus] = None):
         super().__init__()  # LogControlMixin 초기화
         self.api = api
+        self.symbol = symbol
+        self.event_bus = event_bus or EventBus()  # 캔들/OI/비율 갱신 이벤트 발행
         self.db_manager = DatabaseManager()
         self.latest_candle: Optional[Candle] = None
-        self.candles_cache: Dict[int, Candle] = {}
+        self.max_candle_cache_size = 200
+        self.candles_cache = CandleRingBuffer(capacity=self.max_candle_cache_size)
+        self.indicator_engine = IndicatorEngine(window=self.max_candle_cache_size)
+        
+        # 1분봉으로 집계하는 상위 타임프레임 봉 (kline_{timeframe} 테이블에 저장)
+        self.higher_timeframes = ('5m', '15m', '1h', '4h')
+        self.timeframe_cache = TimeframeAggregator(self.higher_timeframes,
+                                                   capacity=self.max_candle_cache_size)
+        self.timeframe_bootstrap_minutes = 14 * 24 * 60  # 상위 봉 테이블이 비었을 때 재집계할 1분봉 범위
         self.logger = logging.getLogger("bitget_api")
         
         # OI와 L/S 데이터 캐시 수정
         self.position_ratio_cache: List[Dict[str, float]] = []  
         self.oi_cache: List[Tuple[int, float]] = []  
         self.max_oi_cache_size = 42  # 캐시 최대 크기 설정
+        self.max_ratio_cache_size = 3
+        self.sentiment_warm_start_max_age = 30 * 60  # 재시작 시 복원할 샘플의 최대 경과 시간 (초)
         self.last_saved_ratio = None  # 마지막으로 저장된 L/S 비율
         self.last_saved_oi = None  # 마지막으로 저장된 OI 값
         
         self.ratio_update_interval = 60  # 60초
         self.oi_update_interval = 20     # 20초로 변경
+        self.sentiment_store_interval = 20
         self.last_ratio_update = 0
         self.last_oi_update = 0          # 초기값 0으로 설정
         
+        # 캔들 스트림 정체 여부 (웹소켓 감시 태스크가 갱신)
+        self.stream_stale = False
+        
+        # 피드별 백그라운드 폴러 (start_pollers 에서 시작)
+        self.pollers: Dict[str, BackgroundPoller] = {}
+        
         # 변경 임계값 설정
         self.oi_change_threshold = 0.00001  # 0.001% 변화
         self.ratio_change_threshold = 0.00001  # 0.001% 변화
@@ -45,58 +74,247 @@ class MarketDataManager(LogControlMixin):
     async def initialize(self):
         """비동기 초기화"""
         await self._initialize_cache()
+        await self._initialize_timeframes()
+        await self._warm_start_sentiment()
         await self.update_open_interest()  # OI 데이터 초기 로드
 
     async def _initialize_cache(self, lookback_minutes: int = 200) -> None:
         """초기 캐시 구성"""
         try:
-            logger.info("Starting cache initialization from DB...")
-            candles = await self.db_manager.get_recent_candles(lookback_minutes)
+            logger.info(f"Starting {self.symbol} cache initialization from DB...")
+            candles = await self.db_manager.get_recent_candles(lookback_minutes, self.symbol)
             
-            for candle in candles:
-                self.candles_cache[candle.timestamp] = candle
+            # DB 결과는 최신 순이므로 오래된 것부터 버퍼에 추가
+            self.candles_cache.clear()
+            self.candles_cache.extend(reversed(candles))
+            self.indicator_engine.rebuild(self.candles_cache)
             
             if candles:
                 self.latest_candle = candles[0]  # 가장 최근 캔들
                 
-            logger.info(f"Successfully initialized cache with {len(candles)} candles")
+            logger.info(f"Successfully initialized {self.symbol} cache with {len(candles)} candles")
                 
         except Exception as e:
             logger.error(f"Error initializing cache from DB: {e}")
 
+    async def _warm_start_sentiment(self) -> None:
+        """재시작 직후 지표가 바로 유효하도록 OI / 롱숏 비율 캐시 복원
+
+        OI 는 원본 샘플 테이블(없으면 market_sentiment_data)에서, 롱숏 비율은 REST 과거
+        시계열(실패 시 DB)에서 불러온다. sentiment_warm_start_max_age 보다 오래된 값은 쓰지 않는다.
+        """
+        since = (int(time.time()) - self.sentiment_warm_start_max_age) * 1000
+        try:
+            await self._warm_start_open_interest(since)
+            await self._warm_start_position_ratio(since)
+        except Exception as e:
+            logger.error(f"Error warm-starting {self.symbol} sentiment caches: {e}")
+
+    async def _warm_start_open_interest(self, since: int) -> None:
+        if self.oi_cache:
+            return
+        samples = await self.db_manager.get_sentiment_samples(
+            'oi', since, self.max_oi_cache_size, self.symbol)
+        points = [(timestamp, value) for timestamp, value, _, _ in samples]
+        if len(points) < 2:
+            # 원본 샘플이 부족하면 20초마다 저장된 시장 지표의 OI 사용 (같은 값 반복은 아래에서 제거)
+            rows = await self.db_manager.get_recent_market_sentiment(
+                since, self.max_oi_cache_size * 10, self.symbol)
+            points = [(row['timestamp'], row['open_interest']) for row in rows if row['open_interest'] > 0]
+
+        for timestamp, value in points:
+            if self._has_significant_change(value, self.last_saved_oi, self.oi_change_threshold):
+                self.oi_cache.append((timestamp, value))
+                self.last_saved_oi = value
+        del self.oi_cache[:-self.max_oi_cache_size]
+        logger.info(f"{self.symbol} OI cache warm-started with {len(self.oi_cache)} samples")
+
+    async def _warm_start_position_ratio(self, since: int) -> None:
+        if self.position_ratio_cache:
+            return
+        history = await self.api.get_position_ratio_history(self.symbol)
+        if history:
+            await self.db_manager.store_sentiment_samples('ratio', [
+                (ratios['timestamp'], ratios['long_short_ratio'], ratios['long_ratio'], ratios['short_ratio'])
+                for ratios in history
+            ], self.symbol)
+        else:
+            samples = await self.db_manager.get_sentiment_samples(
+                'ratio', since, self.max_ratio_cache_size, self.symbol)
+            history = [
+                {'long_ratio': long_ratio, 'short_ratio': short_ratio,
+                 'long_short_ratio': value, 'timestamp': timestamp}
+                for timestamp, value, long_ratio, short_ratio in samples
+            ]
+            if not history:
+                rows = await self.db_manager.get_recent_market_sentiment(since, 100, self.symbol)
+                history = [
+                    {'long_ratio': row['long_ratio'], 'short_ratio': row['short_ratio'],
+                     'long_short_ratio': row['long_ratio'] / row['short_ratio'],
+                     'timestamp': row['timestamp']}
+                    for row in rows if row['short_ratio'] > 0
+                ]
+
+        for ratios in history:
+            if self._has_significant_change(ratios['long_short_ratio'], self.last_saved_ratio,
+                                            self.ratio_change_threshold):
+                self.position_ratio_cache.append(ratios)
+                self.last_saved_ratio = ratios['long_short_ratio']
+        del self.position_ratio_cache[:-self.max_ratio_cache_size]
+        logger.info(f"{self.symbol} L/S ratio cache warm-started with {len(self.position_ratio_cache)} samples")
+
+    async def _initialize_timeframes(self) -> None:
+        """저장된 상위 봉을 불러온 뒤 마지막 저장 봉 이후를 1분봉으로 재집계"""
+        try:
+            latest_saved = []
+            for timeframe in self.higher_timeframes:
+                bars = await self.db_manager.get_recent_candles(
+                    self.max_candle_cache_size, self.symbol, timeframe
+                )
+                self.timeframe_cache.load(timeframe, reversed(bars))
+                latest_saved.append(bars[0].timestamp if bars else None)
+
+            now = int(time.time() * 1000)
+            if None in latest_saved:
+                start = now - self.timeframe_bootstrap_minutes * TIMEFRAME_MS['1m']
+            else:
+                start = min(latest_saved)
+            await self.resync_timeframes(start)
+            
+        except Exception as e:
+            logger.error(f"Error initializing {self.symbol} higher timeframes: {e}")
+
+    async def resync_timeframes(self, start_time: int) -> None:
+        """start_time 이 속한 봉부터 DB 1분봉으로 상위 봉 재집계 후 저장"""
+        try:
+            largest = max(TIMEFRAME_MS[tf] for tf in self.higher_timeframes)
+            start = bucket_start(start_time, largest)
+            minutes = await self.db_manager.get_candles_between(
+                start, int(time.time() * 1000), self.symbol
+            )
+            if not minutes:
+                return
+
+            rows_by_timeframe: Dict[str, List[tuple]] = {}
+            for timeframe, bar in self.timeframe_cache.apply_minutes(minutes):
+                rows_by_timeframe.setdefault(timeframe, []).append(
+                    (bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.quote_volume)
+                )
+            for timeframe, rows in rows_by_timeframe.items():
+                await self.db_manager.bulk_upsert_candles(rows, symbol=self.symbol, timeframe=timeframe)
+                
+        except Exception as e:
+            logger.error(f"Error resyncing {self.symbol} higher timeframes: {e}")
+
     async def update_latest_candle(self, candle: Candle) -> None:
         try:
-            self.latest_candle = candle
-            self.candles_cache[candle.timestamp] = candle
+            # 같은 값이 재전송된 경우 전략을 깨우지 않음
+            changed = candle != self.latest_candle
+            with tracer.span(STAGE_CACHE_UPDATE):
+                self.latest_candle = candle
+                self._update_candle_state(candle)
+                if changed:
+                    self.event_bus.publish(EVENT_CANDLE, candle)
             
             # 1분마다 한 번씩만 로깅
             if self.should_log('candle_update'):
-                self.logger.info(f"New candle: timestamp={candle.timestamp}, close={candle.close}, volume={candle.volume}")
+                self.logger.info(f"New {self.symbol} candle: timestamp={candle.timestamp}, close={candle.close}, volume={candle.volume}")
             
-            # DB에 저장
-            await self.db_manager.store_candle(candle)
-
-            # 캐시 크기 관리
-            if len(self.candles_cache) > 200:
-                oldest_timestamp = min(self.candles_cache.keys())
-                del self.candles_cache[oldest_timestamp]
+            # DB 저장은 write-behind 큐에 맡김 (같은 봉은 병합되어 일괄 저장)
+            with tracer.span(STAGE_DB_WRITE):
+                await self.db_manager.queue_candle(candle, self.symbol)
+                for timeframe, bar in self.timeframe_cache.update(candle):
+                    await self.db_manager.queue_candle(bar, self.symbol, timeframe)
                 
         except Exception as e:
             self.logger.error(f"Error updating latest candle: {e}", 
                   extra={'action': 'update_latest_candle'})
 
+    async def merge_candles(self, candles: List[Candle]) -> None:
+        """백필된 캔들을 캐시에 병합 (DB 저장 없음)"""
+        try:
+            for candle in sorted(candles, key=lambda c: c.timestamp):
+                self.candles_cache.append(candle)
+            # 여러 봉이 한꺼번에 바뀌므로 지표는 한 번만 재구성
+            self.indicator_engine.rebuild(self.candles_cache)
+            latest = self.candles_cache.latest()
+            if latest and (self.latest_candle is None or latest.timestamp >= self.latest_candle.timestamp):
+                self.latest_candle = latest
+            if candles:
+                self.event_bus.publish(EVENT_CANDLE, self.latest_candle)
+                # 백필 구간이 걸친 상위 봉 재집계
+                await self.resync_timeframes(min(c.timestamp for c in candles))
+        except Exception as e:
+            logger.error(f"Error merging backfilled candles: {e}")
+
+    def _update_candle_state(self, candle: Candle) -> None:
+        """캔들 버퍼와 스트리밍 지표 상태 갱신"""
+        status = self.candles_cache.append(candle)
+        if status == INSERTED:
+            # 과거 봉이 바뀌면 이후 지표가 모두 달라지므로 재구성
+            self.indicator_engine.rebuild(self.candles_cache)
+        elif status != IGNORED:
+            self.indicator_engine.update(candle, is_new_bar=(status == APPENDED))
+
     def _has_significant_change(self, new_value: float, old_value: float, threshold: float) -> bool:
         """값의 유의미한 변화 여부 확인"""
         if old_value is None:
             return True
         return abs((new_value - old_value) / old_value) > threshold
 
-    async def update_open_interest(self, symbol: str = 'BTCUSDT'):
-        """OI 데이터 업데이트 - 유의미한 변화가 있을 때만"""
+    def start_pollers(self) -> List[asyncio.Task]:
+        """OI / L/S 비율 / 시장 지표 저장 폴러 시작 - 전략 루프와 독립적으로 캐시 갱신"""
+        symbol = self.symbol
+        if not self.pollers:
+            self.pollers = {
+                'open_interest': BackgroundPoller(
+                    f'{symbol}:open_interest', lambda: self.update_open_interest(symbol),
+                    PollerConfig(interval=self.oi_update_interval, jitter=2.0)
+                ),
+                'position_ratio': BackgroundPoller(
+                    f'{symbol}:position_ratio', lambda: self.update_position_ratio(symbol),
+                    PollerConfig(interval=self.ratio_update_interval, jitter=5.0,
+                                 initial_backoff=2.0, max_backoff=120.0)
+                ),
+                'market_sentiment': BackgroundPoller(
+                    f'{symbol}:market_sentiment', self.store_market_sentiment,
+                    PollerConfig(interval=self.sentiment_store_interval, jitter=1.0)
+                ),
+            }
+        return [poller.start() for poller in self.pollers.values()]
+
+    async def stop_pollers(self) -> None:
+        await asyncio.gather(*(poller.stop() for poller in self.pollers.values()),
+                             return_exceptions=True)
+
+    def get_feed_status(self) -> Dict[str, dict]:
+        """폴러별 마지막 성공 경과 시간 / 실패 횟수"""
+        return {name: poller.get_status() for name, poller in self.pollers.items()}
+
+    def get_stale_feeds(self) -> List[str]:
+        """갱신이 늦어진 피드 목록 (폴러 미시작 시 빈 목록)"""
+        stale = [name for name, poller in self.pollers.items()
+                 if name != 'market_sentiment' and poller.is_stale()]
+        if self.stream_stale:
+            stale.append('candle_stream')
+        return stale
+
+    def set_stream_stale(self, stale: bool) -> None:
+        """캔들 스트림 정체 상태 갱신"""
+        if stale != self.stream_stale:
+            if stale:
+                logger.warning(f"{self.symbol} candle stream is stale")
+            else:
+                logger.info(f"{self.symbol} candle stream recovered")
+            self.stream_stale = stale
+
+    async def update_open_interest(self, symbol: Optional[str] = None) -> bool:
+        """OI 데이터 업데이트 - 유의미한 변화가 있을 때만 캐시에 추가
+
+        조회 주기는 폴러가 관리한다. 조회 성공 여부를 반환한다.
+        """
+        symbol = symbol or self.symbol
         current_time = int(time.time())
-        
-        if current_time - self.last_oi_update < self.oi_update_interval:
-            return
             
         try:
             response = await self.api._request(
@@ -121,30 +339,36 @@ class MarketDataManager(LogControlMixin):
                     # 캐시 크기 관리
                     if len(self.oi_cache) > self.max_oi_cache_size:
                         self.oi_cache.pop(0)
+                    
+                    self.event_bus.publish(EVENT_OPEN_INTEREST, self.oi_cache[-1])
+                    await self.db_manager.store_sentiment_samples(
+                        'oi', [(current_time * 1000, new_oi, None, None)], self.symbol)
                         
                     # OI 값과 변화율 로깅 추가
                     oi_change = ((new_oi - self.last_saved_oi) / self.last_saved_oi * 100) if self.last_saved_oi else 0
-                    logger.info(f"OI Update - Current: {new_oi:.2f}, Change: {oi_change:.2f}%, Cache Size: {len(self.oi_cache)}")
+                    logger.info(f"{symbol} OI Update - Current: {new_oi:.2f}, Change: {oi_change:.2f}%, Cache Size: {len(self.oi_cache)}")
 
                      # OI 지표들 계산 및 로깅
                     indicators = self.calculate_oi_indicators()
                     logger.info(f"OI Indicators: {indicators}")
+                return True
+            
+            logger.warning(f"Failed to get open interest: {response}")
+            return False
                     
         except Exception as e:
             logger.error(f"Error updating OI data: {e}")
+            return False
 
-    async def update_position_ratio(self, symbol: str = 'BTCUSDT'):
-        """포지션 비율 데이터 업데이트"""
+    async def update_position_ratio(self, symbol: Optional[str] = None) -> bool:
+        """포지션 비율 데이터 업데이트 - 조회 성공 여부 반환"""
+        symbol = symbol or self.symbol
         current_time = int(time.time())
-        
-        # 업데이트 간격 확인
-        if current_time - self.last_ratio_update < self.ratio_update_interval:
-            return
             
         ratios = await self.api.get_position_ratio(symbol)
         if ratios is None:  # API 속도 제한 등으로 실패한 경우
             logger.debug("Failed to update position ratio, will retry later")
-            return
+            return False
                 
         if ratios:
             # 유의미한 변화 확인
@@ -160,10 +384,16 @@ class MarketDataManager(LogControlMixin):
                 self.last_ratio_update = current_time
                 
                 # 최근 3개만 유지
-                if len(self.position_ratio_cache) > 3:
+                if len(self.position_ratio_cache) > self.max_ratio_cache_size:
                     self.position_ratio_cache.pop(0)
+                
+                self.event_bus.publish(EVENT_POSITION_RATIO, ratios)
+                await self.db_manager.store_sentiment_samples('ratio', [(
+                    ratios['timestamp'], current_ls_ratio, ratios['long_ratio'], ratios['short_ratio']
+                )], self.symbol)
                     
-                logger.info(f"New L/S ratio stored: {current_ls_ratio}")
+                logger.info(f"New {symbol} L/S ratio stored: {current_ls_ratio}")
+        return True
 
     def calculate_trend_slope(self, data_points: List[Tuple[int, float]]) -> float:
         """추세선 기울기 계산"""
@@ -197,25 +427,30 @@ class MarketDataManager(LogControlMixin):
         """현재 가격 조회"""
         return self.latest_candle.close if self.latest_candle else 0.0
 
-    def get_recent_candles(self, lookback: int) -> List[Candle]:
-        """최근 N개의 캔들 데이터 조회"""
-        sorted_timestamps = sorted(self.candles_cache.keys(), reverse=True)
-        return [self.candles_cache[ts] for ts in sorted_timestamps[:lookback]]
+    def _candle_buffer(self, timeframe: str) -> CandleRingBuffer:
+        if timeframe == '1m':
+            return self.candles_cache
+        if timeframe not in self.timeframe_cache.buffers:
+            raise ValueError(f"Timeframe not tracked: {timeframe}")
+        return self.timeframe_cache.buffers[timeframe]
+
+    def get_recent_candles(self, lookback: int, timeframe: str = '1m') -> List[Candle]:
+        """최근 N개의 캔들 데이터 조회 (최신 순)"""
+        return self._candle_buffer(timeframe).to_candles(lookback)
 
-    def get_price_data_as_df(self, lookback: int) -> pd.DataFrame:
+    def get_price_window(self, lookback: int, timeframe: str = '1m') -> Dict[str, np.ndarray]:
+        """최근 N개의 캔들 컬럼 뷰 (시간순, 복사 없음)"""
+        return self._candle_buffer(timeframe).window(lookback)
+
+    def get_price_data_as_df(self, lookback: int, timeframe: str = '1m') -> pd.DataFrame:
         """최근 N개의 캔들 데이터를 DataFrame으로 변환"""
-        candles = self.get_recent_candles(lookback)
-        data = {
-            'timestamp': [c.timestamp for c in candles],
-            'open': [c.open for c in candles],
-            'high': [c.high for c in candles],
-            'low': [c.low for c in candles],
-            'close': [c.close for c in candles],
-            'volume': [c.volume for c in candles]
-        }
-        df = pd.DataFrame(data)
+        window = self.get_price_window(lookback, timeframe)
+        df = pd.DataFrame({
+            field: window[field]
+            for field in ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+        })
         df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df.sort_values('timestamp')
+        return df
 
     def calculate_ema(self, df: pd.DataFrame, period: int) -> pd.Series:
         """EMA 계산"""
@@ -223,6 +458,21 @@ class MarketDataManager(LogControlMixin):
 
     def calculate_stoch_rsi(self, period: int = 42, smoothk: int = 3, smoothd: int = 3) -> Tuple[float, float]:
         """Stochastic RSI 계산"""
+        engine = self.indicator_engine
+        if (period, smoothk, smoothd) != (engine.rsi_period, engine.smoothk, engine.smoothd):
+            return self._calculate_stoch_rsi_df(period, smoothk, smoothd)
+
+        try:
+            available = min(engine.bar_count, period*3)
+            if available < period*2:
+                logger.warning(f"Insufficient data for Stoch RSI: {available} < {period*2}")
+            return engine.stoch_rsi()
+        except Exception as e:
+            logger.error(f"Error calculating Stoch RSI: {e}")
+            return 50.0, 50.0
+
+    def _calculate_stoch_rsi_df(self, period: int = 42, smoothk: int = 3, smoothd: int = 3) -> Tuple[float, float]:
+        """Stochastic RSI 계산 (DataFrame 전체 재계산)"""
         try:
             df = self.get_price_data_as_df(lookback=period*3)
             
@@ -262,22 +512,18 @@ class MarketDataManager(LogControlMixin):
         try:
             result = {}
             
-            # 1. 기본 가격 데이터 검증 및 계산
-            df = self.get_price_data_as_df(lookback)
-            if len(df) < 2:  # 최소 2개의 데이터 포인트 필요
-                logger.warning(f"Insufficient price data: {len(df)} < 2")
+            # 1. 기본 가격 데이터 검증
+            available = min(len(self.candles_cache), lookback)
+            if available < 2:  # 최소 2개의 데이터 포인트 필요
+                logger.warning(f"Insufficient price data: {available} < 2")
                 return {}
 
-            # 2. 기본 가격 지표 계산
+            # 2. 기본 가격 지표 계산 (기본 창은 스트리밍 엔진 사용)
             try:
-                result.update({
-                    'last_close': float(df['close'].iloc[-1]),
-                    'last_volume': float(df['volume'].iloc[-1]),
-                    'price_change': float(df['close'].diff().iloc[-1]),
-                    'ema7': float(self.calculate_ema(df, 7).iloc[-1]),
-                    'ema25': float(self.calculate_ema(df, 25).iloc[-1]),
-                    'ema200': float(self.calculate_ema(df, 200).iloc[-1])
-                })
+                if lookback == self.indicator_engine.window:
+                    result.update(self.indicator_engine.price_indicators())
+                else:
+                    result.update(self._calculate_price_indicators_df(lookback))
             except Exception as e:
                 logger.error(f"Error calculating price indicators: {e}")
 
@@ -345,23 +591,41 @@ class MarketDataManager(LogControlMixin):
             logger.error(f"Error in calculate_technical_indicators: {str(e)}")
             return {}
         
+    def _calculate_price_indicators_df(self, lookback: int) -> Dict[str, float]:
+        """기본 가격 지표 계산 (DataFrame 전체 재계산)"""
+        df = self.get_price_data_as_df(lookback)
+        return {
+            'last_close': float(df['close'].iloc[-1]),
+            'last_volume': float(df['volume'].iloc[-1]),
+            'price_change': float(df['close'].diff().iloc[-1]),
+            'ema7': float(self.calculate_ema(df, 7).iloc[-1]),
+            'ema25': float(self.calculate_ema(df, 25).iloc[-1]),
+            'ema200': float(self.calculate_ema(df, 200).iloc[-1])
+        }
+
+    def _calculate_atr_df(self, period: int = 14) -> float:
+        """ATR 계산 (DataFrame 전체 재계산)"""
+        df = self.get_price_data_as_df(lookback=period*2)
+        
+        if len(df) < period:
+            return 0.0
+            
+        df['high_low'] = df['high'] - df['low']
+        df['high_pc'] = abs(df['high'] - df['close'].shift(1))
+        df['low_pc'] = abs(df['low'] - df['close'].shift(1))
+        
+        df['tr'] = df[['high_low', 'high_pc', 'low_pc']].max(axis=1)
+        return float(df['tr'].rolling(window=period).mean().iloc[-1])
+
     def calculate_atr(self, period: int = 14) -> float:
         """ATR 계산"""
         try:
-            df = self.get_price_data_as_df(lookback=period*2)
-            
-            if len(df) < period:
-                return 0.0
-                
-            df['high_low'] = df['high'] - df['low']
-            df['high_pc'] = abs(df['high'] - df['close'].shift(1))
-            df['low_pc'] = abs(df['low'] - df['close'].shift(1))
-            
-            df['tr'] = df[['high_low', 'high_pc', 'low_pc']].max(axis=1)
-            atr = df['tr'].rolling(window=period).mean().iloc[-1]
+            if period == self.indicator_engine.atr_period:
+                atr_value = self.indicator_engine.atr()
+            else:
+                atr_value = self._calculate_atr_df(period)
             
             # ATR 값이 20이상 차이나게 변경되었을 때만 로깅
-            atr_value = float(atr)
             if not hasattr(self, '_last_logged_atr') or abs(self._last_logged_atr - atr_value) > 20:
                 logger.info(f"ATR updated: {atr_value:.2f}")
                 self._last_logged_atr = atr_value
@@ -632,7 +896,7 @@ class MarketDataManager(LogControlMixin):
                 'warning': False
             }
         
-    async def store_market_sentiment(self):
+    async def store_market_sentiment(self) -> bool:
         """시장 지표 계산 및 저장 (20초 간격)"""
         try:
             current_time = int(time.time())
@@ -642,8 +906,8 @@ class MarketDataManager(LogControlMixin):
                 self._last_sentiment_store_time = 0
                 
             # 20초가 지나지 않았으면 저장하지 않음
-            if current_time - self._last_sentiment_store_time < 20:
-                return
+            if current_time - self._last_sentiment_store_time < self.sentiment_store_interval:
+                return True
                 
             # OI 관련 지표 계산
             oi_indicators = self.calculate_oi_indicators()
@@ -670,11 +934,13 @@ class MarketDataManager(LogControlMixin):
             }
 
             # DB 저장 (밀리초 단위로 변환)
-            await self.db_manager.store_market_indicators(current_time * 1000, indicators_data)
+            await self.db_manager.store_market_indicators(current_time * 1000, indicators_data, self.symbol)
             
             # 저장 시간 업데이트
             self._last_sentiment_store_time = current_time
-            logger.info(f"Market sentiment data stored at {current_time}")
+            logger.info(f"{self.symbol} market sentiment data stored at {current_time}")
+            return True
             
         except Exception as e:
-            logger.error(f"Error storing market sentiment: {e}")
\ No newline at end of file
+            logger.error(f"Error storing market sentiment: {e}")
+            return False
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""TradingConfig 파라미터 탐색 (grid / random / bayesian)
+
+사용법: python optimizer.py [일수] [심볼] [grid|random|bayesian] [시도 횟수]
+
+백테스트(run_fast)를 ProcessPoolExecutor 로 모든 코어에 분산한다. 봉 배열은 한 번만
+.npy 파일로 기록하고 워커는 np.load(mmap_mode='r') 로 같은 페이지를 읽기 전용으로 공유하므로
+설정마다 데이터를 피클링하지 않는다. 결과는 (데이터, 설정) 해시로 JSONL 파일에 캐시되어
+같은 설정은 다시 실행하지 않는다.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from backtest import BacktestConfig, BacktestData, load_backtest_data, run_fast, MINUTE_MS
+from database_manager import DatabaseManager, DEFAULT_SYMBOL
+from trading_strategy_implementation import TradingConfig
+
+try:
+    import optuna
+except ImportError:  # 선택 의존성 - 없으면 bayesian 은 random 으로 대체
+    optuna = None
+
+logger = logging.getLogger(__name__)
+
+# 워커 간 공유하는 배열 (BacktestData 필드명)
+SHARED_ARRAYS = ('timestamp', 'open', 'high', 'low', 'close', 'volume',
+                 'oi_valid', 'oi_rsi', 'ls_ratio_slope', 'ls_ratio_acceleration')
+
+# 백테스트 결과에 영향을 주는 기본 탐색 범위 (low, high)
+# leverage 는 진입 시 ATR 로 조정되고 상한만 max_leverage 로 정해지며, ratio_threshold 는
+# 현재 진입/청산 조건에서 쓰이지 않으므로 기본 범위에 넣지 않는다.
+DEFAULT_SPACE: Dict[str, Tuple[float, float]] = {
+    'min_slope': (0.00001, 0.001),
+    'acceleration_threshold': (0.00001, 0.001),
+    'stop_loss_pct': (2.0, 20.0),
+    'max_leverage': (5, 20),
+}
+
+DEFAULT_GRID: Dict[str, List[float]] = {
+    'min_slope': [0.00005, 0.0001, 0.0002, 0.0005],
+    'acceleration_threshold': [0.00005, 0.0001, 0.0002, 0.0005],
+    'stop_loss_pct': [5.0, 10.0, 15.0],
+    'max_leverage': [10, 20],
+}
+
+_CONFIG_FIELDS = {f.name for f in fields(TradingConfig)}
+
+def data_fingerprint(data: BacktestData) -> str:
+    """캐시 키용 데이터 식별값"""
+    digest = hashlib.sha1()
+    digest.update(data.symbol.encode())
+    for name in SHARED_ARRAYS:
+        digest.update(np.ascontiguousarray(getattr(data, name)).tobytes())
+    return digest.hexdigest()[:16]
+
+def config_hash(params: Dict[str, float], backtest_config: BacktestConfig) -> str:
+    """TradingConfig 전체 값 + 백테스트 설정 해시 (기본값이 바뀌어도 안전)"""
+    payload = {
+        'trading': asdict(TradingConfig(**params)),
+        'backtest': asdict(backtest_config)
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def share_data(data: BacktestData, directory: str) -> str:
+    """배열을 .npy 로 기록 (이미 있으면 재사용) - 워커는 memmap 으로 읽음"""
+    os.makedirs(directory, exist_ok=True)
+    for name in SHARED_ARRAYS:
+        path = os.path.join(directory, f'{name}.npy')
+        if not os.path.exists(path):
+            np.save(path, getattr(data, name))
+    with open(os.path.join(directory, 'symbol'), 'w') as f:
+        f.write(data.symbol)
+    return directory
+
+def load_shared_data(directory: str) -> BacktestData:
+    """share_data 로 기록한 배열을 읽기 전용 memmap 으로 열기"""
+    with open(os.path.join(directory, 'symbol')) as f:
+        symbol = f.read().strip()
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+              for name in SHARED_ARRAYS}
+    return BacktestData(symbol=symbol, sentiment=[], **arrays)
+
+# 워커 프로세스 전역 (initializer 에서 한 번 설정)
+_worker_data: Optional[BacktestData] = None
+
+def _init_worker(directory: str) -> None:
+    global _worker_data
+    _worker_data = load_shared_data(directory)
+
+def _run_config(params: Dict[str, float], backtest_config: Dict[str, float]) -> Dict[str, float]:
+    result = run_fast(_worker_data, TradingConfig(**params), BacktestConfig(**backtest_config))
+    return result.summary()
+
+class SweepRunner:
+    """캐시된 병렬 백테스트 실행기"""
+
+    def __init__(self, data: BacktestData, cache_dir: str = 'backtest_cache',
+                 backtest_config: Optional[BacktestConfig] = None,
+                 objective: str = 'return_pct', max_workers: Optional[int] = None):
+        self.backtest_config = backtest_config or BacktestConfig()
+        self.objective = objective
+        self.max_workers = max_workers or os.cpu_count()
+        self.fingerprint = data_fingerprint(data)
+        self.data_dir = share_data(data, os.path.join(cache_dir, f'data_{self.fingerprint}'))
+        self.cache_path = os.path.join(cache_dir, f'results_{self.fingerprint}.jsonl')
+        self.cache: Dict[str, dict] = self._load_cache()
+        self.stats = {'evaluated': 0, 'cache_hits': 0, 'failed': 0}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _load_cache(self) -> Dict[str, dict]:
+        cache = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        cache[entry['hash']] = entry
+                    except (ValueError, KeyError):
+                        continue  # 중단된 쓰기로 잘린 줄
+        logger.info(f"Loaded {len(cache)} cached sweep results")
+        return cache
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker, initargs=(self.data_dir,))
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def evaluate(self, configs: Sequence[Dict[str, float]]) -> List[dict]:
+        """설정 목록 평가 (입력 순서대로 결과 반환, 캐시된 설정은 건너뜀)"""
+        for params in configs:
+            unknown = set(params) - _CONFIG_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown TradingConfig fields: {sorted(unknown)}")
+
+        hashes = [config_hash(params, self.backtest_config) for params in configs]
+        backtest_config = asdict(self.backtest_config)
+        futures = {}
+        submitted = set()
+        for params, key in zip(configs, hashes):
+            if key in self.cache:
+                self.stats['cache_hits'] += 1
+            elif key not in submitted:
+                submitted.add(key)
+                futures[self._get_executor().submit(_run_config, params, backtest_config)] = key
+
+        if futures:
+            started = time.perf_counter()
+            params_by_hash = dict(zip(hashes, configs))
+            with open(self.cache_path, 'a') as cache_file:
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        summary = future.result()
+                    except Exception as e:
+                        self.stats['failed'] += 1
+                        logger.error(f"Backtest failed for {params_by_hash[key]}: {e}")
+                        continue
+                    entry = {'hash': key, 'params': params_by_hash[key], **summary}
+                    self.cache[key] = entry
+                    cache_file.write(json.dumps(entry) + '\n')
+                    cache_file.flush()  # 밤새 도는 탐색이 중단돼도 끝난 결과는 남김
+                    self.stats['evaluated'] += 1
+            elapsed = time.perf_counter() - started
+            logger.info(f"Evaluated {len(futures)} configs in {elapsed:.1f}s "
+                        f"({len(futures) / elapsed:.1f} configs/sec, {self.max_workers} workers)")
+
+        return [self.cache[key] for key in hashes if key in self.cache]
+
+    def grid(self, space: Optional[Dict[str, List[float]]] = None) -> List[dict]:
+        space = space or DEFAULT_GRID
+        names = list(space)
+        configs = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+        return self.evaluate(configs)
+
+    def random(self, trials: int, space: Optional[Dict[str, Tuple[float, float]]] = None,
+               seed: Optional[int] = None) -> List[dict]:
+        space = space or DEFAULT_SPACE
+        rng = random.Random(seed)
+        configs = [{name: _sample(rng, bounds) for name, bounds in space.items()}
+                   for _ in range(trials)]
+        return self.evaluate(configs)
+
+    def bayesian(self, trials: int, space: Optional[Dict[str, Tuple[float, float]]] = None,
+                 batch_size: Optional[int] = None, seed: Optional[int] = None) -> List[dict]:
+        """optuna TPE 로 배치 단위 탐색 (배치 크기 = 워커 수)"""
+        space = space or DEFAULT_SPACE
+        if optuna is None:
+            logger.warning("optuna not installed, falling back to random search")
+            return self.random(trials, space, seed)
+
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        study = optuna.create_study(direction='maximize',
+                                    sampler=optuna.samplers.TPESampler(seed=seed))
+        batch_size = batch_size or self.max_workers
+        results = []
+        while len(results) < trials:
+            batch = [study.ask() for _ in range(min(batch_size, trials - len(results)))]
+            configs = [{name: _suggest(trial, name, bounds) for name, bounds in space.items()}
+                       for trial in batch]
+            evaluated = {entry['hash']: entry for entry in self.evaluate(configs)}
+            for trial, params in zip(batch, configs):
+                entry = evaluated.get(config_hash(params, self.backtest_config))
+                if entry is None:
+                    study.tell(trial, state=optuna.trial.TrialState.FAIL)
+                    continue
+                study.tell(trial, entry[self.objective])
+                results.append(entry)
+        return results
+
+    def best(self, results: List[dict], top: int = 10) -> List[dict]:
+        return sorted(results, key=lambda entry: entry[self.objective], reverse=True)[:top]
+
+def _sample(rng: random.Random, bounds: Tuple[float, float]) -> Union[int, float]:
+    low, high = bounds
+    if isinstance(low, int) and isinstance(high, int):
+        return rng.randint(low, high)
+    return rng.uniform(low, high)
+
+def _suggest(trial, name: str, bounds: Tuple[float, float]) -> Union[int, float]:
+    low, high = bounds
+    if isinstance(low, int) and isinstance(high, int):
+        return trial.suggest_int(name, low, high)
+    # 임계값은 자릿수 단위로 탐색
+    return trial.suggest_float(name, low, high, log=low > 0 and high / low >= 100)
+
+async def _load(days: int, symbol: str) -> BacktestData:
+    from dotenv import load_dotenv
+    load_dotenv()
+    db_manager = DatabaseManager()
+    await db_manager.initialize()
+    try:
+        end_time = int(time.time() * 1000)
+        return await load_backtest_data(end_time - days * 24 * 60 * MINUTE_MS, end_time, symbol)
+    finally:
+        await db_manager.close()
+
+def main() -> None:
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    symbol = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SYMBOL
+    method = sys.argv[3] if len(sys.argv) > 3 else 'grid'
+    trials = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    data = asyncio.run(_load(days, symbol))
+    with SweepRunner(data) as runner:
+        if method == 'grid':
+            results = runner.grid()
+        elif method == 'random':
+            results = runner.random(trials)
+        elif method == 'bayesian':
+            results = runner.bayesian(trials)
+        else:
+            raise ValueError(f"Unknown sweep method: {method}")
+
+        logger.info(f"Sweep stats: {runner.stats}")
+        for entry in runner.best(results):
+            logger.info(f"{entry[runner.objective]:10.2f}  {entry['params']}  "
+                        f"trades={entry['trades']} win_rate={entry['win_rate']:.1f} "
+                        f"max_dd={entry['max_drawdown_pct']:.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,13 @@
 import logging
 from typing import Optional, Dict, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
 from data_api import BitgetAPI
 import time
 from models import Position
+from data_private_web import OrderStateBook
+from tracing import tracer, STAGE_ORDER_ACK, STAGE_TICK_TO_ACK
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +22,51 @@ class Position:
     timestamp: int
     leverage: int
 
+@dataclass
+class ProtectiveOrderResult:
+    """스탑로스/테이크프로핏 설정 결과"""
+    stop_loss_set: bool = False
+    take_profit_set: bool = False
+    take_profit_requested: bool = True
+    stop_loss_order_id: Optional[str] = None
+    take_profit_order_id: Optional[str] = None
+    attempts: int = 0
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return self.stop_loss_set and (self.take_profit_set or not self.take_profit_requested)
+
 class OrderExecutor:
-    def __init__(self, api: BitgetAPI):
+    def __init__(self, api: BitgetAPI, state_book: Optional[OrderStateBook] = None):
         self.api = api
+        self.state_book = state_book  # 프라이빗 웹소켓 주문/포지션 상태 (없으면 REST 폴링)
         self.positions: Dict[str, Position] = {}
         self.pending_orders: Dict[str, Dict] = {}  # 미체결 주문 관리
         self.order_check_interval = 1  # 주문 체결 확인 간격 (초)
+        self.protection_deadline = 3.0  # TP/SL 설정 전체 제한 시간 (초)
+        self.protection_retry_delay = 0.2  # TP/SL 재시도 간격 (초)
+        self.last_protection_result: Optional[ProtectiveOrderResult] = None
         
     async def wait_for_order_fill(self, symbol: str, order_id: str, timeout: int = 1) -> bool:  #open_position함수에서 호출당한다. filled 즉 채결된 상태가 되면 true 반환. 캔슬되거나 타임아웃내에 filled 상태가 되지않으면 false 반환.
         """주문 체결 대기"""
         start_time = time.time()
         logger.info(f"Waiting for order {order_id} to fill (timeout: {timeout}s)")
         
+        if self.state_book and self.state_book.synced:
+            # 웹소켓 주문 이벤트로 대기 (폴링 없음)
+            state = await self.state_book.wait_for_order(order_id, timeout)
+            if state == 'filled':
+                logger.info(f"Order {order_id} filled successfully")
+                return True
+            if state in ('cancelled', 'canceled'):
+                logger.warning(f"Order {order_id} was cancelled")
+                return False
+            # 이벤트를 놓쳤을 수 있으므로 REST 로 한 번 확인
+            return await self._check_order_filled(symbol, order_id, timeout)
+        
         while time.time() - start_time < timeout:
             try:
                 response = await self.api.get_order_detail(symbol, order_id)  # 와 여기서 쓰인다.
@@ -57,6 +92,121 @@ class OrderExecutor:
         logger.warning(f"Order {order_id} fill timeout after {timeout}s")
         return False
         
+    async def _check_order_filled(self, symbol: str, order_id: str, timeout: float) -> bool:
+        """REST 로 주문 체결 여부 1회 확인"""
+        try:
+            response = await self.api.get_order_detail(symbol, order_id)
+            if response and response.get('code') == '00000' and response['data']['state'] == 'filled':
+                logger.info(f"Order {order_id} filled successfully")
+                return True
+        except Exception as e:
+            logger.error(f"Error checking order status: {e}")
+        logger.warning(f"Order {order_id} fill timeout after {timeout}s")
+        return False
+
+    async def place_protective_orders(self, symbol: str, hold_side: str, size: str,
+                                      stop_loss_price: str, take_profit_price: str,
+                                      deadline: Optional[float] = None) -> ProtectiveOrderResult:
+        """스탑로스와 테이크프로핏을 동시에 제출 (전체 deadline 내에서 재시도)
+
+        테이크프로핏 가격이 0 이하이면 스탑로스만 설정한다.
+        """
+        deadline = deadline or self.protection_deadline
+        result = ProtectiveOrderResult(take_profit_requested=float(take_profit_price) > 0)
+        start = time.perf_counter()
+
+        async def place(plan_type: str, trigger_price: str) -> Optional[str]:
+            while True:
+                result.attempts += 1
+                response = await self.api.place_tpsl_order(
+                    symbol=symbol,
+                    plan_type=plan_type,
+                    trigger_price=trigger_price,
+                    hold_side=hold_side,
+                    size=size,
+                    execute_price='0'
+                )
+                if response and response.get('code') == '00000':
+                    return (response.get('data') or {}).get('orderId', '')
+                result.errors.append(f"{plan_type}: {response}")
+                logger.error(f"Failed to set {plan_type}: {response}")
+                await asyncio.sleep(self.protection_retry_delay)
+
+        tasks = {'loss_plan': asyncio.create_task(place('loss_plan', stop_loss_price))}
+        if result.take_profit_requested:
+            tasks['profit_plan'] = asyncio.create_task(place('profit_plan', take_profit_price))
+
+        done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        # 취소된 요청도 이미 거래소에 도달했을 수 있으므로 취소가 끝난 뒤 조회로 확인
+        await asyncio.gather(*pending, return_exceptions=True)
+        result.timed_out = bool(pending)
+
+        for plan_type, task in tasks.items():
+            if task not in done or task.exception() is not None:
+                if task in done:
+                    result.errors.append(f"{plan_type}: {task.exception()}")
+                continue
+            if plan_type == 'loss_plan':
+                result.stop_loss_set = True
+                result.stop_loss_order_id = task.result()
+            else:
+                result.take_profit_set = True
+                result.take_profit_order_id = task.result()
+
+        unconfirmed = {
+            plan_type: price for plan_type, price in
+            (('loss_plan', stop_loss_price), ('profit_plan', take_profit_price))
+            if plan_type in tasks and not (result.stop_loss_set if plan_type == 'loss_plan'
+                                           else result.take_profit_set)
+        }
+        if unconfirmed:
+            await self._reconcile_protective_orders(symbol, hold_side, unconfirmed, result)
+
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_protection_result = result
+        logger.info(f"Protective orders for {symbol}: SL={result.stop_loss_set}, "
+                    f"TP={result.take_profit_set if result.take_profit_requested else 'skipped'}, "
+                    f"attempts={result.attempts}, elapsed={result.elapsed_ms:.0f}ms, "
+                    f"timed_out={result.timed_out}")
+        return result
+
+    async def _reconcile_protective_orders(self, symbol: str, hold_side: str,
+                                           unconfirmed: Dict[str, str],
+                                           result: ProtectiveOrderResult) -> None:
+        """응답을 받지 못한 TP/SL 이 실제로 접수됐는지 미체결 계획 주문에서 확인"""
+        try:
+            response = await self.api.get_pending_plan_orders(symbol)
+            if not response or response.get('code') != '00000':
+                result.errors.append(f"plan order lookup: {response}")
+                logger.error(f"Could not look up {symbol} plan orders: {response}")
+                return
+            orders = (response.get('data') or {}).get('entrustedList') or []
+        except Exception as e:
+            result.errors.append(f"plan order lookup: {e}")
+            logger.error(f"Error looking up {symbol} plan orders: {e}")
+            return
+
+        for order in orders:
+            plan_type = order.get('planType')
+            if plan_type not in unconfirmed:
+                continue
+            if (order.get('posSide') or order.get('holdSide')) != hold_side:
+                continue
+            # place_tpsl_order 와 같은 반올림 기준으로 가격 비교
+            expected = round(float(unconfirmed[plan_type]) * 10) / 10
+            if abs(float(order.get('triggerPrice') or 0) - expected) > 0.05:
+                continue
+            logger.info(f"{plan_type} for {symbol} was accepted despite no response: {order.get('orderId')}")
+            if plan_type == 'loss_plan':
+                result.stop_loss_set = True
+                result.stop_loss_order_id = order.get('orderId')
+            else:
+                result.take_profit_set = True
+                result.take_profit_order_id = order.get('orderId')
+            del unconfirmed[plan_type]
+
     async def _set_position_leverage(self, symbol: str, leverage: int) -> bool:
         """포지션 진입 전 레버리지 설정
         
@@ -127,17 +277,20 @@ class OrderExecutor:
             str_price = str(round(float(price if price else current_price) * 10) / 10)
             
             # 메인 오더 실행
-            response = await self.api.place_order(
-                symbol=symbol,
-                side=api_side,
-                trade_side='open',
-                size=str_size,
-                margin_coin='USDT',
-                order_type=order_type,
-                price=str_price if order_type == 'limit' else None
-            )
+            with tracer.span(STAGE_ORDER_ACK):
+                response = await self.api.place_order(
+                    symbol=symbol,
+                    side=api_side,
+                    trade_side='open',
+                    size=str_size,
+                    margin_coin='USDT',
+                    order_type=order_type,
+                    price=str_price if order_type == 'limit' else None
+                )
             
             if response.get('code') == '00000':
+                # 캔들 수신부터 거래소 접수까지
+                tracer.record_since_trace(STAGE_TICK_TO_ACK)
                 order_id = response['data']['orderId']
                 logger.info(f"Main order placed successfully: {order_id}")
                 
@@ -154,8 +307,11 @@ class OrderExecutor:
                 
                 # 포지션 생성 확인
                 position = None
+                if self.state_book and self.state_book.synced:
+                    # 포지션 채널 이벤트로 확인
+                    position = await self.state_book.wait_for_position(symbol, timeout=5)
                 retry_count = 0
-                while retry_count < 5:  # 최대 5회 확인
+                while not position and retry_count < 5:  # 최대 5회 확인
                     position = await self.get_position(symbol)
                     if position:
                         break
@@ -166,53 +322,27 @@ class OrderExecutor:
                     logger.error("Position was not created after order fill")
                     return False
                 
-                # TP/SL 설정 재시도 로직
-                sl_set = False
-                tp_set = False
-                
-                # 스탑로스 주문 (최대 3회 시도)
-                for attempt in range(3):
-                    logger.info(f"Setting stop loss, attempt {attempt + 1}/3")
-                    sl_response = await self.api.place_tpsl_order(
-                        symbol=symbol,
-                        plan_type='loss_plan',
-                        trigger_price=str_stop_loss,
-                        hold_side=hold_side,
-                        size=str_size,
-                        execute_price='0'
-                    )
-                    
-                    if sl_response.get('code') == '00000':
-                        sl_set = True
-                        logger.info("Stop loss set successfully")
-                        break
-                    
-                    logger.error(f"Failed to set stop loss: {sl_response}")
-                    await asyncio.sleep(1)
+                # TP/SL 동시 설정 (전체 제한 시간 내 재시도)
+                protection = await self.place_protective_orders(
+                    symbol=symbol,
+                    hold_side=hold_side,
+                    size=str_size,
+                    stop_loss_price=str_stop_loss,
+                    take_profit_price=str_take_profit
+                )
                 
-                # 테이크프로핏 주문 (최대 3회 시도)
-                for attempt in range(3):
-                    logger.info(f"Setting take profit, attempt {attempt + 1}/3")
-                    tp_response = await self.api.place_tpsl_order(
-                        symbol=symbol,
-                        plan_type='profit_plan',
-                        trigger_price=str_take_profit,
-                        hold_side=hold_side,
-                        size=str_size,
-                        execute_price='0'
-                    )
-                    
-                    if tp_response.get('code') == '00000':
-                        tp_set = True
-                        logger.info("Take profit set successfully")
-                        break
-                    
-                    logger.error(f"Failed to set take profit: {tp_response}")
-                    await asyncio.sleep(1)
+                # 스탑로스가 확인되지 않으면 보호 없는 포지션을 남기지 않고 즉시 청산
+                if not protection.stop_loss_set:
+                    logger.critical(f"Stop loss for {symbol} could not be confirmed "
+                                    f"({protection.errors}), closing position at market")
+                    if not await self.execute_market_close(position):
+                        logger.critical(f"UNPROTECTED {symbol} position: emergency close failed, "
+                                        f"manual intervention required")
+                    return False
                 
-                # Continue with position even if TP/SL setting fails
-                if not (sl_set and tp_set):
-                    logger.warning("Failed to set some TP/SL orders, but continuing with position")
+                # 테이크프로핏만 실패한 경우는 스탑로스로 보호되므로 유지
+                if not protection.success:
+                    logger.warning(f"Take profit for {symbol} not set, continuing with stop loss only")
                 
                 # 포지션 정보 업데이트
                 self.positions[symbol] = Position(
@@ -240,6 +370,9 @@ class OrderExecutor:
     async def get_position(self, symbol: str) -> Optional[Position]:
         """현재 포지션 상태 조회"""
         try:
+            if self.state_book and self.state_book.synced:
+                # 웹소켓으로 유지되는 포지션 상태 사용 (REST 호출 없음)
+                return self.state_book.get_position(symbol)
             return await self.api.get_position(symbol)  # await 추가
         except Exception as e:
             logger.error(f"Error getting position: {e}")
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PollerConfig:
+    """폴러 스케줄 설정"""
+    interval: float                   # 정상 폴링 간격 (초)
+    jitter: float = 0.0               # 간격에 더할 무작위 지연 최대값 (초)
+    timeout: float = 10.0             # 1회 조회 제한 시간 (초)
+    initial_backoff: float = 1.0      # 첫 실패 후 재시도 대기 (초)
+    max_backoff: float = 60.0         # 재시도 대기 상한 (초)
+    stale_after: Optional[float] = None  # 마지막 성공 후 이 시간이 지나면 stale (기본: interval * 3)
+
+class BackgroundPoller:
+    """주기적으로 데이터를 가져와 캐시에 쓰는 감독형 백그라운드 태스크
+
+    fetch 는 성공 시 True, 실패 시 False 를 반환하거나 예외를 던진다.
+    실패하면 지수 백오프로 재시도하고, 태스크가 예기치 않게 죽으면 다시 띄운다.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Any]], config: PollerConfig):
+        self.name = name
+        self.fetch = fetch
+        self.config = config
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.last_success = 0.0
+        self.last_attempt = 0.0
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.stats = {'runs': 0, 'failures': 0, 'timeouts': 0, 'restarts': 0}
+
+    @property
+    def stale_after(self) -> float:
+        return self.config.stale_after or self.config.interval * 3
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """마지막 성공 이후 stale_after 가 지났는지"""
+        if not self.last_success:
+            return True
+        return (now or time.time()) - self.last_success > self.stale_after
+
+    def age(self) -> Optional[float]:
+        """마지막 성공 후 경과 시간 (초)"""
+        return time.time() - self.last_success if self.last_success else None
+
+    def start(self) -> asyncio.Task:
+        if self._task and not self._task.done():
+            return self._task
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name=f"poller:{self.name}")
+        self._task.add_done_callback(self._on_done)
+        return self._task
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or not self._running:
+            return
+        error = task.exception()
+        logger.error(f"Poller {self.name} stopped unexpectedly: {error}, restarting")
+        self.stats['restarts'] += 1
+        self.start()
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _next_delay(self) -> float:
+        if self.consecutive_failures:
+            delay = min(self.config.initial_backoff * 2 ** (self.consecutive_failures - 1),
+                        self.config.max_backoff)
+        else:
+            delay = self.config.interval
+        # 여러 폴러가 같은 순간에 몰리지 않도록 무작위 지연 추가
+        if self.config.jitter > 0:
+            delay += random.uniform(0, self.config.jitter)
+        return delay
+
+    async def poll_once(self) -> bool:
+        """조회 1회 실행 후 상태 갱신"""
+        self.last_attempt = time.time()
+        self.stats['runs'] += 1
+        try:
+            result = await asyncio.wait_for(self.fetch(), timeout=self.config.timeout)
+            success = result is not False
+            if not success:
+                self.last_error = 'fetch returned failure'
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            self.last_error = 'timeout'
+            success = False
+        except Exception as e:
+            self.last_error = str(e)
+            success = False
+
+        if success:
+            self.last_success = time.time()
+            self.consecutive_failures = 0
+            self.last_error = None
+        else:
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            logger.warning(f"Poller {self.name} failed ({self.consecutive_failures} in a row): "
+                           f"{self.last_error}")
+        return success
+
+    async def _run(self) -> None:
+        while self._running:
+            await self.poll_once()
+            await asyncio.sleep(self._next_delay())
+
+    def get_status(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            'age_sec': round(age, 1) if age is not None else None,
+            'stale': self.is_stale(),
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            **self.stats
+        }
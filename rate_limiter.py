@@ -0,0 +1,179 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_ORDER = 0       # 주문 생성/취소/청산, TP/SL
+PRIORITY_PRIVATE = 1     # 포지션/계좌/주문 조회
+PRIORITY_MARKET = 2      # 시세 폴링
+PRIORITY_BACKGROUND = 3  # 백필 등 배경 작업
+
+# Bitget v2 문서 기준 엔드포인트 그룹별 한도: (그룹, 초당 요청 수, 버스트)
+# 가장 긴 prefix 가 우선 적용된다.
+ENDPOINT_LIMITS: Dict[str, Tuple[str, float, int]] = {
+    '/api/v2/mix/market/account-long-short': ('market_ratio', 1, 1),
+    '/api/v2/mix/market/history-candles': ('market_candles', 20, 20),
+    '/api/v2/mix/market/': ('market', 20, 20),
+    '/api/v2/mix/account/set-leverage': ('account_leverage', 5, 5),
+    '/api/v2/mix/account/': ('account', 10, 10),
+    '/api/v2/mix/position/': ('position', 10, 10),
+    '/api/v2/mix/order/close-positions': ('order_close', 1, 1),
+    '/api/v2/mix/order/': ('order', 10, 10),
+}
+DEFAULT_LIMIT = ('default', 10, 10)
+
+ENDPOINT_PRIORITIES: Dict[str, int] = {
+    '/api/v2/mix/order/place-order': PRIORITY_ORDER,
+    '/api/v2/mix/order/cancel-order': PRIORITY_ORDER,
+    '/api/v2/mix/order/place-tpsl-order': PRIORITY_ORDER,
+    '/api/v2/mix/order/close-positions': PRIORITY_ORDER,
+    '/api/v2/mix/order/close-position': PRIORITY_ORDER,
+    '/api/v2/mix/market/history-candles': PRIORITY_BACKGROUND,
+    '/api/v2/mix/market/': PRIORITY_MARKET,
+}
+
+class TokenBucket:
+    """초당 rate 개씩 채워지는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def time_until_token(self) -> float:
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (초)"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """429 응답 후 일정 시간 토큰 사용 중지"""
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+@dataclass
+class _GroupState:
+    bucket: TokenBucket
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+    waiters: List[Tuple[int, int]] = field(default_factory=list)
+    requests: int = 0
+    throttled: int = 0
+    rate_limited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    max_queue_depth: int = 0
+
+class RequestScheduler:
+    """엔드포인트 그룹별 토큰 버킷 + 우선순위 대기열"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[str, float, int]]] = None,
+                 priorities: Optional[Dict[str, int]] = None):
+        self.limits = limits or ENDPOINT_LIMITS
+        self.priorities = priorities or ENDPOINT_PRIORITIES
+        self._prefixes = sorted(self.limits, key=len, reverse=True)
+        self._priority_prefixes = sorted(self.priorities, key=len, reverse=True)
+        self._groups: Dict[str, _GroupState] = {}
+        self._sequence = itertools.count()
+
+    def group_for(self, endpoint: str) -> Tuple[str, float, int]:
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                return self.limits[prefix]
+        return DEFAULT_LIMIT
+
+    def priority_for(self, endpoint: str) -> int:
+        for prefix in self._priority_prefixes:
+            if endpoint.startswith(prefix):
+                return self.priorities[prefix]
+        return PRIORITY_PRIVATE
+
+    def _state(self, endpoint: str) -> _GroupState:
+        name, rate, burst = self.group_for(endpoint)
+        if name not in self._groups:
+            self._groups[name] = _GroupState(bucket=TokenBucket(rate, burst))
+        return self._groups[name]
+
+    async def acquire(self, endpoint: str, priority: Optional[int] = None) -> float:
+        """요청 슬롯 확보 - 대기한 시간(초) 반환"""
+        state = self._state(endpoint)
+        entry = (self.priority_for(endpoint) if priority is None else priority,
+                 next(self._sequence))
+        start = time.monotonic()
+
+        async with state.condition:
+            heapq.heappush(state.waiters, entry)
+            state.max_queue_depth = max(state.max_queue_depth, len(state.waiters))
+            # 더 높은 우선순위가 들어왔을 수 있으므로 대기자들이 순서를 재확인하게 함
+            state.condition.notify_all()
+            try:
+                while True:
+                    if state.waiters[0] == entry:
+                        delay = state.bucket.time_until_token()
+                        if delay <= 0:
+                            state.bucket.consume()
+                            heapq.heappop(state.waiters)
+                            state.condition.notify_all()
+                            break
+                        try:
+                            await asyncio.wait_for(state.condition.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await state.condition.wait()
+            except BaseException:
+                if entry in state.waiters:
+                    state.waiters.remove(entry)
+                    heapq.heapify(state.waiters)
+                    state.condition.notify_all()
+                raise
+
+        waited = time.monotonic() - start
+        state.requests += 1
+        state.total_wait += waited
+        state.max_wait = max(state.max_wait, waited)
+        if waited > 0.001:
+            state.throttled += 1
+        return waited
+
+    def report_rate_limited(self, endpoint: str, retry_after: float = 1.0) -> None:
+        """429 응답 반영 - 해당 그룹을 잠시 막음"""
+        state = self._state(endpoint)
+        state.rate_limited += 1
+        state.bucket.block(retry_after)
+        logger.warning(f"Rate limit hit on {endpoint}, pausing group "
+                       f"{self.group_for(endpoint)[0]} for {retry_after:.1f}s")
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """그룹별 대기열 깊이 / 대기 시간 통계"""
+        return {
+            name: {
+                'queue_depth': len(state.waiters),
+                'max_queue_depth': state.max_queue_depth,
+                'requests': state.requests,
+                'throttled': state.throttled,
+                'rate_limited': state.rate_limited,
+                'avg_wait_ms': state.total_wait / state.requests * 1000 if state.requests else 0.0,
+                'max_wait_ms': state.max_wait * 1000,
+                'tokens': state.bucket.tokens
+            }
+            for name, state in self._groups.items()
+        }
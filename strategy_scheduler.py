@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List
+from tracing import tracer, STAGE_EVENT_DISPATCH, STAGE_STRATEGY_EVALUATE
+
+logger = logging.getLogger(__name__)
+
+class StrategyScheduler:
+    """여러 심볼의 전략을 동시에 평가
+
+    심볼마다 이벤트 대기 태스크를 두고, 실제 평가는 공유 세마포어로 동시 실행 수를
+    제한한다. 평가가 제한 시간을 넘기면 슬롯을 반납해 느린 심볼이 다른 심볼을 막지 않게 한다.
+    """
+
+    def __init__(self, strategies: List, max_concurrency: int = 8,
+                 evaluation_timeout: float = 10.0):
+        self.strategies = {strategy.symbol: strategy for strategy in strategies}
+        self.max_concurrency = max_concurrency
+        self.evaluation_timeout = evaluation_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats: Dict[str, Dict[str, float]] = {
+            symbol: {
+                'evaluations': 0,
+                'timeouts': 0,
+                'errors': 0,
+                'last_ms': 0.0,
+                'max_ms': 0.0,
+                'max_slot_wait_ms': 0.0
+            }
+            for symbol in self.strategies
+        }
+
+    async def run(self) -> None:
+        """전략 준비 후 심볼별 평가 루프 실행"""
+        try:
+            results = await asyncio.gather(
+                *(strategy.prepare() for strategy in self.strategies.values()),
+                return_exceptions=True
+            )
+            for symbol, result in zip(self.strategies, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error preparing {symbol} strategy: {result}")
+
+            await asyncio.gather(*(
+                self._run_symbol(strategy) for strategy in self.strategies.values()
+            ))
+        except Exception as e:
+            logger.error(f"Fatal error in strategy scheduler: {e}")
+        finally:
+            logger.info("Trading strategy stopped")
+
+    async def _run_symbol(self, strategy) -> None:
+        subscription = strategy.subscribe()
+        try:
+            while True:
+                try:
+                    await subscription.wait(timeout=strategy.max_idle_interval,
+                                            debounce=strategy.debounce_interval)
+                    trace, subscription.trace = subscription.trace, None
+                    await self._evaluate(strategy, trace)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in {strategy.symbol} trading loop: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            subscription.close()
+
+    async def _evaluate(self, strategy, trace=None) -> None:
+        stats = self.stats[strategy.symbol]
+        queued = time.perf_counter()
+        async with self._semaphore:
+            started = time.perf_counter()
+            stats['max_slot_wait_ms'] = max(stats['max_slot_wait_ms'], (started - queued) * 1000)
+            # 평가를 깨운 이벤트의 트레이스를 평가 태스크 컨텍스트로 넘김
+            token = tracer.activate(trace)
+            try:
+                tracer.record_since_trace(STAGE_EVENT_DISPATCH)
+                task = asyncio.create_task(strategy.evaluate())
+            finally:
+                tracer.end_trace(token)
+            done, _ = await asyncio.wait({task}, timeout=self.evaluation_timeout)
+            if not done:
+                # 주문 도중일 수 있으므로 취소하지 않고 슬롯만 반납
+                stats['timeouts'] += 1
+                logger.warning(f"{strategy.symbol} evaluation exceeded {self.evaluation_timeout}s, "
+                               f"releasing slot")
+
+        try:
+            await task
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            tracer.record(STAGE_STRATEGY_EVALUATE, elapsed, attach=False)
+            stats['evaluations'] += 1
+            stats['last_ms'] = elapsed
+            stats['max_ms'] = max(stats['max_ms'], elapsed)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """심볼별 평가 횟수 / 지연 통계"""
+        return {symbol: dict(stats) for symbol, stats in self.stats.items()}
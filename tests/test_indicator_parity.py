@@ -0,0 +1,73 @@
+"""IndicatorEngine 스트리밍 지표와 MarketDataManager pandas 재계산 결과 비교"""
+import random
+import pytest
+from candle_buffer import APPENDED, INSERTED, REPLACED
+from database_manager import Candle
+from market_data_manager import MarketDataManager
+
+MINUTE_MS = 60 * 1000
+REL = 1e-9
+ABS = 1e-6
+
+def make_candle(timestamp: int, open_: float, close: float, rng: random.Random) -> Candle:
+    high = max(open_, close) + rng.random() * 5
+    low = min(open_, close) - rng.random() * 5
+    return Candle(timestamp, open_, high, low, close, rng.random() * 100, None)
+
+def assert_parity(market: MarketDataManager) -> None:
+    engine = market.indicator_engine
+
+    expected = market._calculate_price_indicators_df(engine.window)
+    actual = engine.price_indicators()
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, rel=REL, abs=ABS), key
+
+    expected_k, expected_d = market._calculate_stoch_rsi_df(
+        engine.rsi_period, engine.smoothk, engine.smoothd
+    )
+    actual_k, actual_d = engine.stoch_rsi()
+    assert actual_k == pytest.approx(expected_k, rel=REL, abs=ABS)
+    assert actual_d == pytest.approx(expected_d, rel=REL, abs=ABS)
+
+    assert engine.atr() == pytest.approx(market._calculate_atr_df(engine.atr_period), rel=REL, abs=ABS)
+
+@pytest.mark.parametrize('seed', [1, 7, 42])
+def test_streaming_indicators_match_pandas(seed):
+    rng = random.Random(seed)
+    market = MarketDataManager(api=None, symbol='BTCUSDT')
+    seen = {APPENDED: 0, REPLACED: 0, INSERTED: 0}
+
+    def feed(candle: Candle) -> None:
+        latest = market.candles_cache.latest_timestamp
+        if latest is None or candle.timestamp > latest:
+            seen[APPENDED] += 1
+        elif candle.timestamp == latest:
+            seen[REPLACED] += 1
+        else:
+            seen[INSERTED] += 1
+        # 웹소켓 갱신과 같은 경로 (버퍼 반영 + 스트리밍 지표 갱신/재구성)
+        market._update_candle_state(candle)
+        if market.indicator_engine.bar_count >= 2:
+            assert_parity(market)
+
+    price = 37000.0
+    timestamp = 1_700_000_000_000 - 1_700_000_000_000 % MINUTE_MS
+    for bar in range(300):
+        # 분 단위 갭 (재연결 등으로 봉이 빠진 구간)
+        timestamp += MINUTE_MS * (rng.randint(2, 5) if rng.random() < 0.05 else 1)
+        open_ = price
+        # 진행 중 봉 갱신 여러 번
+        for _ in range(rng.randint(1, 4)):
+            price += rng.gauss(0, 15)
+            feed(make_candle(timestamp, open_, price, rng))
+
+        # 이미 지나간 봉 수정 (백필로 값이 바뀐 경우)
+        if bar > 60 and rng.random() < 0.03:
+            timestamps = market.candles_cache.column('timestamp', 30)
+            past = int(timestamps[-rng.randint(2, 30)])
+            feed(make_candle(past, price, price + rng.gauss(0, 40), rng))
+
+    assert seen[APPENDED] > 250
+    assert seen[REPLACED] > 250
+    assert seen[INSERTED] > 0
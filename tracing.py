@@ -0,0 +1,160 @@
+import contextvars
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from latency import HdrHistogram
+
+logger = logging.getLogger(__name__)
+
+# 틱 → 주문 파이프라인 단계
+STAGE_WS_RECEIVE = 'ws_receive'            # 거래소 발송(ts) → 로컬 수신
+STAGE_JSON_DECODE = 'json_decode'
+STAGE_QUEUE_WAIT = 'queue_wait'            # 수신 → 처리 태스크가 꺼낼 때까지
+STAGE_CACHE_UPDATE = 'cache_update'        # 캔들 버퍼 + 스트리밍 지표 + 이벤트 발행
+STAGE_DB_WRITE = 'db_write'                # write-behind 큐 적재 (핫패스가 기다리는 부분)
+STAGE_DB_FLUSH = 'db_flush'                # 배치 INSERT (트레이스와 무관한 백그라운드)
+STAGE_EVENT_DISPATCH = 'event_dispatch'    # 수신 → 전략 평가 시작
+STAGE_INDICATOR_COMPUTE = 'indicator_compute'
+STAGE_SIGNAL_EVALUATE = 'signal_evaluate'  # 시그널 입력 (L/S 비율 기울기/가속도) 계산
+STAGE_STRATEGY_EVALUATE = 'strategy_evaluate'
+STAGE_RATE_LIMIT_WAIT = 'rate_limit_wait'
+STAGE_REST_SIGN = 'rest_sign'
+STAGE_REST_SEND = 'rest_send'              # 요청 전송 → 응답 본문 수신
+STAGE_ORDER_ACK = 'order_ack'              # 주문 요청 → 거래소 접수 응답
+STAGE_TICK_TO_ACK = 'tick_to_ack'          # 수신 → 주문 접수 (트레이스 전체)
+
+STAGES = (
+    STAGE_WS_RECEIVE, STAGE_JSON_DECODE, STAGE_QUEUE_WAIT, STAGE_CACHE_UPDATE, STAGE_DB_WRITE,
+    STAGE_DB_FLUSH, STAGE_EVENT_DISPATCH, STAGE_INDICATOR_COMPUTE, STAGE_SIGNAL_EVALUATE,
+    STAGE_STRATEGY_EVALUATE, STAGE_RATE_LIMIT_WAIT, STAGE_REST_SIGN, STAGE_REST_SEND,
+    STAGE_ORDER_ACK, STAGE_TICK_TO_ACK
+)
+
+class Trace:
+    """캔들 1건의 처리 흐름 - 처리 태스크에서 시작해 이벤트 버스를 거쳐 전략/주문까지 전달"""
+
+    __slots__ = ('trace_id', 'started', 'spans')
+
+    max_spans = 64
+
+    def __init__(self, trace_id: str, started: float):
+        self.trace_id = trace_id
+        self.started = started  # time.monotonic() 기준
+        self.spans: List[Tuple[str, float]] = []
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+class _Span:
+    __slots__ = ('tracer', 'stage', 'started')
+
+    def __init__(self, tracer: 'Tracer', stage: str):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self) -> '_Span':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.tracer.record(self.stage, (time.perf_counter() - self.started) * 1000)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar(
+    'current_trace', default=None
+)
+
+class Tracer:
+    """단계별 지연 시간 계측
+
+    비활성화 상태에서는 span() 이 공유 no-op 객체를 돌려주고 record() 는 바로 반환한다.
+    현재 트레이스는 contextvar 로 전달되므로 같은 태스크와 그 태스크가 만든 하위 태스크에서
+    별도 인자 없이 이어진다. 큐/이벤트 버스처럼 태스크가 바뀌는 지점은 activate() 로 넘긴다.
+    """
+
+    def __init__(self, enabled: bool = False, slow_trace_ms: float = 500.0):
+        self.enabled = enabled
+        self.slow_trace_ms = slow_trace_ms  # 이보다 느린 주문 트레이스는 단계별로 기록
+        self.stages: Dict[str, HdrHistogram] = {}
+        self.observers: Dict[str, Callable[[float], None]] = {}  # 단계별 추가 수집 (예: 메트릭 히스토그램)
+        self.window_started = time.time()
+        self._ids = itertools.count(1)
+
+    def span(self, stage: str):
+        """with tracer.span('stage'): ... - 블록 실행 시간 기록"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage: str, elapsed_ms: float, attach: bool = True) -> None:
+        """stage 히스토그램에 기록 (attach=True 면 현재 트레이스의 단계 목록에도 추가)"""
+        if not self.enabled:
+            return
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = HdrHistogram()
+        histogram.record(elapsed_ms)
+        observer = self.observers.get(stage)
+        if observer is not None:
+            observer(elapsed_ms)
+        trace = _current_trace.get() if attach else None
+        if trace is not None and len(trace.spans) < Trace.max_spans:
+            trace.spans.append((stage, elapsed_ms))
+
+    def start_trace(self, started: Optional[float] = None) -> Optional[contextvars.Token]:
+        """새 트레이스를 현재 컨텍스트에 설정 (started 는 time.monotonic() 기준 수신 시각)"""
+        if not self.enabled:
+            return None
+        trace = Trace(f"{next(self._ids):x}", started if started is not None else time.monotonic())
+        return _current_trace.set(trace)
+
+    def activate(self, trace: Optional[Trace]) -> Optional[contextvars.Token]:
+        """다른 태스크에서 넘겨받은 트레이스를 현재 컨텍스트에 설정"""
+        if not self.enabled or trace is None:
+            return None
+        return _current_trace.set(trace)
+
+    def end_trace(self, token: Optional[contextvars.Token]) -> None:
+        if token is not None:
+            _current_trace.reset(token)
+
+    def current(self) -> Optional[Trace]:
+        return _current_trace.get() if self.enabled else None
+
+    def record_since_trace(self, stage: str) -> None:
+        """현재 트레이스 시작(캔들 수신)부터 지금까지를 stage 로 기록"""
+        trace = self.current()
+        if trace is None:
+            return
+        elapsed = trace.elapsed_ms()
+        self.record(stage, elapsed)
+        if stage == STAGE_TICK_TO_ACK and elapsed >= self.slow_trace_ms:
+            logger.warning(f"Slow trace {trace.trace_id}: {elapsed:.1f}ms",
+                           extra={'trace_id': trace.trace_id,
+                                  'spans': [(name, round(ms, 3)) for name, ms in trace.spans]})
+
+    def summary(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """단계별 count / 백분위 (ms) - reset=True 면 집계 구간을 새로 시작"""
+        result = {
+            stage: {key: round(value, 3) for key, value in histogram.summary().items()}
+            for stage, histogram in self.stages.items()
+            if histogram.count
+        }
+        if reset:
+            for histogram in self.stages.values():
+                histogram.reset()
+            self.window_started = time.time()
+        return result
+
+# 프로세스 전역 계측기 (main 에서 LATENCY_TRACE 설정으로 활성화)
+tracer = Tracer()
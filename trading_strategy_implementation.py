@@ -1,13 +1,15 @@
 import logging
 from typing import Optional, Tuple
 from dataclasses import dataclass
-import asyncio
 import time
 from order_execution import OrderExecutor
 from market_data_manager import MarketDataManager
 from models import Position, TradingMetrics
 import math
 from models import MarketData
+from event_bus import EVENT_CANDLE, EVENT_OPEN_INTEREST, EVENT_POSITION_RATIO, EventSubscription
+from strategy_scheduler import StrategyScheduler
+from tracing import tracer, STAGE_INDICATOR_COMPUTE, STAGE_SIGNAL_EVALUATE
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +26,17 @@ class TradingConfig:
 class TradingStrategy:
     def __init__(self, market_data: MarketDataManager, order_executor: OrderExecutor):
         self.market_data = market_data
+        self.symbol = market_data.symbol
         self.order_executor = order_executor
         self.config = TradingConfig()
         self.metrics = TradingMetrics()
         self.in_position = False
         self.last_trade_time = 0
         self.min_trade_interval = 120
+        self.debounce_interval = 0.05  # 이벤트 묶음 처리 대기 시간 (초)
+        self.max_idle_interval = 5.0   # 이벤트가 없어도 최소 이 간격으로 평가 (초)
+        self._last_input_key = None
+        self.skipped_evaluations = 0
 
     async def calculate_position_size(self, current_price: float) -> float:
         """계좌 잔고를 기반으로 포지션 크기 계산"""
@@ -58,6 +65,10 @@ class TradingStrategy:
     def should_open_long(self, indicators: dict, market_indicators: dict) -> bool:
         """롱 포지션 진입 조건 확인"""
         try:
+            # OI/비율/캔들 피드가 오래되면 지표가 현재 시장을 반영하지 않으므로 신규 진입 보류
+            if self.market_data.get_stale_feeds():
+                return False
+            
             # 주요 조건 확인
             ls_ratio_slope = market_indicators.get('ls_ratio_slope', 0)
             ls_ratio_acceleration = market_indicators.get('ls_ratio_acceleration', 0)
@@ -112,6 +123,10 @@ class TradingStrategy:
     def should_open_short(self, indicators: dict, market_indicators: dict) -> bool:
         """숏 포지션 진입 조건 확인"""
         try:
+            # OI/비율/캔들 피드가 오래되면 지표가 현재 시장을 반영하지 않으므로 신규 진입 보류
+            if self.market_data.get_stale_feeds():
+                return False
+            
             # 주요 조건 확인
             ls_ratio_slope = market_indicators.get('ls_ratio_slope', 0)
             ls_ratio_acceleration = market_indicators.get('ls_ratio_acceleration', 0)
@@ -184,6 +199,8 @@ class TradingStrategy:
                 (position.side == 'short' and oi_rsi >= 80):
                 logger.info(f"OI RSI condition met for closing: {oi_rsi}")
                 return True, "oi_rsi_condition"
+            
+            return False, ""
         
         except Exception as e:
             logger.error(f"Error in should_close_position: {e}")
@@ -209,7 +226,7 @@ class TradingStrategy:
             stop_loss_price = round(stop_loss_price * 10) / 10
             
             success = await self.order_executor.open_position(
-                symbol="BTCUSDT",
+                symbol=self.symbol,
                 side=side,
                 size=str(total_size),
                 leverage=self.config.leverage,
@@ -224,7 +241,7 @@ class TradingStrategy:
                 # 거래 기록 저장
                 trade_data = {
                     'timestamp': int(time.time() * 1000),
-                    'symbol': "BTCUSDT",
+                    'symbol': self.symbol,
                     'side': side,
                     'size': float(total_size),
                     'entry_price': float(entry_price),
@@ -320,52 +337,58 @@ class TradingStrategy:
             logger.error(f"Error adjusting leverage: {e}")
             return self.config.leverage
 
+    async def prepare(self):
+        """시작할 때 한 번만 미체결 주문 취소"""
+        logger.info(f"Starting trading strategy for {self.symbol}")
+        await self.order_executor.cancel_all_symbol_orders(self.symbol)
+        logger.info(f"Initial cleanup of {self.symbol} pending orders completed")
+
+    def subscribe(self) -> EventSubscription:
+        """시장 데이터는 MarketDataManager 폴러가 갱신, 전략은 갱신 이벤트에 반응"""
+        return self.market_data.event_bus.subscribe(
+            (EVENT_CANDLE, EVENT_OPEN_INTEREST, EVENT_POSITION_RATIO)
+        )
+
+    async def evaluate(self):
+        """트레이딩 로직 1회 실행"""
+        await self._process_trading_logic()
+
     async def run(self):
-        """전략 실행 메인 루프"""
-        try:
-            logger.info("Starting trading strategy")
-            
-            # 시작할 때 한 번만 미체결 주문 취소
-            await self.order_executor.cancel_all_symbol_orders("BTCUSDT")
-            logger.info("Initial cleanup of pending orders completed")
-            
-            while True:
-                try:
-                    # 시장 데이터 업데이트 및 저장
-                    await self.market_data.update_position_ratio("BTCUSDT")
-                    await self.market_data.update_open_interest("BTCUSDT")
-                    await self.market_data.store_market_sentiment()
-                    
-                    # 트레이딩 로직 실행
-                    await self._process_trading_logic()
-                    
-                except Exception as e:
-                    logger.error(f"Error in trading loop: {e}")
-                
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            logger.error(f"Fatal error in strategy: {e}")
-        finally:
-            logger.info("Trading strategy stopped")
+        """단일 심볼 전략 실행 메인 루프"""
+        await StrategyScheduler([self]).run()
+
+    def _input_key(self, position: Optional[Position]) -> tuple:
+        """평가 입력 식별값 - 이전과 같으면 재평가 생략"""
+        position_key = (position.side, position.size, position.unrealized_pl) if position else None
+        cooldown_over = (int(time.time()) - self.last_trade_time) >= self.min_trade_interval
+        return (self.market_data.event_bus.sequence, position_key, self.in_position, cooldown_over)
 
     async def _process_trading_logic(self):
         """트레이딩 로직 처리"""
         try:
-            # 데이터 업데이트
-            await self.market_data.update_position_ratio("BTCUSDT")
-            await self.market_data.update_open_interest("BTCUSDT")
+            # 캔들 스트림이 멈춘 동안은 지표가 현재 시장을 반영하지 않으므로 거래 판단 생략
+            if self.market_data.stream_stale:
+                self.skipped_evaluations += 1
+                return
             
             # 현재 포지션 확인
-            position = await self.order_executor.get_position("BTCUSDT")
+            position = await self.order_executor.get_position(self.symbol)
             
-            # 기술적 지표 계산
-            indicators = self.market_data.calculate_technical_indicators()
+            # 시장 데이터와 포지션이 그대로면 지표 재계산 생략
+            input_key = self._input_key(position)
+            if input_key == self._last_input_key:
+                self.skipped_evaluations += 1
+                return
+            self._last_input_key = input_key
+            
+            with tracer.span(STAGE_INDICATOR_COMPUTE):
+                # 기술적 지표 계산
+                indicators = self.market_data.calculate_technical_indicators()
             if not indicators:
                 return
-                
-            # 시장 지표 계산
-            market_indicators = self.market_data.calculate_market_indicators()
+            with tracer.span(STAGE_SIGNAL_EVALUATE):
+                # 시장 지표 계산 (진입/청산 시그널 입력인 L/S 비율 기울기/가속도)
+                market_indicators = self.market_data.calculate_market_indicators()
             if not market_indicators:
                 return
 
@@ -374,6 +397,11 @@ class TradingStrategy:
             
             if not current_price:
                 return
+            
+            # OI/비율 피드가 오래되면 신규 진입 보류 (should_open_long/short 에서 차단, 청산 판단은 계속)
+            stale_feeds = self.market_data.get_stale_feeds()
+            if stale_feeds and self.market_data.should_log('stale_feeds'):
+                logger.warning(f"Stale market feeds, entries paused: {stale_feeds}")
 
             # === 거래 관련 로직 시작 (임시 비활성화) ===
             """
@@ -387,7 +415,7 @@ class TradingStrategy:
                     await self.execute_close(position, close_reason)
                     
             # 포지션이 없는 경우에만 진입 조건 확인
-            elif not self.in_position and (current_time - self.last_trade_time) >= self.min_trade_interval:
+            elif not self.in_position and not stale_feeds and (current_time - self.last_trade_time) >= self.min_trade_interval:
                 # 레버리지 동적 조정
                 volatility = self.market_data.calculate_atr(period=14)
                 adjusted_leverage = self._adjust_leverage(volatility)